@@ -0,0 +1,117 @@
+# --- ALERT JOURNAL ---
+# Append-only JSONL log of alerts between detection and display. A poll's
+# alerts are written (and fsynced once, as a batch) before the repost IDs
+# are saved to history; an "ack" line is written when an overlay first shows
+# the alert. On startup, alerts that were never acked and are younger than
+# the replay window go back on the queue, so a crash or restart mid-raid no
+# longer loses them. Acks are fsynced lazily: losing one only means the alert
+# may be shown again after a crash, never that it is dropped.
+
+import os
+import json
+import time
+import uuid
+import threading
+
+JOURNAL_FILE = "alert_journal.jsonl"
+
+
+class AlertJournal:
+    def __init__(self, path=JOURNAL_FILE, fsync_interval=1.0, compact_after=2000):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        self.lock = threading.Lock()
+        self.pending = {}  # journal_id -> alert, in append order
+        self.lines = 0
+        self._dirty = False
+        self._closed = threading.Event()
+        self._load()
+        self.f = open(self.path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self._flush_loop, name="alert-journal", daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self.lines += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+                if record.get("op") == "add":
+                    self.pending[record["id"]] = record["alert"]
+                elif record.get("op") == "ack":
+                    self.pending.pop(record.get("id"), None)
+
+    def replay(self, max_age):
+        """Returns un-acked alerts (oldest first) queued within the last `max_age` seconds and compacts
+        the journal down to them; older ones are dropped."""
+        cutoff = time.time() - max_age
+        with self.lock:
+            self.pending = {jid: alert for jid, alert in self.pending.items()
+                            if max_age > 0 and alert.get("queued_at", 0) >= cutoff}
+            self._compact()
+            return list(self.pending.values())
+
+    def append(self, alerts):
+        """Journals a batch of new alerts (tagging each with a journal_id) and fsyncs once."""
+        if not alerts:
+            return
+        with self.lock:
+            for alert in alerts:
+                alert["journal_id"] = uuid.uuid4().hex
+                self.pending[alert["journal_id"]] = alert
+                self._write({"op": "add", "id": alert["journal_id"], "alert": alert})
+            self.f.flush()
+            os.fsync(self.f.fileno())
+
+    def ack(self, journal_id):
+        """Marks an alert as displayed. Written now, fsynced by the background flusher."""
+        if not journal_id:
+            return
+        with self.lock:
+            if self.pending.pop(journal_id, None) is None:
+                return
+            self._write({"op": "ack", "id": journal_id})
+            self._dirty = True
+            if self.lines >= self.compact_after:
+                self._compact()
+
+    def _write(self, record):
+        self.f.write(json.dumps(record, sort_keys=True, default=str) + "\n")
+        self.lines += 1
+
+    def _compact(self):
+        # Rewrite with only the pending adds, then swap it in atomically.
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for jid, alert in self.pending.items():
+                f.write(json.dumps({"op": "add", "id": jid, "alert": alert}, sort_keys=True, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if getattr(self, "f", None):
+            self.f.close()
+        os.replace(tmp, self.path)
+        self.f = open(self.path, "a", encoding="utf-8")
+        self.lines = len(self.pending)
+        self._dirty = False
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.fsync_interval):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if self._dirty and not self.f.closed:
+                self.f.flush()
+                os.fsync(self.f.fileno())
+                self._dirty = False
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+        with self.lock:
+            self.f.close()
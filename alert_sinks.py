@@ -0,0 +1,242 @@
+# --- OUTBOUND ALERT SINKS ---
+# Forwards every new alert to external consumers (chat bots, a stream deck,
+# a logging service) without ever blocking detection or the overlay. The
+# tracker only calls AlertSinks.publish(), which drops the alerts into each
+# sink's bounded queue and returns. Every sink has its own delivery thread
+# that batches what is waiting, retries with exponential backoff and stops
+# trying for a while (circuit breaker) when the target keeps failing, so a
+# slow or dead webhook only ever costs its own queue.
+#
+#   "alert_sinks": [
+#       {"type": "webhook", "name": "bot", "url": "http://127.0.0.1:9000/alerts"},
+#       {"type": "socket", "name": "deck", "host": "127.0.0.1", "port": 9100}
+#   ]
+
+import json
+import time
+import queue
+import random
+import socket
+import threading
+
+import requests
+
+import metrics
+
+SINK_SENT = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_alert_sink_sent_total", "Alerts delivered by each outbound sink.", ("sink",)))
+SINK_DROPPED = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_alert_sink_dropped_total", "Alerts an outbound sink gave up on, by reason.", ("sink", "reason")))
+SINK_FAILURES = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_alert_sink_failures_total", "Failed delivery attempts per outbound sink.", ("sink",)))
+SINK_LATENCY = metrics.REGISTRY.register(metrics.Histogram(
+    "rumble_alert_sink_seconds", "Duration of one successful batch delivery per sink.", ("sink",)))
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures; half_open (one trial) after `reset_after` seconds."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold=5, reset_after=30.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+
+    def allow(self):
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_after:
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    def success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class AlertSink:
+    """Base class: subclasses implement deliver(batch) and raise on failure."""
+
+    def __init__(self, name, max_queue=1000, batch_size=20, batch_wait=0.25, retries=3, backoff=1.0,
+                 max_backoff=30.0, breaker_threshold=5, breaker_reset=30.0):
+        self.name = name
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.thread = None
+        self._stop = threading.Event()
+
+    def offer(self, alert):
+        """Queues an alert without blocking; drops it (and counts it) if the sink is backed up."""
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            SINK_DROPPED.inc(sink=self.name, reason="queue_full")
+
+    def deliver(self, batch):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"alert-sink-{self.name}", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stops the delivery thread; whatever is still queued after `timeout` is dropped."""
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self.close()
+
+    def _next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        # Give a burst a moment to accumulate so it goes out as one request.
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch):
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                SINK_DROPPED.inc(len(batch), sink=self.name, reason="circuit_open")
+                return False
+            start = time.perf_counter()
+            try:
+                self.deliver(batch)
+            except Exception as e:
+                self.breaker.failure()
+                SINK_FAILURES.inc(sink=self.name)
+                if attempt == 0:
+                    print(f"Alert sink '{self.name}' error: {e}")
+            else:
+                self.breaker.success()
+                SINK_LATENCY.observe(time.perf_counter() - start, sink=self.name)
+                SINK_SENT.inc(len(batch), sink=self.name)
+                return True
+            if attempt < self.retries and self._stop.wait(delay * random.uniform(0.5, 1.5)):
+                break
+            delay = min(delay * 2, self.max_backoff)
+        SINK_DROPPED.inc(len(batch), sink=self.name, reason="failed")
+        return False
+
+
+class WebhookSink(AlertSink):
+    """POSTs {"alerts": [...]} as JSON to a URL."""
+
+    def __init__(self, name, url, headers=None, timeout=5.0, **kwargs):
+        super().__init__(name, **kwargs)
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+
+    def deliver(self, batch):
+        r = self.session.post(self.url, json={"alerts": batch}, timeout=self.timeout)
+        r.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class SocketSink(AlertSink):
+    """Writes one JSON line per alert to a TCP listener, reconnecting as needed."""
+
+    def __init__(self, name, host="127.0.0.1", port=9100, timeout=5.0, **kwargs):
+        super().__init__(name, **kwargs)
+        self.address = (host, int(port))
+        self.timeout = timeout
+        self.sock = None
+
+    def deliver(self, batch):
+        payload = "".join(json.dumps(alert, sort_keys=True, default=str) + "\n" for alert in batch)
+        try:
+            if self.sock is None:
+                self.sock = socket.create_connection(self.address, timeout=self.timeout)
+            self.sock.sendall(payload.encode("utf-8"))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+SINK_TYPES = {"webhook": WebhookSink, "socket": SocketSink}
+
+
+class AlertSinks:
+    """The set of configured sinks. publish() never blocks."""
+
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+
+    @classmethod
+    def from_config(cls, entries, log=print):
+        sinks = []
+        for i, entry in enumerate(entries or []):
+            options = dict(entry)
+            kind = options.pop("type", "webhook")
+            options.setdefault("name", f"{kind}{i + 1}")
+            if not options.pop("enabled", True):
+                continue
+            try:
+                sinks.append(SINK_TYPES[kind](**options))
+            except (KeyError, TypeError) as e:
+                log(f"Ignoring alert sink #{i + 1} ({kind}): {e}")
+        return cls(sinks)
+
+    def start(self):
+        for sink in self.sinks:
+            sink.start()
+        return self
+
+    def publish(self, alerts):
+        """Hands alerts (oldest first) to every sink."""
+        if not self.sinks:
+            return
+        # Sinks serialize on their own threads; give them copies the overlay pipeline cannot touch.
+        alerts = [dict(alert) for alert in alerts]
+        for sink in self.sinks:
+            for alert in alerts:
+                sink.offer(alert)
+
+    def stop(self, timeout=2.0):
+        for sink in self.sinks:
+            sink.stop(timeout)
@@ -0,0 +1,207 @@
+# --- AUDIO BACKEND ---
+# Live alerts are played by the overlay's <audio> element, so the app only
+# needs a sound's duration (to time the alert) and, for the Test button, a
+# local player. Durations come from the WAV/MP3 headers without decoding;
+# pygame is imported and the mixer opened only when something actually has
+# to be played locally, and the device is released again afterwards so it
+# never sits open next to OBS.
+
+import os
+import struct
+import importlib
+import threading
+
+# --- DURATION FROM FILE HEADERS ---
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 25: (11025, 12000, 8000)}
+_MP3_SCAN_LIMIT = 256 * 1024
+
+_duration_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _wav_duration(f):
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        return None
+    byte_rate = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        chunk_id, size = header[:4], struct.unpack("<I", header[4:])[0]
+        if chunk_id == b"fmt ":
+            fmt = f.read(size + (size & 1))
+            byte_rate = struct.unpack("<I", fmt[8:12])[0]
+        elif chunk_id == b"data":
+            return size / byte_rate if byte_rate else None
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _mp3_frame_info(b):
+    """Decodes a 4-byte MPEG audio frame header; None if it is not a valid one."""
+    if len(b) < 4 or b[0] != 0xFF or (b[1] & 0xE0) != 0xE0:
+        return None
+    version = {0: 25, 2: 2, 3: 1}.get((b[1] >> 3) & 3)
+    layer = {1: 3, 2: 2, 3: 1}.get((b[1] >> 1) & 3)
+    bitrate_idx, rate_idx = b[2] >> 4, (b[2] >> 2) & 3
+    if version is None or layer is None or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+    bitrate = _MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_idx] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_idx]
+    padding = (b[2] >> 1) & 1
+    mono = (b[3] >> 6) == 3
+    if layer == 1:
+        samples, length = 384, (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and version != 1:
+        samples, length = 576, 72 * bitrate // sample_rate + padding
+    else:
+        samples, length = 1152, 144 * bitrate // sample_rate + padding
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    return {"bitrate": bitrate, "sample_rate": sample_rate, "samples": samples, "length": length,
+            "side_info": side_info}
+
+
+def _mp3_duration(f, file_size):
+    head = f.read(10)
+    start = 0
+    if head[:3] == b"ID3" and len(head) == 10:
+        size = (head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F)
+        start = 10 + size + (10 if head[5] & 0x10 else 0)
+    f.seek(start)
+    buf = f.read(_MP3_SCAN_LIMIT)
+    for i in range(len(buf) - 4):
+        if buf[i] != 0xFF:
+            continue
+        info = _mp3_frame_info(buf[i:i + 4])
+        if not info:
+            continue
+        nxt = i + info["length"]
+        if nxt + 4 <= len(buf) and not _mp3_frame_info(buf[nxt:nxt + 4]):
+            continue  # false sync inside data
+        frame = buf[i:i + info["length"]]
+        # VBR files carry the total frame count in a Xing/Info or VBRI header in the first frame.
+        xing = 4 + info["side_info"]
+        frames = None
+        if frame[xing:xing + 4] in (b"Xing", b"Info") and len(frame) >= xing + 12:
+            flags = struct.unpack(">I", frame[xing + 4:xing + 8])[0]
+            if flags & 1:
+                frames = struct.unpack(">I", frame[xing + 8:xing + 12])[0]
+        elif frame[36:40] == b"VBRI" and len(frame) >= 54:
+            frames = struct.unpack(">I", frame[50:54])[0]
+        if frames:
+            return frames * info["samples"] / info["sample_rate"]
+        audio_bytes = file_size - start - i
+        f.seek(-128, os.SEEK_END)
+        if f.read(3) == b"TAG":
+            audio_bytes -= 128
+        return audio_bytes * 8 / info["bitrate"]
+    return None
+
+
+def header_duration(path):
+    """Duration in seconds read from a WAV/MP3 header, or None if the format is not recognised."""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            magic = f.read(4)
+            f.seek(0)
+            if magic == b"RIFF":
+                return _wav_duration(f)
+            return _mp3_duration(f, file_size)
+    except (OSError, struct.error, ZeroDivisionError):
+        return None
+
+
+def sound_length(path):
+    """Duration of a sound file in seconds, cached per (path, mtime, size); 0.0 if unknown."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0.0
+    key = (path, st.st_mtime, st.st_size)
+    with _cache_lock:
+        if key in _duration_cache:
+            return _duration_cache[key]
+    length = header_duration(path)
+    if length is None:
+        player = get_player()
+        length = player.length(path) if player else 0.0
+    with _cache_lock:
+        _duration_cache[key] = length
+    return length
+
+
+# --- OPTIONAL LOCAL PLAYBACK ---
+class PygamePlayer:
+    """Local playback through pygame.mixer; the mixer is opened on play() and closed on release()."""
+
+    def __init__(self, pygame):
+        self.pygame = pygame
+        self.channel = None
+
+    def _ensure_mixer(self):
+        if not self.pygame.mixer.get_init():
+            self.pygame.mixer.init()
+
+    def play(self, path, volume):
+        self._ensure_mixer()
+        sound = self.pygame.mixer.Sound(path)
+        sound.set_volume(volume)
+        self.channel = sound.play()
+        return sound.get_length()
+
+    def length(self, path):
+        opened = not self.pygame.mixer.get_init()
+        self._ensure_mixer()
+        try:
+            return self.pygame.mixer.Sound(path).get_length()
+        finally:
+            if opened and self.channel is None:
+                self.pygame.mixer.quit()
+
+    def set_volume(self, volume):
+        if self.channel:
+            self.channel.set_volume(volume)
+
+    def fadeout(self, ms):
+        if self.channel:
+            self.channel.fadeout(ms)
+
+    def stop(self):
+        if self.channel:
+            self.channel.stop()
+            self.channel = None
+        elif self.pygame.mixer.get_init():
+            self.pygame.mixer.stop()
+
+    def release(self):
+        """Stops playback and closes the audio device."""
+        self.stop()
+        if self.pygame.mixer.get_init():
+            self.pygame.mixer.quit()
+
+
+_player = {"player": None, "loaded": False}
+_player_lock = threading.Lock()
+
+
+def get_player():
+    """The local playback backend, imported on first use; None if pygame is unavailable."""
+    with _player_lock:
+        if not _player["loaded"]:
+            _player["loaded"] = True
+            try:
+                os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+                _player["player"] = PygamePlayer(importlib.import_module("pygame"))
+            except Exception as e:
+                print(f"Local audio unavailable: {e}")
+        return _player["player"]
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.mock_feed import MockFeedServer, FeedScenario
+
+
+@pytest.fixture
+def mock_feed():
+    with MockFeedServer(FeedScenario(burst_size=5, seed=1)) as server:
+        yield server
+
+
+@pytest.fixture(params=["waitress", "builtin"])
+def overlay_url(request):
+    """Serves the real overlay app through OverlayServer on an ephemeral port."""
+    from overlay_server import GLOBAL_CONFIG, OverlayServer
+    config = dict(GLOBAL_CONFIG, overlay_host="127.0.0.1", overlay_port=0, overlay_server=request.param)
+    server = OverlayServer(config).start()
+    yield f"http://127.0.0.1:{server.port}"
+    server.stop()
@@ -0,0 +1,31 @@
+# Stand-in for the headless Chrome worker process, for exercising
+# BrowserSupervisor without Chrome: pass fake_worker as its target= and pick
+# the failure with options["mode"]. Lives in its own module because the
+# supervisor spawns workers, and a spawned child has to import its target.
+#
+#   "recycle"  sends one batch of events, then asks to be recycled
+#   "crash"    sends one batch of events, then exits without a word
+#   "hang"     sends a heartbeat, then stops answering (and ignores stop)
+
+import time
+
+from benchmarks.mock_feed import make_repost_item
+
+
+def fake_worker(options, out_queue, stop_event):
+    def send(kind, **payload):
+        out_queue.put(dict(payload, type=kind, ts=time.time()))
+
+    mode = options.get("mode", "recycle")
+    send("heartbeat", cycles=0)
+    if mode == "hang":
+        time.sleep(60)
+        return
+    item = make_repost_item(options.get("n", 1))
+    event = {"id": str(item["id"]), "kind": "repost", "type": item["type"], "user": item["user"]["username"],
+             "video": item["video"]["title"]}
+    send("events", events=[event], parse_seconds=0.001, cycle_seconds=0.01)
+    send("heartbeat", cycles=1)
+    if mode == "recycle":
+        send("recycle", reason="cycles")
+        stop_event.wait(5)
@@ -0,0 +1,235 @@
+# --- LOCAL RUMBLE FEED STAND-IN ---
+# Replays the recorded user.notification_feed JSON and notification dropdown
+# HTML from benchmarks/fixtures, injecting bursts of new reposts, server
+# errors and 403s so the tracker can be exercised with no network.
+#
+#   python -m benchmarks.mock_feed --port 8765 --burst 5 --error-rate 0.05
+
+import os
+import json
+import hashlib
+import time
+import html
+import random
+import argparse
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FEED_FIXTURE = os.path.join(FIXTURE_DIR, "notification_feed.json")
+HTML_FIXTURE = os.path.join(FIXTURE_DIR, "notification_list.html")
+
+FEED_PATH = "/service.php"
+HTML_PATHS = ("/", "/404", "/notifications")
+
+
+@dataclass
+class FeedScenario:
+    burst_size: int = 0          # new reposts added to the top of the feed on every poll
+    burst_chance: float = 1.0    # probability that a poll gets its burst at all
+    error_rate: float = 0.0      # fraction of polls answered with HTTP 500
+    forbidden_rate: float = 0.0  # fraction of polls answered with HTTP 403
+    latency: float = 0.0         # seconds to sleep before answering
+    limit: int = 25              # items per page, like the real endpoint
+    etag: bool = False           # send ETag and answer matching If-None-Match with 304
+    rotate_cookie: bool = False  # re-issue the session cookie (Set-Cookie) on every successful response
+    seed: int = None
+
+
+def load_recorded_items(path=FEED_FIXTURE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["data"]["items"]
+
+
+def make_repost_item(n, created_on=None, video_title="Live: Friday Night Q&A"):
+    """Builds one synthetic video_reposted item shaped like the recorded ones."""
+    username = f"Raider{n:05d}"
+    if created_on is None:
+        created_on = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+    return {
+        "id": 100000 + n,
+        "type": "video_reposted",
+        "user": {"id": 200000 + n, "username": username, "name": username},
+        "video": {"id": 900, "title": video_title, "url": "/v900-video.html"},
+        "body": f'{username} reposted your video "{video_title}"',
+        "created_on": created_on,
+    }
+
+
+def make_feed_page(items, limit=25):
+    return {"data": {"items": list(items[:limit])}}
+
+
+def render_notification_html(items, limit=25):
+    """Renders items the way Rumble's notification dropdown does."""
+    rows = []
+    for item in items[:limit]:
+        user = item.get("user", {}).get("username", "Unknown")
+        body = item.get("body", "")
+        rest = body[len(user):] if body.startswith(user) else " " + body
+        rows.append(
+            '      <li class="user-notifications--item">\n'
+            '        <div class="user-notifications--text">\n'
+            f'          <div class="user-notifications--body"><a href="/user/{html.escape(user)}">'
+            f'{html.escape(user)}</a>{html.escape(rest)}</div>\n'
+            f'          <div class="user-notifications--time">{html.escape(str(item.get("created_on", "")))}</div>\n'
+            '        </div>\n'
+            '      </li>')
+    return ("<!DOCTYPE html>\n<html>\n<head><title>Rumble</title></head>\n<body>\n  <header>\n"
+            '    <button class="user-notifications--bell-button" type="button">Notifications</button>\n'
+            '    <ul class="user-notifications--list">\n' + "\n".join(rows) + "\n    </ul>\n"
+            "  </header>\n</body>\n</html>\n")
+
+
+class MockFeedServer:
+    """Threaded HTTP stand-in for rumble.com. Use as a context manager or start()/stop()."""
+
+    def __init__(self, scenario=None, host="127.0.0.1", port=0, feed_fixture=FEED_FIXTURE):
+        self.scenario = scenario or FeedScenario()
+        self.host = host
+        self.port = port
+        self.items = load_recorded_items(feed_fixture)
+        self.rng = random.Random(self.scenario.seed)
+        self.counter = 0
+        self.status_counts = {}
+        self.cookies_issued = 0
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def feed_url(self):
+        return f"{self.base_url}{FEED_PATH}?name=user.notification_feed&limit={self.scenario.limit}"
+
+    @property
+    def html_url(self):
+        return f"{self.base_url}/notifications"
+
+    def _next_status(self):
+        roll = self.rng.random()
+        if roll < self.scenario.forbidden_rate:
+            return 403
+        if roll < self.scenario.forbidden_rate + self.scenario.error_rate:
+            return 500
+        return 200
+
+    def _advance(self):
+        """Adds this poll's burst to the top of the feed and returns the current page of items."""
+        burst = self.scenario.burst_size
+        if burst and self.scenario.burst_chance < 1.0 and self.rng.random() >= self.scenario.burst_chance:
+            burst = 0
+        for _ in range(burst):
+            self.counter += 1
+            self.items.insert(0, make_repost_item(self.counter))
+        del self.items[self.scenario.limit * 4:]
+        return list(self.items[:self.scenario.limit])
+
+    def handle(self, path, if_none_match=None):
+        if self.scenario.latency:
+            time.sleep(self.scenario.latency)
+        with self.lock:
+            status = self._next_status()
+            items = self._advance() if status == 200 else None
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if status != 200:
+            return status, "text/plain", b"Forbidden" if status == 403 else b"Server Error"
+        if path == FEED_PATH:
+            body = json.dumps(make_feed_page(items, self.scenario.limit)).encode("utf-8")
+            if self.scenario.etag:
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if if_none_match == etag:
+                    with self.lock:
+                        self.status_counts[200] -= 1
+                        self.status_counts[304] = self.status_counts.get(304, 0) + 1
+                    return 304, "application/json", b"", etag
+                return 200, "application/json", body, etag
+            return 200, "application/json", body
+        if path in HTML_PATHS:
+            return 200, "text/html; charset=utf-8", render_notification_html(items).encode("utf-8")
+        return 404, "text/plain", b"Not Found"
+
+    def issue_cookie(self):
+        with self.lock:
+            self.cookies_issued += 1
+            return f"session{self.cookies_issued}"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path == FEED_PATH and parse_qs(parsed.query).get("name") != ["user.notification_feed"]:
+                    status, ctype, body = 404, "text/plain", b"Unknown service"
+                else:
+                    status, ctype, body, *etag = server.handle(parsed.path, self.headers.get("If-None-Match"))
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                if etag:
+                    self.send_header("ETag", etag[0])
+                if server.scenario.rotate_cookie and status == 200:
+                    self.send_header("Set-Cookie", f"u_s={server.issue_cookie()}; Path=/; HttpOnly; Max-Age=86400")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Rumble's notification feed.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--burst", type=int, default=0, help="new reposts per poll")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--etag", action="store_true", help="support If-None-Match / 304")
+    args = parser.parse_args()
+
+    scenario = FeedScenario(burst_size=args.burst, error_rate=args.error_rate,
+                            forbidden_rate=args.forbidden_rate, latency=args.latency, seed=args.seed,
+                            etag=args.etag)
+    server = MockFeedServer(scenario, host=args.host, port=args.port).start()
+    print(f"Mock feed: {server.feed_url}")
+    print(f"Mock HTML: {server.html_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Local stand-in for OBS's obs-websocket v5 server. Speaks just enough of the
+# protocol (Hello/Identify with optional auth, Request, RequestBatch) for the
+# requests the OBS output uses, and records the resulting "scene": text source
+# contents, scene item visibility and media restarts.
+#
+#   python -m benchmarks.mock_obs --port 4455 --password secret
+
+import json
+import time
+import base64
+import argparse
+import threading
+
+from websockets.sync.server import serve
+
+import obs_output
+
+
+class MockOBS:
+    """Threaded obs-websocket stand-in. Use as a context manager or start()/stop()."""
+
+    def __init__(self, scene="Main", sources=("Repost Alert",), password="", host="127.0.0.1", port=0):
+        self.scene = scene
+        self.items = {name: i + 1 for i, name in enumerate(sources)}
+        self.password = password
+        self.host = host
+        self.port = port
+        self.enabled = {}
+        self.inputs = {}
+        self.media_restarts = {}
+        self.requests = []
+        self.batches = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def _status(self, ok=True, code=100, comment=None):
+        status = {"result": ok, "code": code}
+        if comment:
+            status["comment"] = comment
+        return status
+
+    def execute(self, request_type, data):
+        """Runs one request against the fake scene; returns (requestStatus, responseData)."""
+        with self.lock:
+            self.requests.append(request_type)
+            if request_type == "GetCurrentProgramScene":
+                return self._status(), {"currentProgramSceneName": self.scene, "sceneName": self.scene}
+            if request_type == "GetSceneItemId":
+                if data.get("sceneName") != self.scene or data.get("sourceName") not in self.items:
+                    return self._status(False, 600, "No scene items were found with the specified parameters."), None
+                return self._status(), {"sceneItemId": self.items[data["sourceName"]]}
+            if request_type == "SetSceneItemEnabled":
+                self.enabled[data["sceneItemId"]] = data["sceneItemEnabled"]
+                return self._status(), None
+            if request_type == "SetInputSettings":
+                self.inputs.setdefault(data["inputName"], {}).update(data["inputSettings"])
+                return self._status(), None
+            if request_type == "TriggerMediaInputAction":
+                self.media_restarts[data["inputName"]] = self.media_restarts.get(data["inputName"], 0) + 1
+                return self._status(), None
+            return self._status(False, 204, f"Unknown request type {request_type}"), None
+
+    def handler(self, ws):
+        with self.lock:
+            self.connections += 1
+        hello = {"obsWebSocketVersion": "5.5.0", "rpcVersion": obs_output.RPC_VERSION}
+        salt = challenge = ""
+        if self.password:
+            salt = base64.b64encode(b"mock-salt").decode()
+            challenge = base64.b64encode(str(time.time()).encode()).decode()
+            hello["authentication"] = {"salt": salt, "challenge": challenge}
+        ws.send(json.dumps({"op": obs_output.OP_HELLO, "d": hello}))
+        identify = json.loads(ws.recv())
+        if identify.get("op") != obs_output.OP_IDENTIFY or (
+                self.password and identify["d"].get("authentication") !=
+                obs_output.auth_string(self.password, salt, challenge)):
+            ws.close(4009, "Authentication failed.")
+            return
+        ws.send(json.dumps({"op": obs_output.OP_IDENTIFIED, "d": {"negotiatedRpcVersion": 1}}))
+        for raw in ws:
+            msg = json.loads(raw)
+            d = msg.get("d", {})
+            if msg.get("op") == obs_output.OP_REQUEST:
+                status, data = self.execute(d["requestType"], d.get("requestData") or {})
+                reply = {"requestType": d["requestType"], "requestId": d["requestId"], "requestStatus": status}
+                if data is not None:
+                    reply["responseData"] = data
+                ws.send(json.dumps({"op": obs_output.OP_REQUEST_RESPONSE, "d": reply}))
+            elif msg.get("op") == obs_output.OP_REQUEST_BATCH:
+                with self.lock:
+                    self.batches += 1
+                results = []
+                for r in d.get("requests", []):
+                    status, data = self.execute(r["requestType"], r.get("requestData") or {})
+                    result = {"requestType": r["requestType"], "requestStatus": status}
+                    if data is not None:
+                        result["responseData"] = data
+                    results.append(result)
+                ws.send(json.dumps({"op": obs_output.OP_REQUEST_BATCH_RESPONSE,
+                                    "d": {"requestId": d["requestId"], "results": results}}))
+
+    def visible(self, source):
+        with self.lock:
+            return self.enabled.get(self.items[source], False)
+
+    def start(self):
+        self.server = serve(self.handler, self.host, self.port, subprotocols=[obs_output.OBS_SUBPROTOCOL])
+        self.port = self.server.socket.getsockname()[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for OBS's obs-websocket v5 server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4455)
+    parser.add_argument("--password", default="")
+    parser.add_argument("--scene", default="Main")
+    parser.add_argument("--source", default="Repost Alert", help="scene item the OBS output toggles")
+    args = parser.parse_args()
+
+    obs = MockOBS(args.scene, (args.source,), args.password, args.host, args.port).start()
+    print(f"Mock OBS: {obs.url}")
+    try:
+        while True:
+            time.sleep(1)
+            with obs.lock:
+                print(f"\r{obs.batches} batches, visible={obs.enabled}, inputs={obs.inputs}", end="")
+    except KeyboardInterrupt:
+        obs.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Local stand-in for an outbound alert webhook (chat bot, stream deck bridge,
+# logging service). Records every batch it receives and can be made slow or
+# failing, to check that a bad sink never holds up detection or the overlay.
+#
+#   python -m benchmarks.mock_sink --port 9000 --delay 2 --error-rate 0.3
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockWebhookServer:
+    """Threaded HTTP webhook receiver. Use as a context manager or start()/stop()."""
+
+    def __init__(self, delay=0.0, error_rate=0.0, fail_first=0, host="127.0.0.1", port=0, seed=None, record=True):
+        self.delay = delay
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.record = record  # False: only count alerts (long soak runs)
+        self.received = 0
+        self.batches = []
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/alerts"
+
+    @property
+    def alerts(self):
+        with self.lock:
+            return [alert for batch in self.batches for alert in batch]
+
+    def handle(self, body):
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.requests += 1
+            if self.requests <= self.fail_first or self.rng.random() < self.error_rate:
+                return 503
+            alerts = json.loads(body)["alerts"]
+            self.received += len(alerts)
+            if self.record:
+                self.batches.append(alerts)
+        return 204
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status = server.handle(body)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for an outbound alert webhook.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before answering each request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server = MockWebhookServer(delay=args.delay, error_rate=args.error_rate, host=args.host, port=args.port).start()
+    print(f"Mock webhook: {server.url}")
+    try:
+        while True:
+            time.sleep(1)
+            with server.lock:
+                print(f"\r{server.requests} requests, {sum(len(b) for b in server.batches)} alerts", end="")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# --- REPLAY / RAID SIMULATION ---
+# Drives the real alert pipeline (TrackerPipeline) from recorded or synthetic
+# notification_feed pages at 1x-100x speed: raw body -> parse -> dedupe ->
+# route -> journal -> history -> REPOST_QUEUE -> AlertPresenter -> /api/data
+# (served by OverlayServer) -> a polling overlay client. Reports throughput, latency percentiles and any alerts
+# that were dropped, duplicated or never seen by the overlay.
+#
+#   python -m benchmarks.replay --speed 50 --polls 20 --burst 8
+#   python -m benchmarks.replay --pages recorded_polls.jsonl --speed 10 --min-display 6 --gap 2
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+from collections import Counter
+
+import requests
+
+from alert_journal import AlertJournal
+from tracker_pipeline import TrackerPipeline
+from overlay_server import (GLOBAL_CONFIG, TRACKER_STATE, REPOST_QUEUE, STATE_LISTENERS, JOURNAL, ALERT_MIN_DISPLAY,
+                            ALERT_GAP, AlertPresenter, OverlayServer)
+from benchmarks.mock_feed import load_recorded_items, make_repost_item, make_feed_page
+
+MIN_SPEED, MAX_SPEED = 1.0, 100.0
+OVERLAY_POLL = 0.5  # seconds between /api/data polls in the real overlay
+
+
+def synthetic_pages(polls, burst, limit=25):
+    """Raw feed bodies as a raid would produce them: `burst` new reposts on top of every poll."""
+    items = load_recorded_items()
+    pages = []
+    n = 0
+    for _ in range(polls):
+        for _ in range(burst):
+            n += 1
+            items.insert(0, make_repost_item(n))
+        pages.append(json.dumps(make_feed_page(items, limit)).encode("utf-8"))
+    return pages
+
+
+def load_pages(path):
+    """Recorded poll bodies: a JSONL file with one notification_feed response per line, or one JSON page."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    lines = [line for line in raw.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return lines
+    return [raw]
+
+
+def percentiles(values, points=(50, 95, 99)):
+    if not values:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(values)
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))] for p in points}
+
+
+class Replay:
+    def __init__(self, pages, speed=10.0, poll_interval=None, min_display=ALERT_MIN_DISPLAY, gap=ALERT_GAP,
+                 overlay=True, config=None, workdir=None):
+        self.pages = pages
+        self.speed = min(max(float(speed), MIN_SPEED), MAX_SPEED)
+        self.poll_interval = float(poll_interval if poll_interval is not None else GLOBAL_CONFIG["poll_interval"])
+        self.min_display = min_display
+        self.gap = gap
+        self.overlay = overlay
+        self.config = config or GLOBAL_CONFIG
+        self.workdir = workdir or tempfile.mkdtemp(prefix="rumble-replay-")
+        self.pipeline = None
+        self.expected = []     # journal ids in detection order
+        self.detections = Counter()  # (kind, user, video, created_on) -> times it was queued
+        self.shown = []        # (journal id, wall time) per show_alert
+        self.overlay_seen = {}  # journal id -> wall time the polling overlay first saw it
+        self.queued_at = {}
+        self._last_alert_id = TRACKER_STATE["alert_id"]
+        self._done = threading.Event()
+
+    def publish(self, raw):
+        # Every queued alert carries the journal_id the pipeline gave it; that is what the replay tracks.
+        for alert in reversed(self.pipeline.publish_raw(raw, "replay")):
+            self.expected.append(alert["journal_id"])
+            self.detections[(alert.get("kind"), alert["user"], alert["video"], alert.get("created_on"))] += 1
+            self.queued_at[alert["journal_id"]] = alert["queued_at"]
+
+    def _on_state(self, kind, payload):
+        data = payload["data"]
+        if kind == "state" and data["alert_id"] != self._last_alert_id and data["is_visible"]:
+            self._last_alert_id = data["alert_id"]
+            alert = data["current_alert"] or {}
+            if "journal_id" in alert:
+                self.shown.append((alert["journal_id"], time.time()))
+
+    def _overlay_client(self, url):
+        session = requests.Session()
+        interval = max(OVERLAY_POLL / self.speed, 0.005)
+        while not self._done.is_set():
+            try:
+                data = session.get(url, timeout=5).json()["data"]
+                alert = data.get("current_alert") or {}
+                if data.get("is_visible") and alert.get("journal_id") not in (None, *self.overlay_seen):
+                    self.overlay_seen[alert["journal_id"]] = time.time()
+            except (requests.RequestException, ValueError):
+                pass
+            self._done.wait(interval)
+
+    def run(self, drain_timeout=600):
+        journal = AlertJournal(os.path.join(self.workdir, "alert_journal.jsonl"))
+        previous_journal, JOURNAL["journal"] = JOURNAL["journal"], journal
+        self.pipeline = TrackerPipeline(set(), journal=journal, config=self.config, log=lambda msg: None,
+                                        history_path=os.path.join(self.workdir, "repost_history.json"))
+        STATE_LISTENERS.append(self._on_state)
+        presenter = AlertPresenter(min_display=self.min_display / self.speed, gap=self.gap / self.speed)
+        threading.Thread(target=presenter.run, daemon=True).start()
+        server = client = None
+        if self.overlay:
+            server = OverlayServer(dict(GLOBAL_CONFIG, overlay_host="127.0.0.1", overlay_port=0)).start()
+            client = threading.Thread(target=self._overlay_client,
+                                      args=(f"http://127.0.0.1:{server.port}/api/data",), daemon=True)
+            client.start()
+        start = time.time()
+        try:
+            for i, raw in enumerate(self.pages):
+                if i:
+                    time.sleep(self.poll_interval / self.speed)
+                self.publish(raw)
+            feed_done = time.time()
+            deadline = time.time() + drain_timeout
+            while REPOST_QUEUE.unfinished_tasks and time.time() < deadline:
+                time.sleep(0.01)
+            end = time.time()
+        finally:
+            self._done.set()
+            presenter.stop()
+            STATE_LISTENERS.remove(self._on_state)
+            JOURNAL["journal"] = previous_journal
+            journal.close()
+            if client:
+                client.join(2)
+            if server:
+                server.stop()
+        return self.report(start, feed_done, end)
+
+    def report(self, start, feed_done, end):
+        shown_counts = Counter(rid for rid, _ in self.shown)
+        first_shown = {}
+        for rid, ts in self.shown:
+            first_shown.setdefault(rid, ts)
+        expected = set(self.expected)
+        wall = max(end - start, 1e-9)
+        to_screen = [first_shown[rid] - self.queued_at[rid] for rid in first_shown if rid in self.queued_at]
+        to_overlay = [ts - self.queued_at[rid] for rid, ts in self.overlay_seen.items() if rid in self.queued_at]
+        return {
+            "speed": self.speed,
+            "polls": len(self.pages),
+            "alerts_expected": len(expected),
+            "alerts_shown": len(first_shown),
+            "dropped": sorted(expected - set(first_shown)),
+            "duplicated": sorted(rid for rid, n in shown_counts.items() if n > 1),
+            "duplicate_detections": sum(n - 1 for n in self.detections.values()),
+            "overlay_missed": sorted(set(first_shown) - set(self.overlay_seen)) if self.overlay else [],
+            "wall_seconds": round(wall, 3),
+            "stream_seconds": round(wall * self.speed, 1),
+            "feed_seconds": round(feed_done - start, 3),
+            "alerts_per_stream_minute": round(len(first_shown) / (wall * self.speed) * 60, 2),
+            # Latencies are reported in stream time (wall time x speed).
+            "detect_to_shown": {k: None if v is None else round(v * self.speed, 3)
+                                for k, v in percentiles(to_screen).items()},
+            "detect_to_overlay": {k: None if v is None else round(v * self.speed, 3)
+                                  for k, v in percentiles(to_overlay).items()},
+        }
+
+
+def format_report(report):
+    lines = [
+        f"Replay at {report['speed']:g}x: {report['polls']} polls, {report['stream_seconds']}s of stream time "
+        f"in {report['wall_seconds']}s",
+        f"  alerts shown       {report['alerts_shown']}/{report['alerts_expected']} "
+        f"({report['alerts_per_stream_minute']}/min of stream)",
+        f"  dropped            {len(report['dropped'])}",
+        f"  duplicated         {len(report['duplicated'])} (repeat detections: {report['duplicate_detections']})",
+        f"  missed by overlay  {len(report['overlay_missed'])}",
+    ]
+    for name in ("detect_to_shown", "detect_to_overlay"):
+        p = report[name]
+        if p["p50"] is None:
+            lines.append(f"  {name:<18} no data")
+        else:
+            lines.append(f"  {name:<18} p50={p['p50']}s p95={p['p95']}s p99={p['p99']}s")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay notification_feed pages through the alert pipeline.")
+    parser.add_argument("--pages", help="JSONL of recorded feed responses (one per poll) or a single JSON page")
+    parser.add_argument("--polls", type=int, default=10, help="synthetic polls when --pages is not given")
+    parser.add_argument("--burst", type=int, default=5, help="new reposts per synthetic poll")
+    parser.add_argument("--speed", type=float, default=10.0, help=f"{MIN_SPEED:g}-{MAX_SPEED:g}x")
+    parser.add_argument("--poll-interval", type=float, default=None, help="seconds (default: poll_interval)")
+    parser.add_argument("--min-display", type=float, default=ALERT_MIN_DISPLAY)
+    parser.add_argument("--gap", type=float, default=ALERT_GAP)
+    parser.add_argument("--no-overlay", action="store_true", help="skip the /api/data overlay client")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages) if args.pages else synthetic_pages(args.polls, args.burst)
+    replay = Replay(pages, speed=args.speed, poll_interval=args.poll_interval, min_display=args.min_display,
+                    gap=args.gap, overlay=not args.no_overlay)
+    report = replay.run()
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    if report["dropped"] or report["duplicated"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# --- SOAK / LEAK HARNESS ---
+# Runs the app's headless tracker pipeline (TrackerPipeline.poll_feed) for
+# simulated hours against the local feed stand-in: fetch (ETag/304, rotated
+# cookies saved back) -> parse -> dedupe -> route (analytics, leaderboard) ->
+# journal -> history -> queue -> webhook sink -> AlertPresenter -> live
+# channel overlay that acks renders + a polling /api/data client, with log
+# lines drained through the UI bus into a capped buffer like the GUI's. Every sample it records tracemalloc, thread count,
+# open file descriptors/handles and the RSS of this process and its children,
+# then reports growth per stream hour (least-squares slope after warm-up) and
+# the allocation sites that grew the most. Exit code 1 if anything grows
+# faster than the limits.
+#
+#   python -m benchmarks.soak --hours 8 --speed 600
+#   python -m benchmarks.soak --hours 12 --speed 1200 --reposts-per-hour 400 --json
+
+import os
+import json
+import time
+import queue
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from collections import deque
+
+import requests
+
+import metrics
+import cookie_jar
+from repost_store import RepostStore
+from alert_journal import AlertJournal
+from alert_sinks import AlertSinks, WebhookSink
+from live_channel import LiveChannel
+from tracker_pipeline import TrackerPipeline
+from ui_bus import UIEventBus, MAX_LOG_LINES
+from overlay_server import (GLOBAL_CONFIG, JOURNAL, STATE_LISTENERS, AlertPresenter, OverlayServer, state_snapshot,
+                            handle_overlay_ack)
+from benchmarks.mock_feed import MockFeedServer, FeedScenario
+from benchmarks.mock_sink import MockWebhookServer
+from benchmarks.replay import percentiles
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from websockets.sync.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
+OVERLAY_POLL = 0.5
+WARMUP_FRACTION = 0.1
+TOP_ALLOCATIONS = 10
+# The stand-ins run in this process too; keep their allocations out of the top list.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, "*/benchmarks/*"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def open_handles():
+    """Open file descriptors (POSIX) or handles (Windows) of this process; None if unknown."""
+    if psutil is not None:
+        proc = psutil.Process()
+        try:
+            return proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()
+        except psutil.Error:
+            return None
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def process_rss():
+    """(own RSS, summed RSS of all child processes) in bytes; (None, None) without psutil."""
+    if psutil is None:
+        return None, None
+    proc = psutil.Process()
+    children = 0
+    for child in proc.children(recursive=True):
+        try:
+            children += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return proc.memory_info().rss, children
+
+
+def _poll_counts(since=None):
+    """{"polls": n, "errors": n} from the feed poll metrics, optionally relative to an earlier reading."""
+    counts = {"polls": 0, "errors": 0}
+    for (status,), value in metrics.POLL_RESPONSES.items():
+        counts["polls"] += value
+        if status not in ("200", "304"):
+            counts["errors"] += value
+    if since:
+        counts = {k: v - since[k] for k, v in counts.items()}
+    return counts
+
+
+def slope(points):
+    """Least-squares slope of [(x, y), ...]; None with fewer than two distinct x values."""
+    points = [(x, y) for x, y in points if y is not None]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+class Soak:
+    def __init__(self, hours=8.0, speed=600.0, poll_interval=None, reposts_per_hour=120, sample_minutes=15,
+                 error_rate=0.01, min_display=10.0, gap=5.0, workdir=None, seed=1, frames=10):
+        self.hours = hours
+        self.speed = speed
+        self.poll_interval = float(poll_interval if poll_interval is not None else GLOBAL_CONFIG["poll_interval"])
+        self.sample_every = sample_minutes * 60.0
+        self.min_display = min_display
+        self.gap = gap
+        self.frames = frames
+        repost_chance = min(1.0, reposts_per_hour * self.poll_interval / 3600.0)
+        self.scenario = FeedScenario(burst_size=1, burst_chance=repost_chance, error_rate=error_rate, etag=True,
+                                     rotate_cookie=True, seed=seed)
+        self.workdir = workdir or tempfile.mkdtemp(prefix="rumble-soak-")
+        self.seen = set()
+        self.alert_queue = queue.Queue()
+        self.ui_bus = UIEventBus()
+        self.log_lines = deque(maxlen=MAX_LOG_LINES)
+        self.samples = []
+        self.snapshots = {}
+        self.counts = {"polls": 0, "errors": 0, "alerts": 0, "delivered": 0}
+        self.pipeline = None
+        self._done = threading.Event()
+
+    def log(self, msg):
+        self.ui_bus.log(msg)
+
+    def _session_data(self):
+        """A saved login for the stand-in; the feed rotates its cookie on every new page, as Rumble may."""
+        cookie = {"name": "u_s", "value": "session0", "domain": "127.0.0.1", "path": "/", "secure": False,
+                  "httpOnly": True, "expiry": int(time.time()) + 30 * 86400}
+        session_data = {"cookies": [cookie], "user_agent": "RumbleRepostTracker soak"}
+        cookie_jar.save_session(self.cookies_path, session_data)
+        return session_data
+
+    @property
+    def cookies_path(self):
+        return os.path.join(self.workdir, "saved_cookies.json")
+
+    def _overlay_client(self, url):
+        session = requests.Session()
+        session.trust_env = False  # local only; skips the per-request proxy lookup
+        interval = max(OVERLAY_POLL / self.speed, 0.1)
+        while not self._done.is_set():
+            try:
+                session.get(url, timeout=5).json()
+            except (requests.RequestException, ValueError):
+                pass
+            self._done.wait(interval)
+        session.close()
+
+    def _live_client(self, url):
+        """An overlay on the live channel: acks every alert it renders, which is what clears the journal."""
+        last = 0
+        with ws_connect(url, open_timeout=5, close_timeout=1) as ws:
+            while not self._done.is_set():
+                try:
+                    msg = json.loads(ws.recv(timeout=0.2))
+                except TimeoutError:
+                    continue
+                data = msg.get("data") or {}
+                if data.get("is_visible") and data.get("alert_id", 0) > last:
+                    last = data["alert_id"]
+                    ws.send(json.dumps({"type": "ack", "event": "render", "id": last}))
+
+    def _drain_ui(self):
+        logs, _, _ = self.ui_bus.drain()
+        self.log_lines.extend(f"[{ts}] {msg}" for ts, msg in logs)
+
+    # --- sampling ---
+    def sample(self, stream_seconds, journal):
+        traced, peak = tracemalloc.get_traced_memory()
+        rss, child_rss = process_rss()
+        self.samples.append({
+            "stream_hours": stream_seconds / 3600.0,
+            "traced_bytes": traced,
+            "traced_peak": peak,
+            "threads": threading.active_count(),
+            "handles": open_handles(),
+            "rss_bytes": rss,
+            "child_rss_bytes": child_rss,
+            "seen_ids": len(self.seen),
+            "journal_pending": len(journal.pending),
+            "log_lines": len(self.log_lines),
+            "queue_depth": self.alert_queue.qsize(),
+        })
+
+    def run(self):
+        tracemalloc.start(self.frames)
+        polls_before = _poll_counts()
+        journal = AlertJournal(os.path.join(self.workdir, "alert_journal.jsonl"))
+        store = RepostStore(os.path.join(self.workdir, "repost_analytics.db"))
+        webhook = MockWebhookServer(record=False).start()
+        sinks = AlertSinks([WebhookSink("soak", webhook.url)]).start()
+        previous_journal, JOURNAL["journal"] = JOURNAL["journal"], journal
+        self.pipeline = TrackerPipeline(self.seen, journal=journal, store=store, sinks=sinks,
+                                        alert_queue=self.alert_queue, log=self.log,
+                                        history_path=os.path.join(self.workdir, "repost_history.json"))
+        feed = MockFeedServer(self.scenario).start()
+        overlay = OverlayServer(dict(GLOBAL_CONFIG, overlay_host="127.0.0.1", overlay_port=0)).start()
+        live = LiveChannel(host="127.0.0.1", port=0, snapshot=state_snapshot, on_ack=handle_overlay_ack).start()
+        STATE_LISTENERS.append(live.broadcast)
+        # Long enough on screen for the live overlay's render ack to arrive, as it would at 1x.
+        presenter = AlertPresenter(alert_queue=self.alert_queue, min_display=max(self.min_display / self.speed, 0.1),
+                                   gap=self.gap / self.speed)
+        threading.Thread(target=presenter.run, name="soak-presenter", daemon=True).start()
+        clients = [threading.Thread(target=self._overlay_client, args=(f"http://127.0.0.1:{overlay.port}/api/data",),
+                                    name="soak-overlay", daemon=True)]
+        if ws_connect is not None and live.available:
+            clients.append(threading.Thread(target=self._live_client, args=(f"ws://127.0.0.1:{live.port}",),
+                                            name="soak-live-overlay", daemon=True))
+        for client in clients:
+            client.start()
+        stop = threading.Event()
+        fetch = threading.Thread(target=self.pipeline.poll_feed, name="soak-fetch",
+                                 args=(stop, self._session_data(), self.cookies_path),
+                                 kwargs={"url": feed.feed_url, "renew_url": feed.base_url + "/",
+                                         "poll_interval": self.poll_interval / self.speed, "timeout": 5})
+        total = self.hours * 3600.0
+        warmup = total * WARMUP_FRACTION
+        next_sample = 0.0
+        start = time.time()
+        fetch.start()
+        try:
+            while True:
+                # Stream time advances with the polls the real fetch loop actually made.
+                stream = _poll_counts(polls_before)["polls"] * self.poll_interval
+                self._drain_ui()
+                if stream >= next_sample:
+                    self.sample(stream, journal)
+                    if "baseline" not in self.snapshots and stream >= warmup:
+                        self.snapshots["baseline"] = tracemalloc.take_snapshot()
+                    next_sample += self.sample_every
+                if stream > total:
+                    break
+                time.sleep(min(0.05, self.poll_interval / self.speed))
+            self.snapshots["final"] = tracemalloc.take_snapshot()
+        finally:
+            stop.set()
+            fetch.join(10)
+            presenter.stop()
+            self._done.set()
+            for client in clients:
+                client.join(2)
+            feed.stop()
+            overlay.stop()
+            STATE_LISTENERS.remove(live.broadcast)
+            live.stop()
+            sinks.stop()
+            webhook.stop()
+            JOURNAL["journal"] = previous_journal
+            journal.close()
+            store.close()
+            tracemalloc.stop()
+        self.counts = dict(_poll_counts(polls_before), alerts=self.pipeline.published, delivered=webhook.received)
+        return self.report(time.time() - start, warmup / 3600.0)
+
+    def report(self, wall, warmup_hours):
+        steady = [s for s in self.samples if s["stream_hours"] >= warmup_hours] or self.samples
+        growth = {}
+        for key in ("traced_bytes", "threads", "handles", "rss_bytes", "child_rss_bytes", "seen_ids",
+                    "journal_pending", "log_lines"):
+            growth[key] = slope([(s["stream_hours"], s[key]) for s in steady])
+        top = []
+        if "baseline" in self.snapshots and "final" in self.snapshots:
+            final = self.snapshots["final"].filter_traces(SNAPSHOT_FILTERS)
+            diff = final.compare_to(self.snapshots["baseline"].filter_traces(SNAPSHOT_FILTERS), "lineno")
+            for stat in diff[:TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                top.append({"site": f"{frame.filename}:{frame.lineno}", "size_diff": stat.size_diff,
+                            "count_diff": stat.count_diff, "size": stat.size})
+        first, last = self.samples[0], self.samples[-1]
+        return {
+            "stream_hours": round(last["stream_hours"], 2),
+            "wall_seconds": round(wall, 1),
+            "speed": self.speed,
+            "effective_speed": round(last["stream_hours"] * 3600.0 / max(wall, 1e-9), 1),
+            "polls": self.counts["polls"],
+            "alerts": self.counts["alerts"],
+            "sink_delivered": self.counts["delivered"],
+            "errors": self.counts["errors"],
+            "samples": len(self.samples),
+            "start": first,
+            "warm": steady[0],
+            "end": last,
+            "growth_per_hour": {k: None if v is None else round(v, 3) for k, v in growth.items()},
+            "traced_percentiles": percentiles([s["traced_bytes"] for s in steady]),
+            "top_allocations": top,
+            "workdir": self.workdir,
+        }
+
+
+def leaks(report, max_kb_per_hour=512.0, max_threads_per_hour=0.5, max_handles_per_hour=1.0):
+    """Names of the measurements that grow faster than the limits."""
+    growth = report["growth_per_hour"]
+    found = []
+    if growth["traced_bytes"] is not None and growth["traced_bytes"] > max_kb_per_hour * 1024:
+        found.append("traced_bytes")
+    if growth["threads"] is not None and growth["threads"] > max_threads_per_hour:
+        found.append("threads")
+    if growth["handles"] is not None and growth["handles"] > max_handles_per_hour:
+        found.append("handles")
+    return found
+
+
+def _mb(value):
+    return "-" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+
+def format_report(report, found=()):
+    g = report["growth_per_hour"]
+
+    def rate(key, unit=""):
+        v = g[key]
+        if v is None:
+            return "n/a"
+        if unit == "MB":
+            return f"{v / (1024 * 1024):+.2f} MB/h"
+        return f"{v:+.2f}/h"
+
+    start, end = report["start"], report["end"]
+    lines = [
+        f"Soak: {report['stream_hours']}h of stream in {report['wall_seconds']}s "
+        f"({report['effective_speed']:g}x, requested {report['speed']:g}x) "
+        f"({report['polls']} polls, {report['alerts']} alerts ({report['sink_delivered']} forwarded), "
+        f"{report['errors']} errors, {report['samples']} samples)",
+        f"  traced memory   {_mb(start['traced_bytes'])} -> {_mb(end['traced_bytes'])}  ({rate('traced_bytes', 'MB')})",
+        f"  rss             {_mb(start['rss_bytes'])} -> {_mb(end['rss_bytes'])}  ({rate('rss_bytes', 'MB')})",
+        f"  child rss       {_mb(start['child_rss_bytes'])} -> {_mb(end['child_rss_bytes'])}  "
+        f"({rate('child_rss_bytes', 'MB')})",
+        f"  threads         {start['threads']} -> {end['threads']}  ({rate('threads')})",
+        f"  fds/handles     {start['handles']} -> {end['handles']}  ({rate('handles')})",
+        f"  seen ids        {start['seen_ids']} -> {end['seen_ids']}  ({rate('seen_ids')})",
+        f"  journal pending {start['journal_pending']} -> {end['journal_pending']}",
+        f"  log lines       {start['log_lines']} -> {end['log_lines']}",
+        "  top allocation growth since warm-up:",
+    ]
+    for a in report["top_allocations"] or []:
+        lines.append(f"    {a['size_diff'] / 1024:+9.1f} KiB {a['count_diff']:+7d} blocks  {a['site']}")
+    if not report["top_allocations"]:
+        lines.append("    (no data)")
+    lines.append(f"  growth over limit: {', '.join(found) if found else 'none'}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-run leak check of the tracker pipeline.")
+    parser.add_argument("--hours", type=float, default=8.0, help="simulated stream hours")
+    parser.add_argument("--speed", type=float, default=600.0, help="stream seconds per wall second")
+    parser.add_argument("--poll-interval", type=float, default=None, help="seconds (default: poll_interval)")
+    parser.add_argument("--reposts-per-hour", type=float, default=120)
+    parser.add_argument("--sample-minutes", type=float, default=15, help="stream minutes between samples")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--frames", type=int, default=10, help="tracemalloc traceback depth")
+    parser.add_argument("--max-kb-per-hour", type=float, default=512.0)
+    parser.add_argument("--max-threads-per-hour", type=float, default=0.5)
+    parser.add_argument("--max-handles-per-hour", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    soak = Soak(hours=args.hours, speed=args.speed, poll_interval=args.poll_interval,
+                reposts_per_hour=args.reposts_per_hour, sample_minutes=args.sample_minutes,
+                error_rate=args.error_rate, frames=args.frames)
+    report = soak.run()
+    found = leaks(report, args.max_kb_per_hour, args.max_threads_per_hour, args.max_handles_per_hour)
+    print(json.dumps(dict(report, leaks=found), indent=2) if args.json else format_report(report, found))
+    if found:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,753 @@
+# Offline performance suite for the feed -> dedupe -> queue -> overlay path.
+#
+#   pip install -r benchmarks/requirements.txt
+#   python -m pytest benchmarks --benchmark-autosave
+#   python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%
+
+import io
+import sys
+import json
+import queue
+import struct
+import multiprocessing
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+from websockets.sync.client import connect as ws_connect
+
+import feed_parser
+import feed_schema
+import audio_backend
+import event_router
+import cookie_jar
+import font_cache
+import metrics
+import overlay_server
+import history_store
+from repost_store import RepostStore
+from alert_journal import AlertJournal
+from leaderboard import Leaderboard
+from feed_poll import FeedChangeDetector
+from tracker_worker import TrackerWorker, FETCH, BROWSER, IDLE
+from browser_worker import BrowserSupervisor, BROWSER_RECYCLES
+from overlay_server import AlertPresenter
+from live_channel import LiveChannel, OVERLAY_ACK
+from tracker_pipeline import TrackerPipeline
+from feed_schema import FeedItem
+from alert_sinks import AlertSinks, WebhookSink, SINK_DROPPED
+from obs_output import OBSOutput
+from benchmarks.mock_sink import MockWebhookServer
+from benchmarks.mock_obs import MockOBS
+from benchmarks.mock_browser import fake_worker
+from benchmarks.soak import Soak, leaks
+from benchmarks.mock_feed import (MockFeedServer, FeedScenario, load_recorded_items, make_repost_item,
+                                  make_feed_page, render_notification_html)
+
+POLLS = 40
+BURST = 5
+
+
+def _simulated_polls(burst=BURST, polls=POLLS):
+    """Feed pages as a busy stream would return them: each poll pushes `burst` new reposts on top."""
+    items = load_recorded_items()
+    pages = []
+    n = 0
+    for _ in range(polls):
+        for _ in range(burst):
+            n += 1
+            items.insert(0, make_repost_item(n))
+        pages.append(list(items[:25]))
+    return pages
+
+
+def _wav_bytes(seconds, rate=8000, channels=1, sample_width=2):
+    """A silent PCM WAV with an odd-sized LIST chunk before the data, as some editors write."""
+    byte_rate = rate * channels * sample_width
+    fmt = struct.pack("<HHIIHH", 1, channels, rate, byte_rate, channels * sample_width, sample_width * 8)
+    info = b"INFOISFT\x05\x00\x00\x00Lavf\x00"
+    data = bytes(int(seconds * byte_rate))
+    chunks = (b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"LIST" + struct.pack("<I", len(info)) + info + b"\x00"
+              + b"data" + struct.pack("<I", len(data)) + data)
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def _mp3_bytes(frames, xing=False, id3=b""):
+    """MPEG-1 Layer III, 128 kbit/s, 44.1 kHz joint stereo frames, padded like an encoder pads them.
+
+    With `xing`, the first frame is an Xing header announcing `frames` frames (only a few follow it).
+    """
+    out, remainder = [], 0
+    for n in range(4 if xing else frames):
+        remainder += 144 * 128000 % 44100
+        padding = remainder >= 44100
+        remainder -= 44100 if padding else 0
+        header = bytes((0xFF, 0xFB, 0x90 | (padding << 1), 0x64))
+        body = bytearray(144 * 128000 // 44100 + padding - 4)
+        if xing and n == 0:
+            body[32:44] = b"Xing" + struct.pack(">II", 1, frames)
+        out.append(header + bytes(body))
+    if id3:
+        size = len(id3)
+        syncsafe = bytes(((size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F))
+        id3 = b"ID3\x04\x00\x00" + syncsafe + id3
+    return id3 + b"".join(out)
+
+
+def _items_per_sec(benchmark, items):
+    benchmark.extra_info["items"] = items
+    if benchmark.stats is None:  # --benchmark-disable
+        return
+    benchmark.extra_info["items_per_sec"] = round(items / benchmark.stats.stats.mean)
+
+
+def test_feed_parse_and_dedupe(benchmark):
+    raw_pages = [json.dumps(make_feed_page(page)).encode("utf-8") for page in _simulated_polls()]
+
+    def run():
+        seen = set()
+        fresh = 0
+        for raw in raw_pages:
+            fresh += len(feed_parser.filter_unseen(feed_parser.parse_feed_items(raw), seen))
+        return fresh
+
+    assert benchmark(run) > 0
+    _items_per_sec(benchmark, 25 * len(raw_pages))
+
+
+@pytest.mark.parametrize("decoder", ["msgspec", "fallback"])
+def test_feed_schema_drift_is_reported(decoder):
+    page = make_feed_page(load_recorded_items())
+    page["data"]["items"][3]["user"] = "PatriotPete"
+    page["data"]["items"][5]["created_on"] = 1729350000.5
+    page["data"]["items"][6]["body"] = None
+    page["data"]["items"][7] = "video_reposted"
+    kept = [item for i, item in enumerate(load_recorded_items()) if i not in (3, 5, 6, 7)]
+    expected = feed_parser.parse_feed_items(make_feed_page(kept))
+    with patch.object(feed_schema, "msgspec", None if decoder == "fallback" else feed_schema.msgspec):
+        with pytest.raises(feed_schema.FeedSchemaError) as exc:
+            feed_parser.parse_feed_items(json.dumps({"data": {"items": {}}}).encode("utf-8"))
+        assert exc.value.path == "$.data.items"
+        # A drifted item only costs that item; the rest of the page still gets through.
+        for data in (json.dumps(page).encode("utf-8"), page):
+            errors = []
+            items = feed_parser.parse_feed_items(data, errors.append)
+            assert [e.path for e in errors] == ["$.data.items[3].user", "$.data.items[5].created_on",
+                                                "$.data.items[6].body", "$.data.items[7]"]
+            assert items == expected and items
+
+
+@pytest.mark.parametrize("type_, body, kind", [
+    ("video_reposted", "", "repost"),
+    ("video_rant", "", "rant"),
+    ("new_type", "Raider42 reposted your video", "repost"),
+    ("new_type", "Raider42 followed you", "follow"),
+    ("new_type", "Raider42 commented on your video", "comment"),
+    ("new_type", "Raider42 sent a Rant on your stream", "rant"),
+    ("new_type", "Your channel was granted monetization", None),
+    ("new_type", "New restaurant review from Durant", None),
+    ("new_type", "A warrant for your attention", None),
+    ("new_type", "Raider42 uncommented something", None),
+])
+def test_classify_matches_whole_words(type_, body, kind):
+    assert feed_parser.classify(FeedItem(type=type_, body=body)) == kind
+
+
+def test_event_router_routes_by_kind():
+    events = [{"id": "a", "kind": "repost"}, {"id": "b", "kind": "rant"}, {"id": "c"},
+              {"id": "d", "kind": "follow"}]
+    calls = []
+    router = event_router.EventRouter()
+    router.register("repost", lambda kind, batch, mode: calls.append((kind, [e["id"] for e in batch], mode)))
+    router.register("rant", lambda kind, batch, mode: calls.append((kind, [e["id"] for e in batch], mode)))
+    router.register("rant", lambda kind, batch, mode: 1 / 0)  # a failing handler must not stop routing
+    config = {"alert_types": {"rant": {"enabled": True}}}
+    alertable = router.route(events, "fetch", config)
+    assert calls == [("repost", ["a", "c"], "fetch"), ("rant", ["b"], "fetch")]
+    # Reposts are on by default, follows are off; events keep their feed order.
+    assert [e["id"] for e in alertable] == ["a", "b", "c"]
+
+
+def test_html_parse_and_dedupe(benchmark):
+    html_pages = [render_notification_html(page) for page in _simulated_polls(polls=10)]
+
+    def run():
+        seen = set()
+        fresh = 0
+        for page in html_pages:
+            fresh += len(feed_parser.filter_unseen(feed_parser.parse_notification_html(page), seen))
+        return fresh
+
+    assert benchmark(run) > 0
+    _items_per_sec(benchmark, 25 * len(html_pages))
+
+
+def test_poll_mock_feed_round_trip(benchmark, mock_feed):
+    session = requests.Session()
+    seen = set()
+
+    def poll():
+        r = session.get(mock_feed.feed_url, timeout=5)
+        return feed_parser.filter_unseen(feed_parser.parse_feed_items(r.content), seen)
+
+    poll()  # the first page is all unseen; every later poll should only surface the burst
+    assert len(benchmark.pedantic(poll, rounds=50)) == BURST
+    _items_per_sec(benchmark, 25)
+
+
+@pytest.mark.parametrize("etag", [False, True], ids=["body-hash", "etag"])
+def test_idle_poll_short_circuit(benchmark, etag):
+    detector = FeedChangeDetector()
+    with MockFeedServer(FeedScenario(etag=etag)) as server:
+        session = requests.Session()
+
+        def poll():
+            r = session.get(server.feed_url, headers=detector.request_headers(), timeout=5)
+            if detector.unchanged(r):
+                return []
+            return feed_parser.parse_feed_items(r.content)
+
+        assert len(poll()) > 0
+        assert benchmark.pedantic(poll, rounds=50) == []
+        assert (304 in server.status_counts) == etag
+
+
+def test_poll_survives_errors_and_403s():
+    scenario = FeedScenario(burst_size=2, error_rate=0.2, forbidden_rate=0.1, seed=3)
+    with MockFeedServer(scenario) as server:
+        session = requests.Session()
+        statuses = [session.get(server.feed_url, timeout=5).status_code for _ in range(100)]
+    assert {200, 403, 500} <= set(statuses)
+
+
+def test_cookie_jar_keeps_attributes_and_saves_rotations(tmp_path):
+    expiry = int(time.time()) + 600
+    saved = [{"name": "u_s", "value": "session0", "domain": "127.0.0.1", "path": "/", "secure": False,
+              "httpOnly": True, "expiry": expiry, "sameSite": "Lax"},
+             {"name": "prefs", "value": "dark", "domain": ".rumble.com", "path": "/account", "secure": True,
+              "httpOnly": False}]
+    assert cookie_jar.jar_cookies(cookie_jar.load_jar(saved)) == sorted(saved, key=lambda c: c["domain"])
+
+    path = str(tmp_path / "saved_cookies.json")
+    store = cookie_jar.CookieStore(path, {"cookies": saved, "user_agent": "UA"}, renew_before=3600)
+    assert store.renewal_due() and store.expiring() == ["u_s"]
+    with MockFeedServer(FeedScenario(rotate_cookie=True)) as server:
+        session = requests.Session()
+        session.cookies = store.jar()
+        session.get(server.feed_url, timeout=5)
+        assert store.renewed(session.cookies, True)
+        session.get(server.feed_url, timeout=5)
+        assert store.sync(session.cookies) and not store.sync(session.cookies)  # only changes are written
+    on_disk = json.load(open(path))
+    rotated = next(c for c in on_disk["cookies"] if c["name"] == "u_s")
+    assert on_disk["user_agent"] == "UA" and rotated["value"] == "session2" and rotated["httpOnly"]
+    assert not store.renewal_due() and store.expiring() == []
+
+
+def test_tracker_stop_is_prompt_and_single_instance():
+    runs = []
+
+    def fetch_loop(stop):
+        runs.append(FETCH)
+        stop.wait(60)  # a long poll_interval
+        return None
+
+    def browser_loop(stop):
+        runs.append(BROWSER)
+        stop.wait(60)
+
+    states = []
+    worker = TrackerWorker({FETCH: lambda stop: BROWSER, BROWSER: browser_loop}, on_state=states.append)
+    assert worker.start(FETCH)
+    assert not worker.start(FETCH)  # already running
+    time.sleep(0.05)
+    assert worker.state == BROWSER
+    started = time.perf_counter()
+    worker.stop()
+    assert worker.join(1) and time.perf_counter() - started < 0.2
+    assert states == [FETCH, BROWSER, "stopping", IDLE] and runs == [BROWSER]
+
+    worker = TrackerWorker({FETCH: fetch_loop, BROWSER: browser_loop})
+    for _ in range(20):
+        worker.start(FETCH)
+        worker.stop()
+    assert worker.join(1) and worker.state == IDLE
+    assert worker.start(FETCH)
+    worker.stop()
+    assert worker.join(1)
+    # Each start either ran alone or was refused while the previous thread was still exiting.
+    assert 1 <= runs.count(FETCH) <= 21
+
+
+def test_tracker_stop_aborts_a_request_in_flight(tmp_path):
+    logs = []
+    pipeline = TrackerPipeline(set(), alert_queue=queue.Queue(), log=logs.append,
+                               history_path=str(tmp_path / "repost_history.json"))
+    session_data = {"cookies": [{"name": "u_s", "value": "session1", "domain": "127.0.0.1", "path": "/"}]}
+    with MockFeedServer(FeedScenario(latency=10)) as server:
+        worker = TrackerWorker({FETCH: lambda stop: pipeline.poll_feed(
+            stop, session_data, str(tmp_path / "saved_cookies.json"), url=server.feed_url, poll_interval=60)},
+            on_stop=pipeline.cancel)
+        assert worker.start(FETCH)
+        time.sleep(0.3)  # the first poll is now waiting on the slow feed
+        started = time.perf_counter()
+        worker.stop()
+        assert worker.join(2) and time.perf_counter() - started < 1.0
+    assert pipeline.session is None and logs == []
+
+
+@pytest.mark.parametrize("mode, reason", [("recycle", "cycles"), ("crash", "crashed"), ("hang", "heartbeat")])
+def test_browser_supervisor_recycles_worker(mode, reason):
+    logs, batches = [], []
+    before = dict(BROWSER_RECYCLES.items()).get((reason,), 0)
+    supervisor = BrowserSupervisor({"mode": mode}, lambda events, parse_seconds: batches.append(events),
+                                   log=logs.append, target=fake_worker, heartbeat_timeout=1.0, stop_grace=0.5)
+    stop = threading.Event()
+    restarts = lambda: logs.count(f"Restarting browser worker ({reason}).")
+    thread = threading.Thread(target=supervisor.run, args=(lambda: not stop.is_set() and restarts() < 2,))
+    thread.start()
+    deadline = time.time() + 30
+    while restarts() < 1 and time.time() < deadline:
+        time.sleep(0.05)
+    if mode != "recycle":
+        stop.set()  # a crash or hang backs off for 5 s before the next worker; no need to wait for it
+    thread.join(30)
+    assert not thread.is_alive() and supervisor.wait_stopped(0)
+    assert restarts() >= 1 and dict(BROWSER_RECYCLES.items())[(reason,)] - before == restarts()
+    assert supervisor.process is None and multiprocessing.active_children() == []
+    if mode == "hang":
+        assert batches == [] and "Browser worker unresponsive for 1s." in logs
+    else:
+        assert batches and batches[0][0]["user"] == "Raider00001"
+
+
+def test_slow_webhook_never_blocks_publish():
+    alerts = [{"user": f"user{i}", "video": "Video", "queued_at": i} for i in range(50)]
+    with MockWebhookServer(delay=0.5) as server:
+        sinks = AlertSinks([WebhookSink("slow", server.url, batch_size=25, batch_wait=0.05)]).start()
+        started = time.perf_counter()
+        for i in range(0, 50, 5):
+            sinks.publish(alerts[i:i + 5])
+        assert time.perf_counter() - started < 0.05
+        deadline = time.time() + 10
+        while len(server.alerts) < 50 and time.time() < deadline:
+            time.sleep(0.05)
+        sinks.stop()
+    assert [a["user"] for a in server.alerts] == [a["user"] for a in alerts]
+    assert len(server.batches) < 10  # bursts go out batched
+
+
+def test_failing_webhook_opens_circuit():
+    with MockWebhookServer(error_rate=1.0) as server:
+        sink = WebhookSink("down", server.url, retries=1, backoff=0.01, batch_wait=0.0,
+                           breaker_threshold=2, breaker_reset=60)
+        sinks = AlertSinks([sink]).start()
+        for i in range(5):
+            sinks.publish([{"user": f"user{i}"}])
+            time.sleep(0.1)
+        sinks.stop()
+    assert sink.breaker.state == "open"
+    assert server.requests == 2  # nothing more is sent while the circuit is open
+    assert SINK_DROPPED.value(sink="down", reason="circuit_open") >= 3
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_obs_output_drives_scene_over_one_connection():
+    config = {"obs_password": "secret", "obs_source": "Repost Alert", "obs_text_source": "Alert Text",
+              "obs_media_source": "Alert Sound", "title_text": "NEW REPOST"}
+    shown = []
+
+    def state(alert_id, visible, audio):
+        alert = {"user": f"user{alert_id}", "video": "Video", "kind": "repost"}
+        return {"data": {"alert_id": alert_id, "is_visible": visible, "current_alert": alert,
+                         "audio_timestamp": audio}, "config": config}
+
+    with MockOBS(password="secret") as obs:
+        config["obs_url"] = obs.url
+        output = OBSOutput(config, on_shown=shown.append, log=lambda msg: None).start()
+        for n in range(1, 21):
+            output.listener("state", state(n, True, n))
+            assert _wait_for(lambda: obs.inputs.get("Alert Text", {}).get("text") == f"NEW REPOST\nuser{n}\nVideo")
+            assert _wait_for(lambda: obs.visible("Repost Alert"))
+            output.listener("state", state(n, False, n))
+            assert _wait_for(lambda: not obs.visible("Repost Alert"))
+        output.stop()
+    assert obs.connections == 1
+    assert obs.media_restarts == {"Alert Sound": 20}
+    assert obs.batches == 40  # one batch per show (text + visibility + sound) and one per hide
+    assert shown and set(shown) <= set(range(1, 21))
+
+
+def test_short_soak_has_no_thread_or_handle_growth(tmp_path):
+    report = Soak(hours=0.1, speed=1200, reposts_per_hour=600, sample_minutes=1, workdir=str(tmp_path)).run()
+    assert report["samples"] >= 5 and report["alerts"] > 0
+    assert report["sink_delivered"] == report["alerts"]
+    assert report["end"]["threads"] <= report["warm"]["threads"]
+    if report["warm"]["handles"] is not None:
+        assert report["end"]["handles"] - report["warm"]["handles"] <= 2
+    assert leaks(report, max_kb_per_hour=float("inf")) == []
+
+
+@pytest.mark.parametrize("history_size", [1_000, 10_000, 100_000])
+def test_save_history_cost(benchmark, tmp_path, history_size):
+    seen = {feed_parser.repost_id(f"user{i}_video_{i}") for i in range(history_size)}
+    path = str(tmp_path / "repost_history.json")
+    benchmark(history_store.save_history, seen, path)
+    assert len(history_store.load_history(path)) == history_size
+
+
+def test_repost_store_record_and_query(benchmark, tmp_path):
+    store = RepostStore(str(tmp_path / "analytics.db"))
+    pages = [feed_parser.parse_feed_items(make_feed_page(page)) for page in _simulated_polls()]
+    seen = set()
+    batches = [feed_parser.filter_unseen(page, seen) for page in pages]
+    store.record(batches[0], "fetch")
+
+    def poll_cycle():
+        # One poll's worth of writes plus the dashboard reads an overlay would make.
+        for batch in batches[1:]:
+            store.record(batch, "fetch")
+        return store.top_reposters(10), store.video_counts(10), store.hourly(24)
+
+    top, videos, hourly = benchmark.pedantic(poll_cycle, rounds=1)
+    assert top and videos and len(hourly) == 24
+    _items_per_sec(benchmark, sum(len(b) for b in batches[1:]))
+
+
+def test_repost_store_keeps_the_alert_kind(tmp_path):
+    path = str(tmp_path / "analytics.db")
+    store = RepostStore(path)
+    store.record(feed_parser.parse_feed_items(make_feed_page([make_repost_item(1)])), "fetch")
+    # A database written before the kind fix holds the raw Rumble type; reopening it fixes the rows.
+    with store.conn:
+        store.conn.execute("UPDATE reposts SET kind = 'video_reposted'")
+        store.conn.execute("PRAGMA user_version = 0")
+    store.close()
+    store = RepostStore(path)
+    store.record(feed_parser.parse_feed_items(make_feed_page([make_repost_item(2)])), "fetch")
+    assert store._query("SELECT kind, COUNT(*) AS n FROM reposts GROUP BY kind") == [{"kind": "repost", "n": 2}]
+    store.close()
+
+
+def test_alert_journal_replays_unshown_alerts(tmp_path):
+    path = str(tmp_path / "alert_journal.jsonl")
+    journal = AlertJournal(path, compact_after=1000)
+    now = time.time()
+    alerts = [{"user": f"user{i}", "video": "Video", "queued_at": now - i} for i in range(4)]
+    alerts.append({"user": "stale", "video": "Video", "queued_at": now - 7200})
+    journal.append(alerts)
+    journal.ack(alerts[1]["journal_id"])
+    journal.ack(alerts[1]["journal_id"])  # a second overlay acking the same alert writes nothing
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "ack", "id": "torn')  # crash mid-write
+
+    journal = AlertJournal(path, compact_after=4)
+    replayed = journal.replay(3600)
+    assert [a["user"] for a in replayed] == ["user0", "user2", "user3"]
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3  # compacted down to the pending adds
+    journal.ack(replayed[0]["journal_id"])
+    journal.ack(replayed[1]["journal_id"])  # reaches compact_after
+    journal.close()
+    assert [a["user"] for a in AlertJournal(path).replay(3600)] == ["user3"]
+    assert AlertJournal(path).replay(0) == []
+
+
+def test_leaderboard_updates(benchmark):
+    bursts = [[{"user": f"Raider{(b * 7 + i) % 500}", "video": "Video"} for i in range(BURST)] for b in range(2000)]
+
+    def run():
+        board = Leaderboard(recent_limit=5, k=10, window=600)
+        for b, burst in enumerate(bursts):
+            board.record(burst, now=float(b))
+        return board.snapshot()
+
+    assert len(benchmark(run)["top"]) == 10
+    _items_per_sec(benchmark, BURST * len(bursts))
+
+
+@patch.object(overlay_server, "LEADERBOARD", Leaderboard())
+def test_leaderboard_expires_without_new_reposts():
+    window = float(overlay_server.GLOBAL_CONFIG["leaderboard_window_minutes"]) * 60
+    overlay_server.record_leaderboard([])  # apply the configured window before backdating
+    overlay_server.LEADERBOARD.record([{"user": "OldRaider", "video": "Video"}], now=time.time() - window - 1)
+    overlay_server.TRACKER_STATE["leaderboard"] = overlay_server.LEADERBOARD.snapshot()
+    assert [e["user"] for e in overlay_server.TRACKER_STATE["leaderboard"]["top"]] == ["OldRaider"]
+    pushed = []
+    listener = lambda kind, payload: pushed.append(payload["data"]["leaderboard"]["top"])
+    overlay_server.STATE_LISTENERS.append(listener)
+    presenter = AlertPresenter(alert_queue=queue.Queue(), expiry_tick=0.05)
+    threading.Thread(target=presenter.run, daemon=True).start()
+    try:
+        deadline = time.time() + 5
+        while not pushed and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.2)  # more ticks with nothing left to expire push nothing
+    finally:
+        presenter.stop()
+        overlay_server.STATE_LISTENERS.remove(listener)
+    assert pushed == [[]] and overlay_server.TRACKER_STATE["leaderboard"]["top"] == []
+
+
+@patch.object(overlay_server, "LEADERBOARD", Leaderboard())
+def test_leaderboard_updates_from_several_threads():
+    errors = []
+
+    def hammer(alerts):
+        try:
+            for i in range(20000):
+                overlay_server.record_leaderboard(alerts(i))
+        except Exception as e:
+            errors.append(e)
+
+    # A window of ~1 ms makes the expiry/refill path run constantly next to the adds, and a tiny switch
+    # interval makes the threads interleave inside them.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with patch.dict(overlay_server.GLOBAL_CONFIG, leaderboard_window_minutes=0.00002, leaderboard_size=3):
+            threads = [threading.Thread(target=hammer, args=(lambda i: [{"user": f"Raider{i % 500}", "video": "V"}],))]
+            threads += [threading.Thread(target=hammer, args=(lambda i: [],)) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(30)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    top_k = overlay_server.LEADERBOARD.top_k
+    assert errors == [] and len(top_k.heap) <= 3
+    assert {entry[2]: i for i, entry in enumerate(top_k.heap)} == top_k.pos
+
+
+@pytest.mark.parametrize("backend", ["waitress", "builtin"])
+def test_overlay_server_stop_drains_in_flight_requests(backend):
+    started = threading.Event()
+
+    def slow_app(environ, start_response):
+        started.set()
+        time.sleep(0.5)
+        body = b"x" * 256 * 1024  # bigger than one socket send, so the drain has to flush it
+        start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+        return [body]
+
+    server = overlay_server.OverlayServer(dict(overlay_server.GLOBAL_CONFIG, overlay_host="127.0.0.1",
+                                               overlay_port=0, overlay_server=backend), wsgi_app=slow_app).start()
+    url = f"http://127.0.0.1:{server.port}/"
+    idle = requests.Session()
+    assert idle.get(url, timeout=5).status_code == 200  # leaves an idle keep-alive connection open
+    started.clear()
+    results = []
+    client = threading.Thread(target=lambda: results.append(requests.get(url, timeout=5)))
+    client.start()
+    assert started.wait(5)
+    stop_started = time.perf_counter()
+    server.stop(timeout=5)
+    stop_seconds = time.perf_counter() - stop_started
+    client.join(5)
+    assert results and results[0].status_code == 200 and len(results[0].content) == 256 * 1024
+    assert not server.thread.is_alive() and stop_seconds < 3  # the idle connection did not hold it up
+    with pytest.raises(requests.ConnectionError):
+        requests.get(url, timeout=1)
+
+
+@pytest.mark.parametrize("clients", [1, 4, 16])
+def test_api_data_concurrent_clients(benchmark, overlay_url, clients):
+    requests_per_client = 20
+    sessions = [requests.Session() for _ in range(clients)]
+
+    def client(session, errors):
+        for _ in range(requests_per_client):
+            if session.get(overlay_url + "/api/data", timeout=5).status_code != 200:
+                errors.append(1)
+
+    def run():
+        errors = []
+        threads = [threading.Thread(target=client, args=(s, errors)) for s in sessions]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return errors
+
+    assert benchmark.pedantic(run, rounds=5, warmup_rounds=1) == []
+    if benchmark.stats is not None:
+        total = clients * requests_per_client
+        benchmark.extra_info["requests_per_sec"] = round(total / benchmark.stats.stats.mean)
+
+
+def test_overlay_profiles_share_one_state(benchmark, overlay_url):
+    template = "<style>body { font-family: __FONT_STACK__; }</style><script>const PROFILE = __PROFILE__;</script>"
+    profiles = {"vertical": {"font_family": "Oswald", "title_size": 40, "poll_interval": 1}}
+    with patch.dict(overlay_server.GLOBAL_CONFIG, overlay_profiles=profiles), \
+            patch.dict(overlay_server.OVERLAY_HTML):
+        overlay_server.set_preview_config(None)
+        overlay_server.set_overlay_template(template)
+        rendered = overlay_server.OVERLAY_HTML["renders"]["vertical"][1]
+        session = requests.Session()
+        page = benchmark(lambda: session.get(overlay_url + "/overlay/vertical", timeout=5))
+        assert page.status_code == 200 and page.text == rendered and 'PROFILE = "vertical"' in page.text
+        assert 'PROFILE = ""' in session.get(overlay_url + "/", timeout=5).text
+        assert session.get(overlay_url + "/overlay/missing", timeout=5).status_code == 404
+        state = session.get(overlay_url + "/api/data", timeout=5).json()
+        # Only style keys are overridable; the alert stream and config version are shared.
+        assert state["profiles"] == {"vertical": {"font_family": "Oswald", "title_size": 40}}
+        assert set(state["profile_sounds"]) == {"vertical"}
+    overlay_server.set_preview_config(None)
+
+
+def test_font_css_only_serves_cached_known_families():
+    client = overlay_server.app.test_client()
+    profiles = {"vertical": {"font_family": "My Custom Font"}}
+    cached = {"Oswald": "@font-face {}"}
+    with patch.object(overlay_server.font_cache, "cached_font_css", side_effect=cached.get) as lookup, \
+            patch.object(overlay_server.font_cache, "ensure_font") as ensure, \
+            patch.dict(overlay_server.GLOBAL_CONFIG, overlay_profiles=profiles):
+        assert client.get("/fonts/css", query_string={"family": "Oswald"}).data == b"@font-face {}"
+        # A miss is answered from memory with an empty sheet; the request never waits on a download.
+        miss = client.get("/fonts/css", query_string={"family": "My Custom Font"})
+        assert miss.status_code == 200 and b"@font-face" not in miss.data
+        assert "no-store" in miss.headers["Cache-Control"]
+        for family in ("Totally Random Family", "../../etc", ""):
+            assert client.get("/fonts/css", query_string={"family": family}).status_code == 404
+    assert [c.args[0] for c in lookup.call_args_list] == ["Oswald", "My Custom Font"]
+    ensure.assert_not_called()
+
+
+def test_font_download_failures_cool_down(tmp_path):
+    with patch.object(font_cache, "FONT_CACHE_DIR", str(tmp_path)), patch.dict(font_cache._failures, clear=True), \
+            patch.object(font_cache.requests, "get", side_effect=requests.ConnectionError("offline")) as get:
+        assert font_cache.ensure_font("Oswald") is None
+        assert font_cache.ensure_font("Oswald") is None
+        assert get.call_count == 1
+        with patch.object(font_cache, "FAILURE_COOLDOWN", 0):
+            assert font_cache.ensure_font("Oswald") is None
+        assert get.call_count == 2
+
+
+def test_metrics_endpoint_renders_prometheus_text():
+    registry = metrics.Registry()
+    polls = registry.register(metrics.Counter("test_polls_total", "Polls by status.", ("status",)))
+    latency = registry.register(metrics.Histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+    polls.inc(status="200")
+    polls.inc(2, status="200")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3.0)
+    with patch.object(metrics, "REGISTRY", registry):
+        response = overlay_server.app.test_client().get("/metrics")
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines == [
+        "# HELP test_polls_total Polls by status.",
+        "# TYPE test_polls_total counter",
+        'test_polls_total{status="200"} 3',
+        "# HELP test_latency_seconds Latency.",
+        "# TYPE test_latency_seconds histogram",
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 3',
+        "test_latency_seconds_sum 3.55",
+        "test_latency_seconds_count 3",
+    ]
+
+
+@pytest.mark.parametrize("host, address", [("0.0.0.0", "127.0.0.1"), ("::", "127.0.0.1"),
+                                           ("192.168.1.20", "192.168.1.20"), ("::1", "[::1]")])
+def test_overlay_urls_follow_overlay_host(host, address):
+    with patch.dict(overlay_server.GLOBAL_CONFIG, overlay_host=host, overlay_port=5050, live_port=5051):
+        assert overlay_server.overlay_url("/api/data") == f"http://{address}:5050/api/data"
+        assert overlay_server.live_url() == f"ws://{address}:5051"
+
+
+def test_live_channel_pushes_state_and_records_acks():
+    def render_acks():
+        return (OVERLAY_ACK.snapshot(event="render") or {"count": 0})["count"]
+
+    live = LiveChannel(host="127.0.0.1", port=0, snapshot=overlay_server.state_snapshot,
+                       on_ack=overlay_server.handle_overlay_ack).start()
+    acks_before = render_acks()
+    try:
+        with patch.object(overlay_server, "STATE_LISTENERS", [live.broadcast]), \
+                patch.dict(overlay_server.TRACKER_STATE), patch.dict(overlay_server.LAST_SERVED_ALERT), \
+                ws_connect(f"ws://127.0.0.1:{live.port}", open_timeout=5, close_timeout=1) as ws:
+            # A new overlay gets the current state straight away, before anything changes.
+            assert json.loads(ws.recv(timeout=5))["type"] == "state"
+            overlay_server.show_alert({"user": "PatriotPete", "video": "Live test"})
+            alert_id = overlay_server.TRACKER_STATE["alert_id"]
+            msg = json.loads(ws.recv(timeout=5))
+            assert msg["type"] == "state" and msg["data"]["alert_id"] == alert_id
+            assert msg["data"]["is_visible"] and msg["data"]["current_alert"]["user"] == "PatriotPete"
+            ws.send(json.dumps({"type": "ack", "event": "render", "id": alert_id}))
+            deadline = time.time() + 5
+            while render_acks() == acks_before and time.time() < deadline:
+                time.sleep(0.01)
+            assert render_acks() == acks_before + 1
+            assert overlay_server.LAST_SERVED_ALERT["alert"]["user"] == "PatriotPete"
+    finally:
+        live.stop()
+    assert not live.thread.is_alive()
+
+
+def test_alert_queue_drain(benchmark):
+    alert_queue = queue.Queue()
+    presenter = AlertPresenter(alert_queue=alert_queue, min_display=0.0, gap=0.0)
+    threading.Thread(target=presenter.run, daemon=True).start()
+    alerts = [feed_parser.to_alert({"user": f"Raider{i}", "video": "Video"}, 0.0) for i in range(500)]
+
+    def drain():
+        for alert in alerts:
+            alert_queue.put(alert)
+        alert_queue.join()
+
+    benchmark(drain)
+    _items_per_sec(benchmark, len(alerts))
+
+
+def test_replay_raid_shows_every_alert_once():
+    from benchmarks.replay import Replay, synthetic_pages
+    report = Replay(synthetic_pages(polls=3, burst=4), speed=100, poll_interval=5, min_display=2, gap=1).run()
+    assert report["alerts_shown"] == report["alerts_expected"] > 0
+    assert report["dropped"] == [] and report["duplicated"] == []
+
+
+def test_wav_duration_from_header():
+    assert audio_backend._wav_duration(io.BytesIO(_wav_bytes(3.0))) == 3.0
+    assert audio_backend._wav_duration(io.BytesIO(_wav_bytes(1.5, rate=44100, channels=2))) == 1.5
+    assert audio_backend._wav_duration(io.BytesIO(b"RIFF\x00\x00\x00\x00AVI LIST")) is None
+
+
+@pytest.mark.parametrize("header, expected", [
+    (b"\xff\xfb\x90\x64", {"bitrate": 128000, "sample_rate": 44100, "samples": 1152, "length": 417, "side_info": 32}),
+    (b"\xff\xfb\x92\xc4", {"bitrate": 128000, "sample_rate": 44100, "samples": 1152, "length": 418, "side_info": 17}),
+    (b"\xff\xf3\x84\x64", {"bitrate": 64000, "sample_rate": 24000, "samples": 576, "length": 192, "side_info": 17}),
+    (b"\xff\xfb\xf0\x64", None),  # bitrate index 15
+    (b"\xff\xfb\x9c\x64", None),  # reserved sample rate
+    (b"ID3\x04", None),
+])
+def test_mp3_frame_info(header, expected):
+    assert audio_backend._mp3_frame_info(header) == expected
+
+
+def test_mp3_duration_from_bitrate_and_xing_header(tmp_path):
+    cbr = _mp3_bytes(1000)
+    # 1000 frames * 1152 samples / 44.1 kHz; the padded frames make the byte count match the bitrate.
+    assert audio_backend._mp3_duration(io.BytesIO(cbr), len(cbr)) == pytest.approx(1000 * 1152 / 44100, abs=0.01)
+    with_tag = cbr + b"TAG" + bytes(125)  # ID3v1 tag at the end is not audio
+    assert audio_backend._mp3_duration(io.BytesIO(with_tag), len(with_tag)) == pytest.approx(26.12, abs=0.01)
+    vbr = _mp3_bytes(2000, xing=True, id3=b"TIT2" + bytes(500))
+    assert audio_backend._mp3_duration(io.BytesIO(vbr), len(vbr)) == pytest.approx(2000 * 1152 / 44100)
+    path = tmp_path / "alert.mp3"
+    path.write_bytes(vbr)
+    assert audio_backend.header_duration(str(path)) == pytest.approx(52.245, abs=0.001)
+    path = tmp_path / "alert.wav"
+    path.write_bytes(_wav_bytes(3.0))
+    assert audio_backend.sound_length(str(path)) == 3.0
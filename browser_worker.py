@@ -0,0 +1,342 @@
+# --- BROWSER FALLBACK WORKER ---
+# Headless Chrome runs in its own process, never inside the GUI/overlay
+# process. The worker refreshes the notification dropdown, parses it and
+# sends the candidates back over a multiprocessing queue together with a
+# heartbeat. BrowserSupervisor (main process) watches the heartbeat and the
+# RSS/CPU of the worker's whole process tree (chromedriver + Chrome), and
+# recycles it after N cycles, above M MB, when it hangs or when it dies, so
+# a leaking or wedged Chromium cannot degrade OBS over an all-day stream.
+
+import re
+import time
+import queue
+import threading
+import multiprocessing
+
+import metrics
+import feed_parser
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BELL_SELECTOR = ".user-notifications--bell-button"
+# How often the supervisor re-checks should_run() while waiting, so Stop lands within this.
+STOP_POLL = 0.2
+
+BROWSER_RECYCLES = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_browser_recycles_total", "Browser worker restarts by reason.", ("reason",)))
+BROWSER_RSS = metrics.REGISTRY.register(metrics.Gauge(
+    "rumble_browser_rss_bytes", "Resident memory of the browser worker and its Chrome processes."))
+
+
+# --- DRIVER LAUNCH (used by the worker and by the visible login window) ---
+def browser_options(binary_path="", headless=False):
+    import undetected_chromedriver as uc
+    opts = uc.ChromeOptions()
+    opts.add_argument("--mute-audio")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+
+    if headless:
+        opts.add_argument("--headless=new")
+        opts.add_argument("--window-size=1920,1080")
+
+    if binary_path:
+        opts.binary_location = binary_path
+
+    return opts
+
+
+def launch_driver(binary_path="", version_main=None, headless=False, log=print):
+    """Attempts to launch driver, handling version mismatch automatically."""
+    import undetected_chromedriver as uc
+    opts = browser_options(binary_path, headless)
+    if version_main:
+        log(f"Using forced driver version: {version_main}")
+        return uc.Chrome(options=opts, version_main=version_main, use_subprocess=True)
+
+    try:
+        return uc.Chrome(options=opts, use_subprocess=True)
+    except Exception as e:
+        err_msg = str(e)
+        if "Current browser version is" in err_msg:
+            log("Browser version mismatch detected. Attempting auto-fix...")
+            match = re.search(r"Current browser version is (\d+)\.", err_msg)
+            if match:
+                detected_version = int(match.group(1))
+                log(f"Auto-detected version {detected_version}. Retrying...")
+                # REGENERATE OPTIONS FRESH
+                new_opts = browser_options(binary_path, headless)
+                return uc.Chrome(options=new_opts, version_main=detected_version, use_subprocess=True)
+        raise e
+
+
+# --- LOGIN DETECTION (visible login window) ---
+# One in-page promise per page load: resolves the moment the bell (only rendered for a signed-in user)
+# is in the DOM, instead of polling find_elements over WebDriver.
+LOGIN_WAIT_SCRIPT = """
+const selector = arguments[0];
+const done = arguments[arguments.length - 1];
+if (window.__rrtLoginObserver) window.__rrtLoginObserver.disconnect();
+if (document.querySelector(selector)) { done(true); return; }
+const observer = new MutationObserver(() => {
+    if (document.querySelector(selector)) { observer.disconnect(); done(true); }
+});
+window.__rrtLoginObserver = observer;
+observer.observe(document.documentElement, {childList: true, subtree: true});
+"""
+WINDOW_GONE = ("invalid session id", "no such window", "target window already closed", "disconnected",
+               "chrome not reachable")
+
+
+def wait_for_login(driver, should_wait, script_timeout=60):
+    """Blocks until the signed-in bell appears (True) or should_wait() turns false (False).
+    Raises if the browser window was closed."""
+    driver.set_script_timeout(script_timeout)
+    while should_wait():
+        try:
+            if driver.execute_async_script(LOGIN_WAIT_SCRIPT, BELL_SELECTOR):
+                return True
+        except Exception as e:
+            if any(marker in str(e).lower() for marker in WINDOW_GONE):
+                raise
+            # A navigation (e.g. submitting the login form) unloads the page and aborts the script,
+            # as does the script timeout; just wait again on the new page.
+            time.sleep(0.1)
+    return False
+
+
+# --- WORKER PROCESS ---
+def worker_main(options, out_queue, stop_event):
+    """Entry point of the worker process. Runs until stop_event is set or max_cycles is reached."""
+    from selenium.webdriver.common.by import By
+
+    def send(kind, **payload):
+        out_queue.put(dict(payload, type=kind, ts=time.time()))
+
+    driver = None
+    try:
+        driver = launch_driver(options.get("binary_path", ""), options.get("version_main"), headless=True,
+                               log=lambda msg: send("log", msg=msg))
+        send("heartbeat", cycles=0)
+        try:
+            driver.minimize_window()
+        except:
+            pass
+        if options.get("cookies"):
+            driver.get("https://rumble.com/404")
+            for c in options["cookies"]:
+                try:
+                    driver.add_cookie(c)
+                except:
+                    pass
+        driver.get("https://rumble.com")
+
+        cycles = 0
+        max_cycles = int(options.get("max_cycles", 0))
+        while not stop_event.is_set():
+            cycle_start = time.perf_counter()
+            try:
+                driver.refresh()
+                stop_event.wait(3)
+                bell = driver.find_element(By.CSS_SELECTOR, BELL_SELECTOR)
+                driver.execute_script("arguments[0].click();", bell)
+                stop_event.wait(1.5)
+                parse_start = time.perf_counter()
+                candidates = feed_parser.parse_notification_html(driver.page_source)
+                send("events", events=candidates, parse_seconds=time.perf_counter() - parse_start,
+                     cycle_seconds=time.perf_counter() - cycle_start)
+            except Exception as e:
+                if "invalid session id" in str(e).lower():
+                    send("fatal", msg="Browser session lost (invalid session id).")
+                    return
+            cycles += 1
+            send("heartbeat", cycles=cycles)
+            if max_cycles and cycles >= max_cycles:
+                send("recycle", reason="cycles")
+                return
+            stop_event.wait(float(options.get("poll_interval", 5)))
+    except Exception as e:
+        send("fatal", msg=f"Fallback Error: {e}")
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except:
+                pass
+
+
+# --- SUPERVISOR (main process) ---
+class BrowserSupervisor:
+    """Keeps one browser worker running while should_run() is true, restarting it per the recycle policy."""
+
+    def __init__(self, options, on_events, log=print, target=worker_main, max_rss_mb=1500, max_cpu_percent=0,
+                 heartbeat_timeout=120, check_interval=5.0, stop_grace=15.0):
+        self.options = options
+        self.on_events = on_events
+        self.log = log
+        self.target = target
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else 0
+        self.max_cpu_percent = max_cpu_percent
+        self.heartbeat_timeout = heartbeat_timeout
+        self.check_interval = check_interval
+        self.stop_grace = stop_grace
+        # Chrome is not fork-safe, and spawn is what Windows does anyway.
+        self.ctx = multiprocessing.get_context("spawn")
+        self.process = None
+        self.queue = None
+        self.stop_event = None
+        self._procs = {}
+        self._cpu_strikes = 0
+        self._done = threading.Event()
+
+    def run(self, should_run):
+        try:
+            self._run(should_run)
+        finally:
+            BROWSER_RSS.set(0)
+            self._done.set()
+
+    def wait_stopped(self, timeout=None):
+        """Blocks until run() has shut the worker down (call after should_run() turns false)."""
+        return self._done.wait(timeout)
+
+    def _run(self, should_run):
+        backoff = 5.0
+        while should_run():
+            started = time.time()
+            self._start()
+            reason = self._watch(should_run)
+            self._shutdown()
+            if reason == "stopped":
+                break
+            BROWSER_RECYCLES.inc(reason=reason)
+            self.log(f"Restarting browser worker ({reason}).")
+            if reason in ("crashed", "heartbeat"):
+                if time.time() - started > 10 * 60:
+                    backoff = 5.0
+                self._sleep(backoff, should_run)
+                backoff = min(backoff * 2, 300.0)
+
+    def _sleep(self, seconds, should_run):
+        end = time.time() + seconds
+        while time.time() < end and should_run():
+            time.sleep(STOP_POLL)
+
+    def _start(self):
+        self.queue = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.process = self.ctx.Process(target=self.target, args=(self.options, self.queue, self.stop_event),
+                                        name="browser-worker", daemon=True)
+        self.process.start()
+        self._procs = {}
+        self._cpu_strikes = 0
+
+    def _dispatch(self, msg):
+        kind = msg.get("type")
+        if kind == "events":
+            metrics.BROWSER_CYCLE.observe(msg.get("cycle_seconds", 0.0))
+            self.on_events(msg.get("events", []), msg.get("parse_seconds", 0.0))
+        elif kind == "log":
+            self.log(msg.get("msg", ""))
+        elif kind == "fatal":
+            self.log(msg.get("msg", "Browser worker failed."))
+            return "crashed"
+        elif kind == "recycle":
+            return msg.get("reason", "cycles")
+        return None
+
+    def _watch(self, should_run):
+        last_beat = time.time()
+        last_check = 0.0
+        while True:
+            if not should_run():
+                return "stopped"
+            try:
+                msg = self.queue.get(timeout=STOP_POLL)
+            except queue.Empty:
+                msg = None
+            if msg is not None:
+                last_beat = time.time()
+                reason = self._dispatch(msg)
+                if reason:
+                    return reason
+            elif not self.process.is_alive():
+                return "crashed"
+            now = time.time()
+            if now - last_beat > self.heartbeat_timeout:
+                self.log(f"Browser worker unresponsive for {int(now - last_beat)}s.")
+                return "heartbeat"
+            if now - last_check >= self.check_interval:
+                last_check = now
+                reason = self._check_resources()
+                if reason:
+                    return reason
+
+    def _tree(self):
+        if psutil is None or not self.process or not self.process.pid:
+            return []
+        try:
+            root = psutil.Process(self.process.pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+        # Keep Process objects between checks so cpu_percent() measures the interval since the last one.
+        self._procs = {p.pid: self._procs.get(p.pid, p) for p in procs}
+        return list(self._procs.values())
+
+    def _check_resources(self):
+        procs = self._tree()
+        if not procs:
+            return None
+        rss, cpu = 0, 0.0
+        for p in procs:
+            try:
+                rss += p.memory_info().rss
+                cpu += p.cpu_percent(None)
+            except psutil.Error:
+                pass
+        BROWSER_RSS.set(rss)
+        if self.max_rss and rss > self.max_rss:
+            self.log(f"Browser worker using {rss // (1024 * 1024)} MB (limit {self.max_rss // (1024 * 1024)} MB).")
+            return "memory"
+        if self.max_cpu_percent and cpu > self.max_cpu_percent:
+            self._cpu_strikes += 1
+            if self._cpu_strikes >= 3:
+                self.log(f"Browser worker CPU at {int(cpu)}% for {self._cpu_strikes} checks.")
+                return "cpu"
+        else:
+            self._cpu_strikes = 0
+        return None
+
+    def _shutdown(self):
+        if not self.process:
+            return
+        children = self._tree()[1:]
+        self.stop_event.set()
+        deadline = time.time() + self.stop_grace
+        while self.process.is_alive() and time.time() < deadline:
+            try:
+                msg = self.queue.get(timeout=0.5)
+                if msg.get("type") == "events":
+                    self._dispatch(msg)
+            except queue.Empty:
+                pass
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5)
+            if self.process.is_alive():
+                self.process.kill()
+        self.process.join(1)
+        # A killed worker cannot quit Chrome itself.
+        for p in children:
+            try:
+                p.kill()
+            except psutil.Error:
+                pass
+        self.queue.cancel_join_thread()
+        self.queue.close()
+        self.process = None
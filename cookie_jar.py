@@ -0,0 +1,108 @@
+# --- COOKIE JAR ---
+# The saved login is a list of Selenium cookies. This module turns it into a
+# requests cookie jar without losing anything Selenium recorded (path,
+# secure, expiry, HttpOnly, SameSite), turns the jar back into Selenium
+# cookies, and keeps saved_cookies.json in step with the cookies Rumble
+# rotates through Set-Cookie on the fetch path. Files are only rewritten
+# when the jar actually changed, and always atomically.
+
+import os
+import json
+import time
+
+from requests.cookies import RequestsCookieJar, create_cookie
+
+import metrics
+
+COOKIE_ROTATIONS = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_cookie_rotations_total", "Times rotated session cookies were written back to the saved login."))
+SESSION_RENEWALS = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_session_renewals_total", "Proactive session renewals on the fetch path, by result.", ("result",)))
+
+
+def to_requests_cookie(c):
+    """Selenium cookie dict -> http.cookiejar.Cookie with every attribute kept."""
+    rest = {}
+    if c.get("httpOnly"):
+        rest["HttpOnly"] = None
+    if c.get("sameSite"):
+        rest["SameSite"] = c["sameSite"]
+    expiry = c.get("expiry")
+    return create_cookie(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"),
+                         secure=bool(c.get("secure")), expires=int(expiry) if expiry is not None else None,
+                         rest=rest)
+
+
+def to_selenium_cookie(cookie):
+    """http.cookiejar.Cookie -> Selenium cookie dict (the shape driver.get_cookies() returns)."""
+    c = {"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path,
+         "secure": bool(cookie.secure), "httpOnly": cookie.has_nonstandard_attr("HttpOnly")}
+    if cookie.expires is not None:
+        c["expiry"] = int(cookie.expires)
+    if cookie.get_nonstandard_attr("SameSite"):
+        c["sameSite"] = cookie.get_nonstandard_attr("SameSite")
+    return c
+
+
+def load_jar(cookies):
+    jar = RequestsCookieJar()
+    for c in cookies:
+        jar.set_cookie(to_requests_cookie(c))
+    return jar
+
+
+def jar_cookies(jar, now=None):
+    """Unexpired cookies in the jar as Selenium dicts, in a stable order."""
+    now = time.time() if now is None else now
+    cookies = [to_selenium_cookie(c) for c in jar if not c.is_expired(now)]
+    return sorted(cookies, key=lambda c: (c["domain"], c["path"], c["name"]))
+
+
+def save_session(path, session_data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(session_data, f)
+    os.replace(tmp, path)
+
+
+class CookieStore:
+    """The saved login behind a fetch session: writes rotated cookies back and says when to renew."""
+
+    def __init__(self, path, session_data, renew_before=3600, renew_interval=600, clock=time.time):
+        self.path = path
+        self.session_data = session_data
+        self.renew_before = renew_before
+        self.renew_interval = renew_interval
+        self.clock = clock
+        self.saved = jar_cookies(load_jar(session_data.get("cookies", [])), clock())
+        self.last_renewal = 0.0
+
+    def jar(self):
+        return load_jar(self.saved)
+
+    def sync(self, jar):
+        """Saves the jar if it differs from the saved login; returns True if it did."""
+        cookies = jar_cookies(jar, self.clock())
+        if cookies == self.saved:
+            return False
+        self.session_data = dict(self.session_data, cookies=cookies)
+        save_session(self.path, self.session_data)
+        self.saved = cookies
+        COOKIE_ROTATIONS.inc()
+        return True
+
+    def expiring(self):
+        """Names of saved cookies that expire within renew_before seconds."""
+        horizon = self.clock() + self.renew_before
+        return sorted({c["name"] for c in self.saved if "expiry" in c and c["expiry"] <= horizon})
+
+    def renewal_due(self):
+        return bool(self.renew_before) and self.clock() - self.last_renewal >= self.renew_interval and bool(
+            self.expiring())
+
+    def renewed(self, jar, ok):
+        """Records a renewal attempt; returns True if it brought back rotated cookies."""
+        self.last_renewal = self.clock()
+        changed = ok and self.sync(jar)
+        SESSION_RENEWALS.inc(result="rotated" if changed else "unchanged" if ok else "failed")
+        return changed
@@ -0,0 +1,151 @@
+# --- NOTIFICATION FEED PARSING ---
+# Turns a user.notification_feed payload (fetch mode) or the notification
+# dropdown HTML (browser mode) into typed events (reposts, follows, comments,
+# rants), and filters out the ones already in the seen-history set.
+
+import re
+import hashlib
+
+from bs4 import BeautifulSoup
+
+import feed_schema
+
+
+def repost_id(unique_str):
+    return hashlib.md5(unique_str.encode('utf-8')).hexdigest()
+
+
+# Raw notification "type" values we know about, mapped to alert kinds.
+TYPE_KINDS = {
+    "video_reposted": "repost",
+    "user_followed": "follow",
+    "channel_followed": "follow",
+    "followed": "follow",
+    "video_comment": "comment",
+    "comment_reply": "comment",
+    "comment": "comment",
+    "rant": "rant",
+    "video_rant": "rant",
+}
+
+# Body phrases for types we have not seen yet, checked in order. Whole words only, so a
+# comment about a "restaurant" or a "warrant" is not a rant.
+BODY_KINDS = (
+    (re.compile(r"\breposted\b"), "repost"),
+    (re.compile(r"\bfollowed you\b"), "follow"),
+    (re.compile(r"\bcommented on\b"), "comment"),
+    (re.compile(r"\brant\b"), "rant"),
+)
+
+
+def classify(item):
+    """Returns the alert kind for one FeedItem ("repost", "follow", "comment", "rant"), or None."""
+    kind = TYPE_KINDS.get(item.type)
+    if kind:
+        return kind
+    body = item.body.lower()
+    for pattern, body_kind in BODY_KINDS:
+        if pattern.search(body):
+            return body_kind
+    return None
+
+
+def _user_name(user):
+    if user is None:
+        return "Unknown"
+    if user.username is not None:
+        return user.username
+    return user.name if user.name is not None else "Unknown"
+
+
+def _event_from_item(item, kind):
+    user_name = "Unknown"
+    video_title = "Video"
+    if item.type == "video_reposted" or kind != "repost":
+        user_name = _user_name(item.user)
+        video_title = item.video.title if item.video and item.video.title is not None else \
+            ("Unknown Video" if kind == "repost" else "")
+    elif item.user is not None:
+        user_name = item.user.username if item.user.username is not None else "Unknown"
+    created_on = item.created_on
+    unique_str = f"{user_name}_{video_title}_{created_on}"
+    if kind != "repost":
+        # Reposts keep their original hash so existing history still de-dupes; other kinds get a namespace.
+        unique_str = f"{kind}:{unique_str}"
+    event = {
+        "id": repost_id(unique_str),
+        "kind": kind,
+        "type": item.type,
+        "user": user_name,
+        "video": video_title,
+        "created_on": created_on,
+    }
+    if item.amount is not None:
+        event["amount"] = item.amount
+    return event
+
+
+def parse_feed_events(data, on_item_error=None):
+    """Classifies every item of a notification_feed response once. Newest first.
+
+    `data` is the raw response body (bytes/str) or an already-decoded dict. Raises FeedSchemaError if the
+    page itself has drifted; items that have are skipped and passed to on_item_error(FeedSchemaError).
+    """
+    if isinstance(data, (bytes, bytearray, str)):
+        response = feed_schema.decode_feed(data, on_item_error)
+    else:
+        response = feed_schema.convert_feed(data, on_item_error)
+    events = []
+    for item in response.data.items:
+        kind = classify(item)
+        if kind:
+            events.append(_event_from_item(item, kind))
+    return events
+
+
+def parse_feed_items(data, on_item_error=None):
+    """Returns only the repost candidates from a notification_feed response, newest first."""
+    return [e for e in parse_feed_events(data, on_item_error) if e["kind"] == "repost"]
+
+
+def parse_notification_html(html):
+    """Returns repost candidates from the rendered notification dropdown, newest first."""
+    soup = BeautifulSoup(html, 'html.parser')
+    notif_list = soup.find("ul", class_="user-notifications--list")
+    if not notif_list:
+        return []
+    candidates = []
+    for li in notif_list.find_all("li"):
+        text_div = li.find("div", class_="user-notifications--text")
+        if not text_div: continue
+        body_div = text_div.find("div", class_="user-notifications--body")
+        if not body_div: continue
+        full_text = body_div.get_text(" ", strip=True)
+        if "reposted your video" in full_text:
+            user_link = body_div.find("a")
+            user = user_link.text if user_link else "Unknown"
+            vid_title = "Unknown"
+            if '"' in full_text:
+                parts = full_text.split('"')
+                if len(parts) > 1: vid_title = parts[1]
+            candidates.append({"id": repost_id(full_text), "kind": "repost", "type": "video_reposted",
+                               "user": user, "video": vid_title})
+    return candidates
+
+
+def filter_unseen(candidates, seen):
+    """Returns candidates not yet in `seen` (adding them to it), in the original order."""
+    fresh = []
+    for candidate in candidates:
+        n_id = candidate["id"]
+        if n_id not in seen:
+            seen.add(n_id)
+            fresh.append(candidate)
+    return fresh
+
+
+def to_alert(candidate, queued_at):
+    alert = {"user": candidate["user"], "video": candidate["video"], "queued_at": queued_at}
+    if candidate.get("created_on"):
+        alert["created_on"] = candidate["created_on"]
+    return alert
@@ -0,0 +1,39 @@
+# --- UNCHANGED FEED DETECTION ---
+# Most polls return the same 25 notifications as the previous one. The
+# tracker sends If-None-Match / If-Modified-Since whenever the endpoint has
+# handed out validators, and otherwise compares a hash of the raw body with
+# the last poll, so an idle poll never reaches JSON decoding or dedupe.
+
+import hashlib
+
+import metrics
+
+
+class FeedChangeDetector:
+    def __init__(self):
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+
+    def request_headers(self):
+        """Conditional request headers for the next poll (empty until the server sends validators)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def unchanged(self, response):
+        """True if a 200/304 response carries nothing new since the last poll; remembers it otherwise."""
+        if response.status_code == 304:
+            metrics.FEED_UNCHANGED.inc(reason="304")
+            return True
+        self.etag = response.headers.get("ETag") or self.etag
+        self.last_modified = response.headers.get("Last-Modified") or self.last_modified
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        if digest == self.digest:
+            metrics.FEED_UNCHANGED.inc(reason="same_body")
+            return True
+        self.digest = digest
+        return False
@@ -0,0 +1,207 @@
+# --- NOTIFICATION FEED SCHEMA ---
+# Typed, slotted records for the parts of user.notification_feed we read.
+# With msgspec installed the raw response bytes are decoded straight into
+# these records by a precompiled decoder; otherwise orjson/json decodes and a
+# small validator builds the same records. Either way a shape change is
+# reported as FeedSchemaError naming the offending path, instead of quietly
+# turning into "Unknown" users. Items are validated one by one: a bad item is
+# skipped (and reported) while the rest of the page still gets through; only
+# a broken envelope or malformed JSON rejects the whole page.
+
+import json
+import typing
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FeedSchemaError(ValueError):
+    """The feed payload does not match the schema; `path` is a JSONPath like $.data.items[3].user."""
+
+    def __init__(self, message, path="$"):
+        super().__init__(f"{message} - at `{path}`")
+        self.message = message
+        self.path = path
+
+
+@dataclass(slots=True)
+class FeedUser:
+    username: Optional[str] = None
+    name: Optional[str] = None
+
+
+@dataclass(slots=True)
+class FeedVideo:
+    title: Optional[str] = None
+
+
+@dataclass(slots=True)
+class FeedItem:
+    type: str = ""
+    body: str = ""
+    user: Optional[FeedUser] = None
+    video: Optional[FeedVideo] = None
+    created_on: Union[str, int] = ""
+    amount: Union[float, str, None] = None
+
+
+@dataclass(slots=True)
+class FeedPage:
+    items: List[FeedItem]
+
+
+@dataclass(slots=True)
+class FeedResponse:
+    data: FeedPage
+
+
+# The page around the items; each item is validated on its own against FeedItem.
+@dataclass(slots=True)
+class _PageEnvelope:
+    items: List[Any]
+
+
+@dataclass(slots=True)
+class _Envelope:
+    data: _PageEnvelope
+
+
+# --- msgspec path ---
+if msgspec is not None:
+    @dataclass(slots=True)
+    class _RawPageEnvelope:
+        items: List[msgspec.Raw]  # undecoded JSON of each item
+
+    @dataclass(slots=True)
+    class _RawEnvelope:
+        data: _RawPageEnvelope
+
+    _ENVELOPE_DECODER = msgspec.json.Decoder(_RawEnvelope)
+    _ITEM_DECODER = msgspec.json.Decoder(FeedItem)
+
+    def _msgspec_error(e, prefix="$"):
+        message, _, path = str(e).partition(" - at ")
+        return FeedSchemaError(message, prefix + (path.strip("`") or "$")[1:])
+
+
+# --- fallback path ---
+_TYPE_NAMES = {str: "str", int: "int", float: "float", list: "array", dict: "object", type(None): "null"}
+
+
+def _type_name(value):
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _build(tp, value, path):
+    if tp is Any:
+        return value
+    origin = typing.get_origin(tp)
+    if origin is Union:
+        options = typing.get_args(tp)
+        for option in options:
+            if option is type(None) and value is None:
+                return None
+            if option in (str, int, float) and _is_scalar(option, value):
+                return value
+        for option in options:
+            if dataclasses.is_dataclass(option) and isinstance(value, dict):
+                return _build(option, value, path)
+        expected = " | ".join("null" if o is type(None) else "object" if dataclasses.is_dataclass(o)
+                              else getattr(o, "__name__", str(o)) for o in options)
+        raise FeedSchemaError(f"Expected `{expected}`, got `{_type_name(value)}`", path)
+    if origin in (list, List):
+        if not isinstance(value, list):
+            raise FeedSchemaError(f"Expected `array`, got `{_type_name(value)}`", path)
+        (item_tp,) = typing.get_args(tp)
+        return [_build(item_tp, v, f"{path}[{i}]") for i, v in enumerate(value)]
+    if dataclasses.is_dataclass(tp):
+        if not isinstance(value, dict):
+            raise FeedSchemaError(f"Expected `object`, got `{_type_name(value)}`", path)
+        kwargs = {}
+        for f in dataclasses.fields(tp):
+            if f.name in value:
+                kwargs[f.name] = _build(_HINTS[tp][f.name], value[f.name], f"{path}.{f.name}")
+            elif f.default is dataclasses.MISSING:
+                raise FeedSchemaError(f"Object missing required field `{f.name}`", path)
+        return tp(**kwargs)
+    if _is_scalar(tp, value):
+        return value
+    raise FeedSchemaError(f"Expected `{tp.__name__}`, got `{_type_name(value)}`", path)
+
+
+def _is_scalar(tp, value):
+    if tp is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if tp is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, tp)
+
+
+_HINTS = {cls: typing.get_type_hints(cls)
+          for cls in (FeedUser, FeedVideo, FeedItem, FeedPage, FeedResponse, _PageEnvelope, _Envelope)}
+
+
+def _collect(raw_items, build_item, on_item_error):
+    items = []
+    for i, raw_item in enumerate(raw_items):
+        try:
+            items.append(build_item(raw_item, f"$.data.items[{i}]"))
+        except FeedSchemaError as e:
+            if on_item_error:
+                on_item_error(e)
+    return FeedResponse(FeedPage(items))
+
+
+def _msgspec_item(decode):
+    def build_item(raw_item, path):
+        try:
+            return decode(raw_item)
+        except msgspec.ValidationError as e:
+            raise _msgspec_error(e, path) from None
+    return build_item
+
+
+def _fallback_item(value, path):
+    return _build(FeedItem, value, path)
+
+
+def decode_feed(raw, on_item_error=None):
+    """Decodes a raw notification_feed body (bytes or str) into a FeedResponse.
+
+    Items that do not match FeedItem are left out; on_item_error(FeedSchemaError) is called for each.
+    """
+    if msgspec is not None:
+        try:
+            envelope = _ENVELOPE_DECODER.decode(raw)
+        except msgspec.ValidationError as e:
+            raise _msgspec_error(e) from None
+        except msgspec.DecodeError as e:
+            raise FeedSchemaError(f"Malformed JSON: {e}") from None
+        return _collect(envelope.data.items, _msgspec_item(_ITEM_DECODER.decode), on_item_error)
+    try:
+        obj = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError as e:
+        raise FeedSchemaError(f"Malformed JSON: {e}") from None
+    return _collect(_build(_Envelope, obj, "$").data.items, _fallback_item, on_item_error)
+
+
+def convert_feed(obj, on_item_error=None):
+    """Validates an already-decoded notification_feed payload into a FeedResponse (see decode_feed)."""
+    if msgspec is not None:
+        try:
+            envelope = msgspec.convert(obj, _Envelope)
+        except msgspec.ValidationError as e:
+            raise _msgspec_error(e) from None
+        return _collect(envelope.data.items, _msgspec_item(lambda item: msgspec.convert(item, FeedItem)),
+                        on_item_error)
+    return _collect(_build(_Envelope, obj, "$").data.items, _fallback_item, on_item_error)
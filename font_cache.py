@@ -0,0 +1,113 @@
+# --- GOOGLE FONT CACHE ---
+# Downloads the Google Fonts stylesheet and font files for a family once,
+# stores them under FONT_CACHE_DIR and rewrites the @font-face rules to point
+# at the overlay server, so OBS never has to reach fonts.googleapis.com.
+
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+import requests
+
+FONT_CACHE_DIR = "font_cache"
+FONT_ROUTE = "/fonts"
+GOOGLE_CSS_URL = "https://fonts.googleapis.com/css?family={family}:400,400italic,700&display=block"
+# Google only serves woff2 to user agents it knows support it.
+FONT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+CSS_FILE = "font.css"
+# After a failed download, ensure_font answers None for this long instead of hitting the network again.
+FAILURE_COOLDOWN = 300
+
+# The families offered in the Style tab; the overlay server only fetches these and the configured ones.
+GOOGLE_FONTS = [
+    "Roboto", "Open Sans", "Lato", "Montserrat", "Oswald", "Source Sans Pro",
+    "Slabo 27px", "Raleway", "PT Sans", "Merriweather", "Noto Sans", "Nunito",
+    "Concert One", "Prompt", "Work Sans", "Rubik", "Fjalla One", "Bangers",
+    "Poiret One", "Righteous", "Russo One", "Handlee", "Patrick Hand",
+    "Creepster", "Anton", "Orbitron", "Luckiest Guy", "Fredoka One",
+    "Special Elite", "Teko", "Alfa Slab One", "Audiowide", "Black Ops One",
+    "Carter One", "Changa One", "Passion One", "Press Start 2P", "Quantico",
+    "Sigmar One", "Squada One", "Syncopate", "Titan One", "Ultra",
+    "VT323", "Voltaire", "Wallpoet", "Yeon Sung", "Zilla Slab Highlight"
+]
+
+_URL_RE = re.compile(r"url\((https://fonts\.gstatic\.com/[^)]+)\)")
+_download_lock = threading.Lock()
+_failures = {}  # family -> time.monotonic() of its last failed download
+
+
+def family_slug(family):
+    return re.sub(r"[^A-Za-z0-9]+", "_", family or "").strip("_")
+
+
+def _family_dir(family):
+    return os.path.join(FONT_CACHE_DIR, family_slug(family))
+
+
+def cached_font_css(family):
+    """Returns the rewritten @font-face CSS for `family` if it is cached, else None."""
+    path = os.path.join(_family_dir(family), CSS_FILE)
+    if not family_slug(family) or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def ensure_font(family, timeout=10):
+    """Downloads `family` into the cache if needed. Returns the cached CSS, or None when offline."""
+    css = cached_font_css(family)
+    if css is not None or not family_slug(family) or _cooling_down(family):
+        return css
+    with _download_lock:
+        css = cached_font_css(family)
+        if css is not None or _cooling_down(family):
+            return css
+        headers = {"User-Agent": FONT_USER_AGENT}
+        url = GOOGLE_CSS_URL.format(family=urllib.parse.quote_plus(family))
+        try:
+            r = requests.get(url, headers=headers, timeout=timeout)
+            r.raise_for_status()
+            remote_css = r.text
+            family_dir = _family_dir(family)
+            os.makedirs(family_dir, exist_ok=True)
+            local_css = remote_css
+            for font_url in sorted(set(_URL_RE.findall(remote_css))):
+                # gstatic file names are content-addressed, so the cached copies never change.
+                file_name = os.path.basename(urllib.parse.urlparse(font_url).path)
+                target = os.path.join(family_dir, file_name)
+                if not os.path.exists(target):
+                    font_r = requests.get(font_url, headers=headers, timeout=timeout)
+                    font_r.raise_for_status()
+                    with open(target + ".tmp", "wb") as f:
+                        f.write(font_r.content)
+                    os.replace(target + ".tmp", target)
+                local_css = local_css.replace(font_url, f"{FONT_ROUTE}/{family_slug(family)}/{file_name}")
+            local_css = local_css.replace("font-display: swap", "font-display: block")
+            with open(os.path.join(family_dir, CSS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+                f.write(local_css)
+            os.replace(os.path.join(family_dir, CSS_FILE + ".tmp"), os.path.join(family_dir, CSS_FILE))
+            _failures.pop(family, None)
+            return local_css
+        except Exception as e:
+            print(f"Font cache error ({family}): {e}")
+            _failures[family] = time.monotonic()
+            return None
+
+
+def _cooling_down(family):
+    failed_at = _failures.get(family)
+    return failed_at is not None and time.monotonic() - failed_at < FAILURE_COOLDOWN
+
+
+def inline_font_css(family, base_url):
+    """Cached CSS with absolute URLs, for inlining into overlay.html (which OBS may open as a local file)."""
+    css = cached_font_css(family)
+    if css is None:
+        return ""
+    return css.replace(f"url({FONT_ROUTE}/", f"url({base_url}{FONT_ROUTE}/")
@@ -0,0 +1,25 @@
+# --- SEEN-REPOST HISTORY ---
+# The de-dupe set of repost hashes, persisted as a JSON list.
+
+import os
+import json
+
+HISTORY_FILE = "repost_history.json"
+
+
+def load_history(path=HISTORY_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return set(json.load(f))
+        except:
+            pass
+    return set()
+
+
+def save_history(seen, path=HISTORY_FILE):
+    try:
+        with open(path, "w") as f:
+            json.dump(list(seen), f)
+    except:
+        pass
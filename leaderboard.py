@@ -0,0 +1,180 @@
+# --- LIVE LEADERBOARD ---
+# "Recent N" and "top reposters this stream" for the overlay list view.
+# Counts live in a sliding time window; the top K are kept in a min-heap with
+# a position index, so a new repost costs O(log K) and the overlay is only
+# pushed a new version when the visible ranking actually changes.
+
+import time
+from collections import deque
+
+
+class SlidingTopK:
+    def __init__(self, k=5, window=4 * 3600):
+        self.k = max(1, int(k))
+        self.window = window
+        self.counts = {}      # user -> reposts inside the window
+        self.last_seen = {}   # user -> newest repost timestamp
+        self.events = deque()  # (ts, user), oldest first
+        self.heap = []        # min-heap of [count, last_ts, user]; root is the weakest of the top K
+        self.pos = {}         # user -> index in heap
+
+    # --- heap primitives (heapq has no decrease-key, so positions are tracked here) ---
+    def _swap(self, i, j):
+        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+        self.pos[self.heap[i][2]] = i
+        self.pos[self.heap[j][2]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self.heap[i][:2] < self.heap[parent][:2]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i):
+        n = len(self.heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self.heap[child][:2] < self.heap[smallest][:2]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+    def _push(self, user):
+        self.heap.append([self.counts[user], self.last_seen[user], user])
+        self.pos[user] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def _remove(self, user):
+        i = self.pos.pop(user)
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.pos[last[2]] = i
+            self._sift_up(i)
+            self._sift_down(self.pos[last[2]])
+
+    def _rank_key(self, user):
+        return self.counts[user], self.last_seen[user]
+
+    # --- public API ---
+    def add(self, user, ts=None):
+        """Counts one repost for `user`. Returns True if the top-K membership or order may have changed."""
+        ts = time.time() if ts is None else ts
+        changed = self.expire(ts)
+        self.events.append((ts, user))
+        self.counts[user] = self.counts.get(user, 0) + 1
+        self.last_seen[user] = max(ts, self.last_seen.get(user, ts))
+        if user in self.pos:
+            entry = self.heap[self.pos[user]]
+            entry[0], entry[1] = self._rank_key(user)
+            self._sift_down(self.pos[user])
+            return True
+        if len(self.heap) < self.k:
+            self._push(user)
+            return True
+        if self._rank_key(user) > tuple(self.heap[0][:2]):
+            evicted = self.heap[0][2]
+            del self.pos[evicted]
+            self.heap[0] = [self.counts[user], self.last_seen[user], user]
+            self.pos[user] = 0
+            self._sift_down(0)
+            return True
+        return changed
+
+    def expire(self, now=None):
+        """Drops reposts older than the window. Returns True if the top K was affected."""
+        now = time.time() if now is None else now
+        cutoff = now - self.window
+        touched = False
+        while self.events and self.events[0][0] < cutoff:
+            _, user = self.events.popleft()
+            self.counts[user] -= 1
+            if self.counts[user] <= 0:
+                del self.counts[user]
+                del self.last_seen[user]
+                if user in self.pos:
+                    self._remove(user)
+                    touched = True
+            elif user in self.pos:
+                self.heap[self.pos[user]][0] = self.counts[user]
+                self._sift_up(self.pos[user])
+                touched = True
+        if touched:
+            self._refill()
+        return touched
+
+    def _refill(self):
+        # Rare path (window expiry): an outsider may now outrank the weakest member.
+        while True:
+            outsiders = [u for u in self.counts if u not in self.pos]
+            if not outsiders:
+                return
+            best = max(outsiders, key=self._rank_key)
+            if len(self.heap) < self.k:
+                self._push(best)
+            elif self._rank_key(best) > tuple(self.heap[0][:2]):
+                self._remove(self.heap[0][2])
+                self._push(best)
+            else:
+                return
+
+    def resize(self, k):
+        k = max(1, int(k))
+        if k == self.k:
+            return
+        self.k = k
+        self.heap, self.pos = [], {}
+        for user in sorted(self.counts, key=self._rank_key, reverse=True)[:k]:
+            self._push(user)
+
+    def top(self):
+        ranked = sorted(self.heap, key=lambda e: (e[0], e[1]), reverse=True)
+        return [{"user": user, "count": count} for count, _, user in ranked]
+
+
+class Leaderboard:
+    """Recent N reposts plus the sliding-window top K, versioned for cheap change detection."""
+
+    def __init__(self, recent_limit=5, k=5, window=4 * 3600):
+        self.recent = deque(maxlen=max(1, int(recent_limit)))
+        self.top_k = SlidingTopK(k, window)
+        self.version = 0
+        self._last_top = []
+
+    def configure(self, recent_limit, k, window):
+        recent_limit = max(1, int(recent_limit))
+        if recent_limit != self.recent.maxlen:
+            self.recent = deque(self.recent, maxlen=recent_limit)
+            self.version += 1
+        self.top_k.window = window
+        self.top_k.resize(k)
+
+    def record(self, alerts, now=None):
+        """Adds alerts (oldest first). Returns True if what the overlay shows has changed."""
+        now = time.time() if now is None else now
+        if not alerts:
+            if self.top_k.expire(now):
+                return self._bump_if_changed()
+            return False
+        for alert in alerts:
+            self.recent.appendleft({"user": alert["user"], "video": alert["video"]})
+            self.top_k.add(alert["user"], now)
+        self._bump_if_changed(force=True)
+        return True
+
+    def _bump_if_changed(self, force=False):
+        top = self.top_k.top()
+        if force or top != self._last_top:
+            self._last_top = top
+            self.version += 1
+            return True
+        return False
+
+    def snapshot(self):
+        return {"version": self.version, "recent": list(self.recent), "top": list(self._last_top)}
@@ -0,0 +1,137 @@
+# --- LIVE WEBSOCKET CHANNEL ---
+# One bidirectional connection per overlay. The app pushes state snapshots
+# (same shape as /api/data) the moment anything changes, plus "stop" for the
+# test button; overlays ack render/audio-play times back so we can measure
+# real end-to-end latency. Overlays fall back to polling when it is down.
+
+import json
+import time
+import asyncio
+import threading
+
+import metrics
+
+try:
+    from websockets.asyncio.server import serve
+    from websockets.exceptions import ConnectionClosed
+except ImportError:
+    serve = None
+
+OVERLAY_ACK = metrics.REGISTRY.register(metrics.Histogram(
+    "rumble_overlay_ack_seconds", "Time from pushing an alert to an overlay acking render/audio play.",
+    ("event",)))
+LIVE_CLIENTS = metrics.REGISTRY.register(metrics.Gauge(
+    "rumble_live_clients", "Overlays connected over the live WebSocket channel."))
+
+
+class LiveChannel:
+    """Asyncio WebSocket server on its own thread; broadcast() is safe to call from any thread."""
+
+    def __init__(self, host="0.0.0.0", port=5051, snapshot=None, on_ack=None):
+        self.host = host
+        self.port = port
+        self.snapshot = snapshot or (lambda: {})
+        self.on_ack = on_ack
+        self.clients = set()
+        self.sent_at = {}
+        self.loop = None
+        self.thread = None
+        self._stop = None
+        self._ready = threading.Event()
+        LIVE_CLIENTS.set_function(lambda: len(self.clients))
+
+    @property
+    def available(self):
+        return serve is not None
+
+    def start(self):
+        if not self.available:
+            print("Live channel disabled: 'websockets' is not installed.")
+            return self
+        self.thread = threading.Thread(target=self._run, name="live-channel", daemon=True)
+        self.thread.start()
+        self._ready.wait(5)
+        return self
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._stop = self.loop.create_future()
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            print(f"Live channel error: {e}")
+        finally:
+            self._ready.set()
+            self.loop.close()
+
+    async def _serve(self):
+        async with serve(self._handler, self.host, self.port, ping_interval=20) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop
+
+    async def _handler(self, ws):
+        self.clients.add(ws)
+        try:
+            await ws.send(self._encode("state", self.snapshot()))
+            async for raw in ws:
+                self._handle_message(raw)
+        except ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(ws)
+
+    def _handle_message(self, raw):
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            return
+        if msg.get("type") != "ack":
+            return
+        event = msg.get("event")
+        sent = self.sent_at.get(msg.get("id"))
+        if event in ("render", "audio") and sent is not None:
+            OVERLAY_ACK.observe(max(0.0, time.time() - sent), event=event)
+        if self.on_ack:
+            self.on_ack(msg)
+
+    @staticmethod
+    def _encode(kind, payload):
+        return json.dumps(dict(payload, type=kind), sort_keys=True, default=str)
+
+    def broadcast(self, kind, payload=None):
+        """Pushes a message to every connected overlay without blocking the caller."""
+        if self.loop is None or not self.clients:
+            return
+        payload = payload or {}
+        alert_id = payload.get("data", {}).get("alert_id")
+        if alert_id is not None and alert_id not in self.sent_at:
+            self.sent_at[alert_id] = time.time()
+            for old in sorted(self.sent_at)[:-50]:
+                self.sent_at.pop(old, None)
+        text = self._encode(kind, payload)
+        try:
+            self.loop.call_soon_threadsafe(self._send_all, text)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def _send_all(self, text):
+        for ws in list(self.clients):
+            asyncio.ensure_future(self._send(ws, text))
+
+    async def _send(self, ws, text):
+        try:
+            await ws.send(text)
+        except ConnectionClosed:
+            self.clients.discard(ws)
+
+    def stop(self, timeout=2.0):
+        if self.loop is None or self._stop is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(lambda: self._stop.done() or self._stop.set_result(None))
+        except RuntimeError:
+            return
+        if self.thread:
+            self.thread.join(timeout)
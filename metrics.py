@@ -0,0 +1,319 @@
+# --- METRICS REGISTRY ---
+# Small thread-safe metric registry that renders the Prometheus text format.
+# Kept dependency-free so it can be bundled into the PyInstaller build as-is.
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def items(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self):
+        lines = []
+        for key, value in self.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        if not lines and not self.labelnames:
+            lines.append(f"{self.name} 0")
+        return lines
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._func = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        with self._lock:
+            self._value = float(value)
+
+    def set_function(self, func):
+        """Reads the value lazily at scrape time (e.g. a queue's qsize)."""
+        self._func = func
+
+    def value(self):
+        if self._func is not None:
+            try:
+                return float(self._func())
+            except Exception:
+                return 0.0
+        with self._lock:
+            return self._value
+
+    def render(self):
+        return [f"{self.name} {_format_value(self.value())}"]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0, "last": 0.0}
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+            series["last"] = value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return None
+            return {"counts": list(series["counts"]), "sum": series["sum"],
+                    "count": series["count"], "last": series["last"]}
+
+    def quantile(self, q, **labels):
+        """Estimates a quantile by linear interpolation inside the matching bucket."""
+        snap = self.snapshot(**labels)
+        if not snap or not snap["count"]:
+            return None
+        rank = q * snap["count"]
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, snap["counts"]):
+            if count and seen + count >= rank:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * ((rank - seen) / count)
+            seen += count
+            if bound != float("inf"):
+                lower = bound
+        return lower
+
+    def summary(self, **labels):
+        snap = self.snapshot(**labels)
+        if not snap or not snap["count"]:
+            return None
+        return {
+            "count": snap["count"],
+            "avg": snap["sum"] / snap["count"],
+            "last": snap["last"],
+            "p50": self.quantile(0.5, **labels),
+            "p95": self.quantile(0.95, **labels),
+        }
+
+    def series_keys(self):
+        with self._lock:
+            return sorted(self._series)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            series_items = sorted((k, dict(v, counts=list(v["counts"]))) for k, v in self._series.items())
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        out = []
+        for metric in metrics:
+            out.append(f"# HELP {metric.name} {metric.documentation}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.render())
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- TRACKER METRICS ---
+POLL_LATENCY = REGISTRY.register(Histogram(
+    "rumble_poll_request_seconds", "Latency of user.notification_feed requests in fetch mode."))
+POLL_RESPONSES = REGISTRY.register(Counter(
+    "rumble_poll_responses_total", "Feed poll responses by HTTP status ('error' for transport failures).",
+    ("status",)))
+BROWSER_FALLBACKS = REGISTRY.register(Counter(
+    "rumble_browser_fallback_total", "Times a 403 forced the tracker into headless browser mode."))
+BROWSER_CYCLE = REGISTRY.register(Histogram(
+    "rumble_browser_cycle_seconds", "Duration of one refresh/open-bell/scrape cycle in browser mode.",
+    buckets=(1.0, 2.5, 4.5, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0)))
+FEED_UNCHANGED = REGISTRY.register(Counter(
+    "rumble_feed_unchanged_total", "Polls skipped before parsing because the feed had not changed.", ("reason",)))
+FEED_SCHEMA_ERRORS = REGISTRY.register(Counter(
+    "rumble_feed_schema_errors_total", "Feed responses rejected because their shape no longer matches the schema."))
+FEED_ITEM_ERRORS = REGISTRY.register(Counter(
+    "rumble_feed_item_errors_total", "Feed items skipped because their shape does not match the schema."))
+PARSE_TIME = REGISTRY.register(Histogram(
+    "rumble_parse_seconds", "Time spent parsing and de-duplicating one batch of notifications.", ("mode",)))
+NEW_REPOSTS = REGISTRY.register(Counter(
+    "rumble_new_reposts_total", "New reposts detected and queued for display.", ("mode",)))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "rumble_repost_queue_depth", "Alerts waiting in REPOST_QUEUE."))
+QUEUE_WAIT = REGISTRY.register(Histogram(
+    "rumble_alert_queue_seconds", "Time from detection to the overlay first showing the alert.",
+    buckets=LATENCY_BUCKETS))
+ALERT_LATENCY = REGISTRY.register(Histogram(
+    "rumble_alert_latency_seconds", "Time from the repost's created_on to the overlay first showing it.",
+    buckets=LATENCY_BUCKETS))
+
+
+def timestamp_from_created_on(value):
+    """Converts Rumble's created_on (epoch or ISO-8601 string) to a unix timestamp, or None."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value / 1000.0 if value > 1e12 else value)
+    text = str(value).strip()
+    if text.isdigit():
+        return timestamp_from_created_on(int(text))
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def record_alert_shown(alert, now=None):
+    """Records detection and end-to-end latency for an alert the overlay is about to show."""
+    now = time.time() if now is None else now
+    queued_at = alert.get("queued_at")
+    if queued_at:
+        QUEUE_WAIT.observe(max(0.0, now - queued_at))
+    created_ts = timestamp_from_created_on(alert.get("created_on"))
+    if created_ts:
+        ALERT_LATENCY.observe(max(0.0, now - created_ts))
+
+
+def _fmt_seconds(value):
+    if value is None:
+        return "-"
+    if value < 1:
+        return f"{value * 1000:.0f}ms"
+    return f"{value:.2f}s"
+
+
+def stats_lines():
+    """Human-readable summary used by the in-app Stats tab."""
+    lines = []
+
+    def hist_line(title, hist, **labels):
+        s = hist.summary(**labels)
+        if not s:
+            lines.append(f"{title:<28} no data")
+            return
+        lines.append(f"{title:<28} n={s['count']:<6} avg={_fmt_seconds(s['avg']):<8} "
+                     f"p50={_fmt_seconds(s['p50']):<8} p95={_fmt_seconds(s['p95']):<8} "
+                     f"last={_fmt_seconds(s['last'])}")
+
+    hist_line("Poll request", POLL_LATENCY)
+    statuses = ", ".join(f"{k[0]}={int(v)}" for k, v in POLL_RESPONSES.items()) or "none"
+    lines.append(f"{'Poll responses':<28} {statuses}")
+    lines.append(f"{'403 browser fallbacks':<28} {int(BROWSER_FALLBACKS.value())}")
+    unchanged = ", ".join(f"{k[0]}={int(v)}" for k, v in FEED_UNCHANGED.items()) or "none"
+    lines.append(f"{'Unchanged polls skipped':<28} {unchanged}")
+    lines.append(f"{'Feed schema errors':<28} {int(FEED_SCHEMA_ERRORS.value())}")
+    lines.append(f"{'Feed items skipped':<28} {int(FEED_ITEM_ERRORS.value())}")
+    hist_line("Browser cycle", BROWSER_CYCLE)
+    for key in PARSE_TIME.series_keys():
+        hist_line(f"Parse ({key[0]})", PARSE_TIME, mode=key[0])
+    reposts = ", ".join(f"{k[0]}={int(v)}" for k, v in NEW_REPOSTS.items()) or "none"
+    lines.append(f"{'New reposts':<28} {reposts}")
+    lines.append(f"{'Queue depth':<28} {int(QUEUE_DEPTH.value())}")
+    hist_line("Detected -> on screen", QUEUE_WAIT)
+    hist_line("created_on -> on screen", ALERT_LATENCY)
+    return lines
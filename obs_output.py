@@ -0,0 +1,265 @@
+# --- OBS WEBSOCKET OUTPUT ---
+# Optional alert output that drives OBS directly over obs-websocket v5
+# instead of through a browser source polling /api/data. It listens to the
+# same state changes as the live channel and, on its own thread, pushes the
+# alert text into a Text source and shows/hides a scene item over one
+# persistent connection. Every change goes out as a single RequestBatch;
+# updates that arrive while a batch is in flight are coalesced, so only the
+# latest state is ever sent.
+
+import json
+import time
+import base64
+import hashlib
+import threading
+from contextlib import ExitStack
+
+import metrics
+
+try:
+    from websockets.sync.client import connect
+    from websockets.protocol import State
+except ImportError:
+    connect = None
+
+OBS_SUBPROTOCOL = "obswebsocket.json"
+RPC_VERSION = 1
+
+# Opcodes (obs-websocket 5.x protocol).
+OP_HELLO, OP_IDENTIFY, OP_IDENTIFIED = 0, 1, 2
+OP_REQUEST, OP_REQUEST_RESPONSE = 6, 7
+OP_REQUEST_BATCH, OP_REQUEST_BATCH_RESPONSE = 8, 9
+
+MEDIA_RESTART = "OBS_WEBSOCKET_MEDIA_INPUT_ACTION_RESTART"
+
+OBS_BATCH = metrics.REGISTRY.register(metrics.Histogram(
+    "rumble_obs_batch_seconds", "Round trip of one RequestBatch to OBS."))
+OBS_ERRORS = metrics.REGISTRY.register(metrics.Counter(
+    "rumble_obs_errors_total", "OBS output failures by kind.", ("kind",)))
+
+
+class OBSError(Exception):
+    pass
+
+
+def auth_string(password, salt, challenge):
+    """obs-websocket v5 authentication: base64(sha256(base64(sha256(password + salt)) + challenge))."""
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode("utf-8")).digest())
+    return base64.b64encode(hashlib.sha256(secret + challenge.encode("utf-8")).digest()).decode("ascii")
+
+
+def alert_text(alert, config):
+    fmt = config.get("obs_text_format") or "{title}\n{user}\n{video}"
+    values = {"title": alert.get("title") or config.get("title_text", ""), "user": alert.get("user", ""),
+              "video": alert.get("video", ""), "kind": alert.get("kind", "repost")}
+    try:
+        return fmt.format(**values)
+    except (KeyError, IndexError, ValueError):
+        return "{title}\n{user}\n{video}".format(**values)
+
+
+class OBSClient:
+    """Blocking obs-websocket v5 client: connect/identify, single requests and request batches."""
+
+    def __init__(self, url="ws://127.0.0.1:4455", password="", timeout=5.0):
+        self.url = url
+        self.password = password
+        self.timeout = timeout
+        self.ws = None
+        self._stack = None
+        self._next_id = 0
+
+    @property
+    def connected(self):
+        return self.ws is not None and self.ws.state is State.OPEN
+
+    def connect(self):
+        if connect is None:
+            raise OBSError("'websockets' is not installed")
+        self._stack = ExitStack()
+        self.ws = self._stack.enter_context(connect(self.url, subprotocols=[OBS_SUBPROTOCOL],
+                                                    open_timeout=self.timeout, close_timeout=1, max_size=2 ** 22))
+        try:
+            hello = self._recv(OP_HELLO)
+            identify = {"rpcVersion": RPC_VERSION, "eventSubscriptions": 0}
+            auth = hello.get("authentication")
+            if auth:
+                if not self.password:
+                    raise OBSError("OBS requires a password (obs_password)")
+                identify["authentication"] = auth_string(self.password, auth["salt"], auth["challenge"])
+            self._send(OP_IDENTIFY, identify)
+            self._recv(OP_IDENTIFIED)
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def close(self):
+        if self._stack is not None:
+            try:
+                self._stack.close()
+            except Exception:
+                pass
+            self._stack = self.ws = None
+
+    def _request_id(self):
+        self._next_id += 1
+        return f"rrt-{self._next_id}"
+
+    def _send(self, op, data):
+        self.ws.send(json.dumps({"op": op, "d": data}))
+
+    def _recv(self, op, request_id=None):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No reply from OBS for op {op}")
+            msg = json.loads(self.ws.recv(timeout=remaining))
+            if msg.get("op") == op and (request_id is None or msg["d"].get("requestId") == request_id):
+                return msg["d"]
+            # Anything else (events, stale replies) is ignored.
+
+    def request(self, request_type, data=None):
+        """Sends one request and returns its responseData; raises OBSError if OBS rejects it."""
+        request_id = self._request_id()
+        self._send(OP_REQUEST, {"requestType": request_type, "requestId": request_id, "requestData": data or {}})
+        reply = self._recv(OP_REQUEST_RESPONSE, request_id)
+        status = reply.get("requestStatus", {})
+        if not status.get("result"):
+            raise OBSError(f"{request_type} failed: {status.get('comment') or status.get('code')}")
+        return reply.get("responseData") or {}
+
+    def batch(self, requests):
+        """Runs [(requestType, requestData), ...] as one serial RequestBatch; returns the per-request results."""
+        request_id = self._request_id()
+        self._send(OP_REQUEST_BATCH, {
+            "requestId": request_id, "haltOnFailure": False, "executionType": 0,
+            "requests": [{"requestType": t, "requestData": d} for t, d in requests]})
+        return self._recv(OP_REQUEST_BATCH_RESPONSE, request_id).get("results", [])
+
+
+class OBSOutput:
+    """State listener that mirrors the current alert into OBS. listener() never blocks."""
+
+    def __init__(self, config, on_shown=None, log=print, client=None):
+        self.config = config
+        self.on_shown = on_shown
+        self.log = log
+        self.client = client or OBSClient(config.get("obs_url", "ws://127.0.0.1:4455"),
+                                          config.get("obs_password", ""))
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.pending = None
+        self.latest = None
+        # "audio" is the last audio_timestamp played; it survives reconnects so a sound never replays.
+        self.sent = {"visible": None, "text": None, "audio": 0}
+        self.scene = None
+        self.item_id = None
+        self.thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="obs-output", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self.client.close()
+
+    def listener(self, kind, payload):
+        data = payload.get("data") or {}
+        state = {"alert_id": data.get("alert_id"), "visible": bool(data.get("is_visible")),
+                 "alert": data.get("current_alert") or {}, "audio": data.get("audio_timestamp"),
+                 "config": payload.get("config") or self.config}
+        with self.lock:
+            self.pending = self.latest = state
+        self.wake.set()
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            if not self.client.connected:
+                try:
+                    self.client.close()
+                    self._connect()
+                    backoff = 1.0
+                except Exception as e:
+                    self.client.close()
+                    OBS_ERRORS.inc(kind="connect")
+                    if backoff == 1.0:
+                        self.log(f"OBS connection failed: {e}")
+                    self._stop.wait(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                    continue
+            self.wake.wait(1.0)
+            self.wake.clear()
+            with self.lock:
+                state, self.pending = self.pending, None
+            if state is None:
+                continue
+            try:
+                self._apply(state)
+            except Exception as e:
+                OBS_ERRORS.inc(kind="request")
+                self.log(f"OBS output error: {e}")
+                self.client.close()
+                self.wake.set()
+
+    def _connect(self):
+        self.client.connect()
+        self.sent.update(visible=None, text=None)
+        self.scene = self.config.get("obs_scene") or self.client.request("GetCurrentProgramScene").get(
+            "currentProgramSceneName")
+        self.item_id = None
+        source = self.config.get("obs_source")
+        if source:
+            self.item_id = self.client.request("GetSceneItemId", {"sceneName": self.scene, "sourceName": source})[
+                "sceneItemId"]
+        self.log(f"Connected to OBS ({self.scene}).")
+        with self.lock:
+            # Bring a fresh connection up to date with whatever is (or is not) on screen now.
+            self.pending = self.pending or self.latest
+
+    def _requests(self, state):
+        """Only what differs from what OBS already shows goes into the batch."""
+        config = state["config"]
+        requests = []
+        visible = state["visible"] and bool(state["alert"])
+        if visible:
+            text = alert_text(state["alert"], config)
+            if text != self.sent["text"] and config.get("obs_text_source"):
+                requests.append(("SetInputSettings", {"inputName": config["obs_text_source"],
+                                                      "inputSettings": {"text": text}, "overlay": True}))
+                self.sent["text"] = text
+        if visible != self.sent["visible"] and self.item_id is not None:
+            requests.append(("SetSceneItemEnabled", {"sceneName": self.scene, "sceneItemId": self.item_id,
+                                                     "sceneItemEnabled": visible}))
+            self.sent["visible"] = visible
+        if visible and config.get("obs_media_source") and (state["audio"] or 0) > self.sent["audio"]:
+            requests.append(("TriggerMediaInputAction", {"inputName": config["obs_media_source"],
+                                                         "mediaAction": MEDIA_RESTART}))
+            self.sent["audio"] = state["audio"]
+        return requests
+
+    def _apply(self, state):
+        sent_before = dict(self.sent)
+        requests = self._requests(state)
+        if requests:
+            start = time.perf_counter()
+            try:
+                results = self.client.batch(requests)
+            except Exception:
+                self.sent = sent_before
+                raise
+            OBS_BATCH.observe(time.perf_counter() - start)
+            failed = [r for r in results if not r.get("requestStatus", {}).get("result")]
+            for r in failed:
+                OBS_ERRORS.inc(kind="rejected")
+                self.log(f"OBS rejected {r.get('requestType')}: {r.get('requestStatus', {}).get('comment')}")
+        if state["visible"] and state["alert"] and self.on_shown:
+            self.on_shown(state["alert_id"])
@@ -0,0 +1,574 @@
+# --- OVERLAY WEB SERVER & SHARED STATE ---
+# Everything the OBS browser source talks to lives here, with no GUI imports,
+# so the alert pipeline can be driven headless (benchmarks, soak runs).
+
+import os
+import json
+import time
+import zlib
+import queue
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, jsonify, send_file, send_from_directory, request, Response
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+import metrics
+import font_cache
+import event_router
+from leaderboard import Leaderboard
+
+try:
+    from waitress import wasyncore
+    from waitress.channel import HTTPChannel
+    from waitress.server import create_server as create_waitress_server
+except ImportError:
+    create_waitress_server = None
+
+# --- LOGGING SETUP ---
+log = logging.getLogger('werkzeug')
+log.setLevel(logging.ERROR)
+
+TEMPLATE_FILE = "overlay.html"
+
+DEFAULT_CONFIG = {
+    "sound_file": "",
+    "poll_interval": 5,
+    "overlay_port": 5050,
+    "overlay_host": "0.0.0.0",
+    "overlay_server": "waitress",
+    "overlay_threads": 8,
+    "overlay_connection_limit": 100,
+    "overlay_keepalive": 30,
+    "live_port": 5051,
+    "font_size": 14,
+    "repost_limit": 5,
+    "overlay_mode": "alert",
+    "overlay_profiles": {},
+    "leaderboard_size": 5,
+    "leaderboard_window_minutes": 240,
+    "journal_replay_minutes": 30,
+    "alert_sinks": [],
+    "obs_output": False,
+    "obs_url": "ws://127.0.0.1:4455",
+    "obs_password": "",
+    "obs_scene": "",
+    "obs_source": "Repost Alert",
+    "obs_text_source": "Repost Alert Text",
+    "obs_text_format": "{title}\n{user}\n{video}",
+    "obs_media_source": "",
+    "font_family": "Roboto",
+    "recent_color": "#85c742",
+    "older_color": "#ffffff",
+    "title_text": "NEW REPOST",
+    "alert_types": {kind: dict(v) for kind, v in event_router.DEFAULT_ALERT_TYPES.items()},
+    "title_color": "#ffffff",
+    "title_size": 24,
+    "title_align": "center",
+    "browser_path": "",
+    "selected_browser": "Auto-Detect",
+    "use_override": False,
+    "remember_login": True,
+    "session_renew_minutes": 60,
+    "audio_volume": 0.5,
+    "chrome_version": 0,
+    "browser_max_cycles": 500,
+    "browser_max_rss_mb": 1500,
+    "browser_max_cpu_percent": 0
+}
+
+# Minimum on-screen time for an alert, and the gap before the next one.
+ALERT_MIN_DISPLAY = 10.0
+ALERT_GAP = 5.0
+# How often the presenter drops leaderboard entries that left the time window, even with no new reposts.
+LEADERBOARD_EXPIRY_TICK = 30.0
+
+# --- GLOBAL SHARED STATE ---
+GLOBAL_CONFIG = DEFAULT_CONFIG.copy()
+
+TRACKER_STATE = {
+    "current_alert": None,
+    "is_visible": False,
+    "audio_timestamp": 0,
+    "last_update_id": 0,
+    "alert_id": 0
+}
+
+LEADERBOARD = Leaderboard()
+# The tracker thread (new reposts) and the presenter (expiry tick) both update it; neither the board nor its
+# heap is thread-safe, so every update and the snapshot overlays read happen under this lock.
+LEADERBOARD_LOCK = threading.Lock()
+TRACKER_STATE["leaderboard"] = LEADERBOARD.snapshot()
+
+REPOST_QUEUE = queue.Queue()
+metrics.QUEUE_DEPTH.set_function(REPOST_QUEUE.qsize)
+
+# The alert the overlay was last served, so latency is recorded once per alert.
+LAST_SERVED_ALERT = {"alert": None}
+
+# Overlay page template (set by the app) and the page rendered from it for each profile, kept in
+# memory so overlay requests never touch the disk. "renders" maps profile -> (font family, html).
+OVERLAY_HTML = {"template": None, "live_url": "", "renders": {}}
+
+# Style settings a named overlay profile may override. Everything else (alerts, sound timing,
+# leaderboard) is shared, so all profiles show the same alert stream from one state version.
+PROFILE_KEYS = ("font_family", "title_text", "title_color", "title_size", "title_align",
+                "recent_color", "older_color", "overlay_mode", "sound_file", "audio_volume")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# Callables invoked as listener(kind, payload) whenever overlay state changes (e.g. LiveChannel.broadcast).
+STATE_LISTENERS = []
+
+# Repost analytics (RepostStore), set by the app once the database is open.
+ANALYTICS = {"store": None}
+
+# Alert journal (AlertJournal); alerts are acked in it the first time an overlay shows them.
+JOURNAL = {"journal": None}
+
+# Unsaved style edits from the Style tab; overlays render these until the next save.
+PREVIEW_CONFIG = {"config": None}
+
+# Bumped on every config change (save or preview) so overlays re-apply styles only when it moves.
+# "sounds" maps alert kind -> tag of its sound file; a new tag is the only thing that makes overlays
+# fetch and decode a sound again. "profiles" holds each profile's overrides and "profile_sounds" its tags.
+CONFIG_STATE = {"version": 1, "sounds": None, "profiles": None, "profile_sounds": None}
+
+
+def sound_tags(config):
+    tags = {}
+    for kind in event_router.ALERT_KINDS:
+        path = event_router.sound_for(kind, config)
+        try:
+            tags[kind] = f"{int(os.path.getmtime(path))}-{zlib.crc32(path.encode('utf-8')):08x}" if path else ""
+        except OSError:
+            tags[kind] = ""
+    return tags
+
+
+def profile_overrides(config):
+    """{profile: {key: value}} for every configured overlay profile, limited to PROFILE_KEYS."""
+    profiles = config.get("overlay_profiles") or {}
+    return {name: {k: v for k, v in overrides.items() if k in PROFILE_KEYS}
+            for name, overrides in profiles.items() if isinstance(overrides, dict)}
+
+
+def configured_fonts(config):
+    """Font families the config and its overlay profiles use."""
+    families = {config.get("font_family", "Roboto")}
+    families.update(p["font_family"] for p in profile_overrides(config).values() if p.get("font_family"))
+    return families
+
+
+def profile_config(profile, config=None):
+    """`config` (default: what overlays currently show) with a profile's overrides; None if it does not exist."""
+    config = (PREVIEW_CONFIG["config"] or GLOBAL_CONFIG) if config is None else config
+    if not profile:
+        return config
+    overrides = profile_overrides(config).get(profile)
+    return None if overrides is None else dict(config, **overrides)
+
+
+def state_snapshot():
+    if CONFIG_STATE["sounds"] is None:
+        profiles = profile_overrides(GLOBAL_CONFIG)
+        CONFIG_STATE["profile_sounds"] = {name: sound_tags(dict(GLOBAL_CONFIG, **overrides))
+                                          for name, overrides in profiles.items()}
+        CONFIG_STATE["sounds"] = sound_tags(GLOBAL_CONFIG)
+    config = PREVIEW_CONFIG["config"] or GLOBAL_CONFIG
+    if CONFIG_STATE["profiles"] is None:
+        CONFIG_STATE["profiles"] = profile_overrides(config)
+    return {"data": TRACKER_STATE, "config": config, "config_version": CONFIG_STATE["version"],
+            "sounds": CONFIG_STATE["sounds"], "profiles": CONFIG_STATE["profiles"],
+            "profile_sounds": CONFIG_STATE["profile_sounds"]}
+
+
+def set_preview_config(config):
+    PREVIEW_CONFIG["config"] = config
+    CONFIG_STATE["version"] += 1
+    CONFIG_STATE["sounds"] = CONFIG_STATE["profiles"] = None
+    publish_state()
+
+
+def render_overlay(profile=""):
+    """The overlay page for a profile, rendered once per template and font; None if there is nothing to serve."""
+    template = OVERLAY_HTML["template"]
+    config = profile_config(profile, GLOBAL_CONFIG)
+    if template is None or config is None:
+        return None
+    family = config.get("font_family", "Roboto")
+    cached = OVERLAY_HTML["renders"].get(profile)
+    if cached is not None and cached[0] == family:
+        return cached[1]
+    font_css = font_cache.inline_font_css(family, overlay_url())
+    html = (template.replace("__API_URL__", overlay_url())
+            .replace("__LIVE_URL__", OVERLAY_HTML["live_url"])
+            .replace("__PROFILE__", json.dumps(profile))
+            .replace("__FONT_FACE_CSS__", font_css)
+            .replace("__FONT_STACK__", f"'{family}', sans-serif" if font_css else "sans-serif")
+            .replace("__LOCAL_FONT__", json.dumps(family if font_css else "")))
+    OVERLAY_HTML["renders"][profile] = (family, html)
+    return html
+
+
+def set_overlay_template(template, live=""):
+    """Installs a new overlay template and pre-renders every profile from it; returns the default page."""
+    OVERLAY_HTML.update(template=template, live_url=live, renders={})
+    for profile in profile_overrides(GLOBAL_CONFIG):
+        render_overlay(profile)
+    return render_overlay()
+
+
+def publish_state(kind="state"):
+    payload = state_snapshot()
+    for listener in list(STATE_LISTENERS):
+        try:
+            listener(kind, payload)
+        except Exception as e:
+            print(f"State listener error: {e}")
+
+
+def show_alert(alert_data, play_audio=False):
+    TRACKER_STATE["current_alert"] = alert_data
+    TRACKER_STATE["alert_id"] += 1
+    TRACKER_STATE["is_visible"] = True
+    if play_audio:
+        TRACKER_STATE["audio_timestamp"] = time.time()
+    publish_state()
+
+
+def hide_alert():
+    TRACKER_STATE["is_visible"] = False
+    publish_state()
+
+
+def record_leaderboard(alerts):
+    """Feeds new alerts (oldest first) to the leaderboard; pushes to overlays only if the view changed."""
+    with LEADERBOARD_LOCK:
+        LEADERBOARD.configure(GLOBAL_CONFIG.get("repost_limit", 5), GLOBAL_CONFIG.get("leaderboard_size", 5),
+                              float(GLOBAL_CONFIG.get("leaderboard_window_minutes", 240)) * 60)
+        changed = LEADERBOARD.record(alerts)
+        if changed:
+            TRACKER_STATE["leaderboard"] = LEADERBOARD.snapshot()
+    if changed:
+        publish_state()
+
+
+def mark_alert_served():
+    """Records on-screen latency the first time an overlay is handed the current alert."""
+    alert = TRACKER_STATE["current_alert"]
+    if TRACKER_STATE["is_visible"] and alert and alert is not LAST_SERVED_ALERT["alert"]:
+        LAST_SERVED_ALERT["alert"] = alert
+        metrics.record_alert_shown(alert)
+        if JOURNAL["journal"] is not None:
+            try:
+                JOURNAL["journal"].ack(alert.get("journal_id"))
+            except Exception as e:
+                print(f"Journal Error: {e}")
+
+
+def handle_overlay_ack(msg):
+    if msg.get("event") == "render" and msg.get("id") == TRACKER_STATE["alert_id"]:
+        mark_alert_served()
+
+# --- FLASK WEB SERVER ---
+app = Flask(__name__)
+app.json.sort_keys = True
+
+
+@app.after_request
+def add_headers(response):
+    if response.headers.get("Cache-Control") != IMMUTABLE_CACHE:
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
+@app.route('/')
+def index():
+    html = render_overlay()
+    if html is not None:
+        return html
+    try:
+        with open(TEMPLATE_FILE, 'r', encoding='utf-8') as f:
+            return f.read()
+    except:
+        return "Overlay HTML not found. Run app to generate it."
+
+
+@app.route('/overlay/<profile>')
+def profile_overlay(profile):
+    if profile_config(profile, GLOBAL_CONFIG) is None:
+        return f"Unknown overlay profile '{profile}'", 404
+    html = render_overlay(profile)
+    if html is None:
+        return "Overlay HTML not found. Run app to generate it.", 503
+    return html
+
+
+@app.route('/fonts/css')
+def font_css():
+    family = request.args.get("family", "")
+    # The server may listen on the LAN: only the offered and configured families are ever served.
+    allowed = configured_fonts(GLOBAL_CONFIG) | configured_fonts(PREVIEW_CONFIG["config"] or GLOBAL_CONFIG)
+    if family not in font_cache.GOOGLE_FONTS and family not in allowed:
+        return "Font not available", 404
+    # Only ever serve what the app already cached: downloads happen in the background (cache_selected_font),
+    # never in a request worker. A miss gets an empty sheet so the page keeps its sans-serif fallback.
+    css = font_cache.cached_font_css(family)
+    if css is None:
+        return Response("/* not cached yet */", mimetype="text/css")
+    return Response(css, mimetype="text/css")
+
+
+@app.route('/fonts/<slug>/<filename>')
+def font_file(slug, filename):
+    response = send_from_directory(os.path.abspath(font_cache.FONT_CACHE_DIR), f"{slug}/{filename}")
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    return response
+
+
+@app.route('/current_sound')
+def current_sound():
+    config = profile_config(request.args.get("profile", ""), GLOBAL_CONFIG) or GLOBAL_CONFIG
+    path = event_router.sound_for(request.args.get("kind", "repost"), config)
+    if not path:
+        return "No file selected", 404
+    response = send_file(path)
+    # Versioned URLs (?v=<sound tag>) change whenever the file does, so they can be cached for good.
+    if request.args.get("v"):
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    return response
+
+
+@app.route('/api/data')
+def get_data():
+    mark_alert_served()
+    return jsonify(state_snapshot())
+
+
+@app.route('/api/stats')
+def get_stats():
+    store = ANALYTICS["store"]
+    if store is None:
+        return jsonify({"error": "Analytics store not available"}), 503
+    view = request.args.get("view", "summary")
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+    hours = min(max(request.args.get("hours", 24, type=int), 1), 24 * 31)
+    if view == "top_reposters":
+        since = time.time() - hours * 3600 if "hours" in request.args else None
+        return jsonify({"top_reposters": store.top_reposters(limit, since=since)})
+    if view == "videos":
+        return jsonify({"videos": store.video_counts(limit)})
+    if view == "hourly":
+        return jsonify({"hourly": store.hourly(hours)})
+    if view == "summary":
+        return jsonify({"summary": store.summary(), "top_reposters": store.top_reposters(limit),
+                        "videos": store.video_counts(limit), "hourly": store.hourly(hours)})
+    return jsonify({"error": f"Unknown view '{view}'"}), 400
+
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+def overlay_address():
+    """Host to put in overlay URLs: the configured overlay_host, or loopback when it is a wildcard."""
+    host = str(GLOBAL_CONFIG.get("overlay_host", "0.0.0.0") or "0.0.0.0")
+    if host in ("0.0.0.0", "::"):
+        return "127.0.0.1"
+    return f"[{host}]" if ":" in host else host
+
+
+def overlay_url(path=""):
+    """URL of the overlay, for OBS, the preview window and the generated page."""
+    return f"http://{overlay_address()}:{int(GLOBAL_CONFIG.get('overlay_port', 5050))}{path}"
+
+
+def live_url():
+    return f"ws://{overlay_address()}:{int(GLOBAL_CONFIG.get('live_port', 5051))}"
+
+
+# --- HTTP SERVER ---
+class _KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 30  # idle keep-alive seconds, overridden per server
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug server with a bounded worker pool instead of a thread per connection."""
+
+    multithread = True
+
+    def __init__(self, host, port, wsgi_app, threads=8, keepalive=30):
+        handler = type("OverlayRequestHandler", (_KeepAliveHandler,), {"timeout": keepalive})
+        super().__init__(host, port, wsgi_app, handler=handler)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="overlay-http")
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.connections_lock:
+            self.connections.add(request)
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self.connections_lock:
+                self.connections.discard(request)
+            self.shutdown_request(request)
+
+    def close_connections(self):
+        """Unblocks workers parked on idle keep-alive connections."""
+        with self.connections_lock:
+            connections = list(self.connections)
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class OverlayServer:
+    """Serves the Flask app with waitress when installed, else a pooled Werkzeug server."""
+
+    def __init__(self, config=None, wsgi_app=None):
+        config = GLOBAL_CONFIG if config is None else config
+        self.app = wsgi_app or app
+        self.host = config.get("overlay_host", "0.0.0.0")
+        self.port = int(config.get("overlay_port", 5050))
+        self.threads = max(1, int(config.get("overlay_threads", 8)))
+        self.connection_limit = max(1, int(config.get("overlay_connection_limit", 100)))
+        self.keepalive = max(1, int(config.get("overlay_keepalive", 30)))
+        self.backend = config.get("overlay_server", "waitress")
+        if self.backend == "waitress" and create_waitress_server is None:
+            self.backend = "builtin"
+        self.server = None
+        self.thread = None
+        self._stopping = threading.Event()
+        self._stop_timeout = 5.0
+
+    def start(self):
+        self._stopping.clear()
+        if self.backend == "waitress":
+            self.server = create_waitress_server(self.app, host=self.host, port=self.port, threads=self.threads,
+                                                 connection_limit=self.connection_limit,
+                                                 channel_timeout=self.keepalive, ident="RumbleRepostTracker")
+            self.port = self.server.effective_port
+            target = self._run_waitress
+        else:
+            self.server = PooledWSGIServer(self.host, self.port, self.app, threads=self.threads,
+                                           keepalive=self.keepalive)
+            self.port = self.server.server_port
+            target = self.server.serve_forever
+        self.thread = threading.Thread(target=target, name="overlay-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run_waitress(self):
+        # waitress's own run() loops until its sockets are closed under it, which races select() in this
+        # thread. Run the loop here instead, so the shutdown happens on the thread that owns the sockets.
+        # waitress has no public API for a graceful stop, so this uses its socket map, channel buffers and
+        # task dispatcher; requirements.txt pins the version and test_overlay_server_stop_drains_in_flight_requests
+        # covers the drain.
+        server = self.server
+        loop_timeout = server.adj.asyncore_loop_timeout
+        while not self._stopping.is_set():
+            wasyncore.loop(timeout=loop_timeout, map=server._map, use_poll=server.adj.asyncore_use_poll, count=1)
+        server.close()
+        deadline = time.time() + self._stop_timeout
+        while time.time() < deadline and any(isinstance(channel, HTTPChannel) and (
+                channel.requests or channel.total_outbufs_len) for channel in list(server._map.values())):
+            wasyncore.loop(timeout=0.05, map=server._map, use_poll=server.adj.asyncore_use_poll, count=1)
+        server.task_dispatcher.shutdown(timeout=max(0.0, deadline - time.time()))
+        wasyncore.close_all(server._map)
+
+    def stop(self, timeout=5.0):
+        """Stops accepting, lets in-flight requests finish (up to `timeout`), then closes idle connections."""
+        server, self.server = self.server, None
+        if server is None:
+            return
+        if self.backend == "waitress":
+            # The serving thread stops accepting, drains and closes everything itself (see _run_waitress).
+            self._stop_timeout = timeout
+            self._stopping.set()
+            server.pull_trigger()
+        else:
+            server.shutdown()
+            server.server_close()
+            server.pool.shutdown(wait=False, cancel_futures=True)
+            # Idle keep-alive sockets never finish on their own; in-flight requests get a moment first.
+            grace = time.time() + 0.25
+            deadline = time.time() + timeout
+            while server.connections and time.time() < deadline:
+                if time.time() >= grace:
+                    server.close_connections()
+                time.sleep(0.05)
+        if self.thread:
+            self.thread.join(timeout + 1)
+
+
+# --- ALERT QUEUE ---
+class AlertPresenter:
+    """Pops alerts off the queue and shows them on the overlay one at a time."""
+
+    def __init__(self, alert_queue=None, sound_length=None, is_muted=None,
+                 min_display=ALERT_MIN_DISPLAY, gap=ALERT_GAP, expiry_tick=LEADERBOARD_EXPIRY_TICK):
+        self.alert_queue = alert_queue if alert_queue is not None else REPOST_QUEUE
+        self.sound_length = sound_length or (lambda path: 0.0)
+        self.is_muted = is_muted or (lambda: False)
+        self.min_display = min_display
+        self.gap = gap
+        self.expiry_tick = expiry_tick
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Ends run() once the alert on screen (if any) has finished."""
+        self._stop.set()
+
+    def present(self, alert_data):
+        audio_path = event_router.sound_for(alert_data.get("kind", "repost"), GLOBAL_CONFIG)
+        play_audio = bool(audio_path and not self.is_muted())
+        show_alert(alert_data, play_audio=play_audio)
+        audio_duration = 0.0
+        if play_audio:
+            try:
+                audio_duration = self.sound_length(audio_path)
+            except:
+                pass
+        display_time = max(self.min_display, audio_duration)
+        time.sleep(display_time)
+        hide_alert()
+        time.sleep(self.gap)
+
+    def run(self):
+        next_expiry = time.monotonic() + self.expiry_tick
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_expiry:
+                    # Reposts only reach the leaderboard when new ones arrive; age out the old ones here.
+                    next_expiry = time.monotonic() + self.expiry_tick
+                    record_leaderboard([])
+                try:
+                    alert_data = self.alert_queue.get(timeout=min(0.5, self.expiry_tick))
+                except queue.Empty:
+                    continue
+                try:
+                    self.present(alert_data)
+                finally:
+                    self.alert_queue.task_done()
+            except Exception as e:
+                print(f"Queue Error: {e}")
+                time.sleep(1)
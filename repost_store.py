@@ -0,0 +1,111 @@
+# --- REPOST ANALYTICS STORE ---
+# Every detected repost is kept as a row in a local SQLite database, and
+# per-user / per-video / per-hour rollup tables are bumped in the same
+# transaction, so /api/stats answers from the rollups instead of scanning.
+
+import time
+import sqlite3
+import threading
+
+import metrics
+
+DB_FILE = "repost_analytics.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reposts (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    video TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL,
+    created_on TEXT NOT NULL DEFAULT '',
+    ts REAL NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reposts_user ON reposts(user);
+CREATE INDEX IF NOT EXISTS idx_reposts_video ON reposts(video);
+CREATE INDEX IF NOT EXISTS idx_reposts_ts ON reposts(ts);
+
+CREATE TABLE IF NOT EXISTS rollup_user (user TEXT PRIMARY KEY, count INTEGER NOT NULL, last_ts REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS rollup_video (video TEXT PRIMARY KEY, count INTEGER NOT NULL, last_ts REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS rollup_hour (hour INTEGER PRIMARY KEY, count INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_rollup_user_count ON rollup_user(count DESC);
+CREATE INDEX IF NOT EXISTS idx_rollup_video_count ON rollup_video(count DESC);
+"""
+
+
+class RepostStore:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # Version 0 stored Rumble's raw notification type ("video_reposted") as the kind; only
+                # reposts are ever recorded here.
+                self.conn.execute("UPDATE reposts SET kind = 'repost' WHERE kind != 'repost'")
+                self.conn.execute("PRAGMA user_version = 1")
+
+    def record(self, candidates, source, seen_at=None):
+        """Stores new repost candidates and updates the rollups incrementally. Returns rows inserted."""
+        seen_at = time.time() if seen_at is None else seen_at
+        inserted = 0
+        with self.lock, self.conn:
+            for c in candidates:
+                ts = metrics.timestamp_from_created_on(c.get("created_on")) or seen_at
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO reposts (id, user, video, kind, source, created_on, ts, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (c["id"], c["user"], c["video"], c.get("kind", "repost"), source, str(c.get("created_on", "")),
+                     ts, seen_at))
+                if cur.rowcount != 1:
+                    continue
+                inserted += 1
+                self.conn.execute(
+                    "INSERT INTO rollup_user (user, count, last_ts) VALUES (?, 1, ?) "
+                    "ON CONFLICT(user) DO UPDATE SET count = count + 1, last_ts = max(last_ts, excluded.last_ts)",
+                    (c["user"], ts))
+                self.conn.execute(
+                    "INSERT INTO rollup_video (video, count, last_ts) VALUES (?, 1, ?) "
+                    "ON CONFLICT(video) DO UPDATE SET count = count + 1, last_ts = max(last_ts, excluded.last_ts)",
+                    (c["video"], ts))
+                self.conn.execute(
+                    "INSERT INTO rollup_hour (hour, count) VALUES (?, 1) "
+                    "ON CONFLICT(hour) DO UPDATE SET count = count + 1",
+                    (int(ts // 3600) * 3600,))
+        return inserted
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def top_reposters(self, limit=10, since=None):
+        if since is None:
+            return self._query("SELECT user, count, last_ts FROM rollup_user ORDER BY count DESC, last_ts DESC "
+                               "LIMIT ?", (limit,))
+        # Time-bounded view comes from the raw rows, which the ts index keeps cheap.
+        return self._query("SELECT user, COUNT(*) AS count, MAX(ts) AS last_ts FROM reposts WHERE ts >= ? "
+                           "GROUP BY user ORDER BY count DESC, last_ts DESC LIMIT ?", (since, limit))
+
+    def video_counts(self, limit=10):
+        return self._query("SELECT video, count, last_ts FROM rollup_video ORDER BY count DESC, last_ts DESC "
+                           "LIMIT ?", (limit,))
+
+    def hourly(self, hours=24, now=None):
+        now = time.time() if now is None else now
+        start = int(now // 3600) * 3600 - (hours - 1) * 3600
+        counts = {row["hour"]: row["count"] for row in
+                  self._query("SELECT hour, count FROM rollup_hour WHERE hour >= ?", (start,))}
+        return [{"hour": start + i * 3600, "count": counts.get(start + i * 3600, 0)} for i in range(hours)]
+
+    def summary(self):
+        return self._query("SELECT COALESCE(SUM(count), 0) AS total, COUNT(*) AS users, MAX(last_ts) AS last_ts "
+                           "FROM rollup_user")[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
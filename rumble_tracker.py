@@ -15,26 +15,37 @@ from tkinter import filedialog, colorchooser, messagebox
 import threading
 import time
 import json
-import queue
-import hashlib
-import logging
 import shutil
 import requests
 import subprocess
-import re
 import urllib.parse
 import traceback
-
-# Web & Browser Libraries
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
-import pygame
-from flask import Flask, jsonify, send_file
-
-# --- LOGGING SETUP ---
-log = logging.getLogger('werkzeug')
-log.setLevel(logging.ERROR)
+import multiprocessing
+from collections import deque
+
+import metrics
+import audio_backend
+import font_cache
+from font_cache import GOOGLE_FONTS
+import feed_parser
+import feed_schema
+import browser_worker
+import event_router
+import history_store
+import cookie_jar
+import tracker_worker
+import tracker_pipeline
+from tracker_pipeline import FEED_URL, FETCH_TIMEOUT, feed_session
+from ui_bus import UIEventBus, DRAIN_INTERVAL_MS, MAX_LOG_LINES, MAX_ERROR_LOGS
+from repost_store import RepostStore
+from alert_journal import AlertJournal
+from alert_sinks import AlertSinks
+from obs_output import OBSOutput
+from live_channel import LiveChannel
+from overlay_server import (GLOBAL_CONFIG, TRACKER_STATE, REPOST_QUEUE, TEMPLATE_FILE, ANALYTICS, JOURNAL,
+                            STATE_LISTENERS, AlertPresenter, OverlayServer, overlay_url, live_url,
+                            state_snapshot, set_preview_config, publish_state, show_alert, hide_alert, handle_overlay_ack,
+                            set_overlay_template, configured_fonts)
 
 # --- CTK CONFIGURATION ---
 ctk.set_appearance_mode("Dark")
@@ -43,101 +54,9 @@ ctk.set_default_color_theme("green")
 # --- GLOBAL CONFIGURATION ---
 APP_VERSION = "v3.2"  # Bumped version for fix
 CONFIG_FILE = "tracker_config.json"
-HISTORY_FILE = "repost_history.json"
 COOKIES_FILE = "saved_cookies.json"
-TEMPLATE_FILE = "overlay.html"
 ICON_FILE = "icon.ico"
-
-GOOGLE_FONTS = [
-    "Roboto", "Open Sans", "Lato", "Montserrat", "Oswald", "Source Sans Pro",
-    "Slabo 27px", "Raleway", "PT Sans", "Merriweather", "Noto Sans", "Nunito",
-    "Concert One", "Prompt", "Work Sans", "Rubik", "Fjalla One", "Bangers",
-    "Poiret One", "Righteous", "Russo One", "Handlee", "Patrick Hand",
-    "Creepster", "Anton", "Orbitron", "Luckiest Guy", "Fredoka One",
-    "Special Elite", "Teko", "Alfa Slab One", "Audiowide", "Black Ops One",
-    "Carter One", "Changa One", "Passion One", "Press Start 2P", "Quantico",
-    "Sigmar One", "Squada One", "Syncopate", "Titan One", "Ultra",
-    "VT323", "Voltaire", "Wallpoet", "Yeon Sung", "Zilla Slab Highlight"
-]
-
-DEFAULT_CONFIG = {
-    "sound_file": "",
-    "poll_interval": 5,
-    "overlay_port": 5050,
-    "font_size": 14,
-    "repost_limit": 5,
-    "font_family": "Roboto",
-    "recent_color": "#85c742",
-    "older_color": "#ffffff",
-    "title_text": "NEW REPOST",
-    "title_color": "#ffffff",
-    "title_size": 24,
-    "title_align": "center",
-    "browser_path": "",
-    "selected_browser": "Auto-Detect",
-    "use_override": False,
-    "remember_login": True,
-    "audio_volume": 0.5,
-    "chrome_version": 0
-}
-
-# --- GLOBAL SHARED STATE ---
-GLOBAL_CONFIG = DEFAULT_CONFIG.copy()
-
-TRACKER_STATE = {
-    "current_alert": None,
-    "is_visible": False,
-    "audio_timestamp": 0,
-    "last_update_id": 0
-}
-
-REPOST_QUEUE = queue.Queue()
-
-# --- FLASK WEB SERVER ---
-app = Flask(__name__)
-app.json.sort_keys = True
-
-
-@app.after_request
-def add_headers(response):
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    return response
-
-
-@app.route('/')
-def index():
-    try:
-        with open(TEMPLATE_FILE, 'r', encoding='utf-8') as f:
-            return f.read()
-    except:
-        return "Overlay HTML not found. Run app to generate it."
-
-
-@app.route('/current_sound')
-def current_sound():
-    path = GLOBAL_CONFIG.get("sound_file", "")
-    if path and os.path.exists(path):
-        return send_file(path)
-    return "No file selected", 404
-
-
-@app.route('/api/data')
-def get_data():
-    response = {
-        "data": TRACKER_STATE,
-        "config": GLOBAL_CONFIG
-    }
-    return jsonify(response)
-
-
-def run_flask_server():
-    try:
-        app.run(host='0.0.0.0', port=5050, use_reloader=False, threaded=True)
-    except Exception as e:
-        print(f"CRITICAL FLASK ERROR: {e}")
+LOGIN_VERIFY_ATTEMPTS = 5
 
 
 # --- BROWSER DETECTION HELPERS ---
@@ -192,23 +111,32 @@ class RumbleRepostTracker(ctk.CTk):
             except:
                 pass
 
-        # Audio Init
-        try:
-            pygame.mixer.init()
-        except Exception as e:
-            print(f"Audio Init Error: {e}")
-
+        self.ui_bus = UIEventBus()
         self.driver = None
-        self.is_tracking = False
+        self.browser_supervisor = None
+        self.tracker = tracker_worker.TrackerWorker(
+            {tracker_worker.FETCH: self._tracker_loop_fetch, tracker_worker.BROWSER: self._tracker_loop},
+            on_state=self._on_tracker_state, on_stop=lambda: self.pipeline.cancel(), log=self.log)
         self.is_logging_in = False
         self.seen_reposts = self.load_history()
+        try:
+            self.repost_store = RepostStore()
+        except Exception as e:
+            print(f"Analytics DB Error: {e}")
+            self.repost_store = None
+        ANALYTICS["store"] = self.repost_store
+        try:
+            self.journal = AlertJournal()
+        except Exception as e:
+            print(f"Alert Journal Error: {e}")
+            self.journal = None
+        JOURNAL["journal"] = self.journal
         self.is_muted = tk.BooleanVar(value=False)
-        self.test_sound_channel = None
         self.fade_timer = None
         self.test_overlay_timer = None
 
         self.login_btn_default_color = ["#3B8ED0", "#1F6AA5"]
-        self.error_logs = []
+        self.error_logs = deque(maxlen=MAX_ERROR_LOGS)
 
         # Configuration Vars
         self.load_config_to_global()
@@ -226,12 +154,35 @@ class RumbleRepostTracker(ctk.CTk):
         self.remember_login_var = tk.BooleanVar(value=GLOBAL_CONFIG.get("remember_login", True))
         self.chrome_version_var = tk.StringVar(value=str(GLOBAL_CONFIG.get("chrome_version", 0)))
 
+        self.alert_sinks = AlertSinks.from_config(GLOBAL_CONFIG.get("alert_sinks"), log=self.log).start()
+        self.pipeline = tracker_pipeline.TrackerPipeline(self.seen_reposts, journal=self.journal,
+                                                         store=self.repost_store, sinks=self.alert_sinks,
+                                                         log=self.log)
+
+        self.live_channel = LiveChannel(host=GLOBAL_CONFIG.get("overlay_host", "0.0.0.0"),
+                                        port=int(GLOBAL_CONFIG.get("live_port", 5051)),
+                                        snapshot=state_snapshot, on_ack=handle_overlay_ack)
+        STATE_LISTENERS.append(self.live_channel.broadcast)
+        self.live_channel.start()
+
+        self.obs_output = None
+        if GLOBAL_CONFIG.get("obs_output"):
+            self.obs_output = OBSOutput(GLOBAL_CONFIG, log=self.log,
+                                        on_shown=lambda alert_id: handle_overlay_ack({"event": "render", "id": alert_id}))
+            STATE_LISTENERS.append(self.obs_output.listener)
+            self.obs_output.start()
+
         self.write_template_file()
+        self.cache_selected_font()
 
-        self.flask_thread = threading.Thread(target=run_flask_server, daemon=True)
-        self.flask_thread.start()
+        self.overlay_server = OverlayServer(GLOBAL_CONFIG)
+        try:
+            self.overlay_server.start()
+        except Exception as e:
+            print(f"CRITICAL FLASK ERROR: {e}")
 
-        self.queue_thread = threading.Thread(target=self._queue_processor, daemon=True)
+        self.presenter = AlertPresenter(sound_length=audio_backend.sound_length, is_muted=self.is_muted.get)
+        self.queue_thread = threading.Thread(target=self.presenter.run, daemon=True)
         self.queue_thread.start()
 
         self.status_var = tk.StringVar(value=f"Ready. Loaded {len(self.seen_reposts)} history items.")
@@ -239,39 +190,74 @@ class RumbleRepostTracker(ctk.CTk):
         self.font_family_var = tk.StringVar(value=GLOBAL_CONFIG.get("font_family", "Roboto"))
         self.title_text_var = tk.StringVar(value=GLOBAL_CONFIG.get("title_text", "NEW REPOST"))
         self.title_align_var = tk.StringVar(value=GLOBAL_CONFIG.get("title_align", "center"))
+        self.overlay_mode_var = tk.StringVar(value=GLOBAL_CONFIG.get("overlay_mode", "alert"))
+        self.alert_kind_vars = {kind: tk.BooleanVar(value=event_router.alert_type(kind, GLOBAL_CONFIG)["enabled"])
+                                for kind in event_router.ALERT_KINDS}
 
         self.current_font_size = GLOBAL_CONFIG.get("font_size", 14)
 
         self.setup_ui()
+        self._drain_ui_bus()
 
         self.title_text_var.trace_add("write", self.update_live_preview)
         self.font_family_var.trace_add("write", self.update_live_preview)
         self.title_align_var.trace_add("write", self.update_live_preview)
 
         self.bind("<Control-MouseWheel>", self.on_ctrl_scroll)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.update_browser_ui_state()
 
         self.after(1000, self.check_cookie_status)
         self.update_live_preview()
+        self.replay_journal()
+
+    def replay_journal(self):
+        """Re-queues alerts that were detected but never shown before the last exit."""
+        if not self.journal:
+            return
+        try:
+            pending = self.journal.replay(float(GLOBAL_CONFIG.get("journal_replay_minutes", 30)) * 60)
+        except Exception as e:
+            self.log(f"Journal Error: {e}")
+            return
+        for alert in pending:
+            REPOST_QUEUE.put(alert)
+        if pending:
+            self.log(f"Replaying {len(pending)} alert(s) not shown before the last exit.")
 
     def log(self, msg):
-        self.after(0, lambda: self._log_internal(msg))
+        self.ui_bus.log(msg)
+
+    def _drain_ui_bus(self):
+        logs, calls, dropped = self.ui_bus.drain()
+        if dropped:
+            logs.insert(0, (time.strftime('%H:%M:%S'), f"({dropped} older log lines dropped)"))
+        if logs:
+            self._log_batch(logs)
+        for fn, args in calls:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"UI update error: {e}")
+        self.after(DRAIN_INTERVAL_MS, self._drain_ui_bus)
 
-    def _log_internal(self, msg):
-        timestamp = time.strftime('%H:%M:%S')
-        full_msg = f"[{timestamp}] {msg}\n"
+    def _log_batch(self, logs):
+        full_msgs = [f"[{timestamp}] {msg}\n" for timestamp, msg in logs]
 
         self.log_textbox.configure(state="normal")
-        self.log_textbox.insert("0.0", full_msg)
+        self.log_textbox.insert("0.0", "".join(reversed(full_msgs)))
+        self.log_textbox.delete(f"{MAX_LOG_LINES + 1}.0", "end")
         self.log_textbox.configure(state="disabled")
-        self.status_label.configure(text=msg)
+        self.status_label.configure(text=logs[-1][1])
 
-        lower_msg = msg.lower()
-        if any(x in lower_msg for x in ["error", "warning", "exception", "failed", "blocked", "mismatch"]):
-            self.error_logs.append(full_msg)
+        errors = [full_msg for (_, msg), full_msg in zip(logs, full_msgs)
+                  if any(x in msg.lower() for x in ["error", "warning", "exception", "failed", "blocked", "mismatch"])]
+        if errors:
+            self.error_logs.extend(errors)
             if hasattr(self, 'txt_error_logs'):
                 self.txt_error_logs.configure(state="normal")
-                self.txt_error_logs.insert("2.0", full_msg)  # Keep header at top
+                self.txt_error_logs.insert("2.0", "".join(reversed(errors)))  # Keep header at top
+                self.txt_error_logs.delete(f"{MAX_ERROR_LOGS + 2}.0", "end")
                 self.txt_error_logs.configure(state="disabled")
 
     def copy_error_logs(self):
@@ -283,7 +269,7 @@ class RumbleRepostTracker(ctk.CTk):
     def email_error_logs(self):
         recipient = "the.real.tombliboos@gmail.com"
         subject = f"Rumble Tracker {APP_VERSION} Error Log"
-        body_content = "".join(self.error_logs[-20:]) if self.error_logs else "No recent errors."
+        body_content = "".join(list(self.error_logs)[-20:]) if self.error_logs else "No recent errors."
         body = f"Version: {APP_VERSION}\nDescribe issue:\n\n\n--- Logs ---\n{logs_text}"
         params = {"subject": subject, "body": body}
         query = urllib.parse.urlencode(params)
@@ -304,26 +290,20 @@ class RumbleRepostTracker(ctk.CTk):
                 pass
 
     def load_history(self):
-        if os.path.exists(HISTORY_FILE):
-            try:
-                with open(HISTORY_FILE, "r") as f:
-                    return set(json.load(f))
-            except:
-                pass
-        return set()
+        return history_store.load_history()
 
     def save_history(self):
-        try:
-            with open(HISTORY_FILE, "w") as f:
-                json.dump(list(self.seen_reposts), f)
-        except:
-            pass
+        history_store.save_history(self.seen_reposts)
 
     def save_config(self):
+        font_changed = GLOBAL_CONFIG.get("font_family") != self.font_family_var.get()
         GLOBAL_CONFIG["sound_file"] = self.sound_path_var.get()
         GLOBAL_CONFIG["font_family"] = self.font_family_var.get()
         GLOBAL_CONFIG["title_text"] = self.title_text_var.get()
         GLOBAL_CONFIG["title_align"] = self.title_align_var.get()
+        GLOBAL_CONFIG["overlay_mode"] = self.overlay_mode_var.get()
+        GLOBAL_CONFIG["alert_types"] = {kind: dict(event_router.alert_type(kind, GLOBAL_CONFIG), enabled=var.get())
+                                        for kind, var in self.alert_kind_vars.items()}
         GLOBAL_CONFIG["font_size"] = self.current_font_size
 
         GLOBAL_CONFIG["selected_browser"] = self.selected_browser_var.get()
@@ -341,18 +321,39 @@ class RumbleRepostTracker(ctk.CTk):
             json.dump(GLOBAL_CONFIG, f)
 
         TRACKER_STATE["last_update_id"] += 1
+        set_preview_config(None)
         self.status_var.set("Settings Saved & Applied!")
+        if font_changed:
+            self.cache_selected_font()
 
-    def save_cookies(self):
-        if self.driver:
-            try:
-                cookies = self.driver.get_cookies()
-                ua = self.driver.execute_script("return navigator.userAgent")
-                with open(COOKIES_FILE, "w") as f:
-                    json.dump({"cookies": cookies, "user_agent": ua}, f)
-                self.log("Session saved (Cookies + UA).")
-            except Exception as e:
-                print(f"Failed to save cookies: {e}")
+    def capture_session(self):
+        """Cookies + UA from the login window, taken in one go so they are saved exactly as verified."""
+        return {"cookies": self.driver.get_cookies(),
+                "user_agent": self.driver.execute_script("return navigator.userAgent")}
+
+    def save_cookies(self, session_data=None):
+        if session_data is None and not self.driver:
+            return
+        try:
+            session_data = session_data or self.capture_session()
+            cookie_jar.save_session(COOKIES_FILE, session_data)
+            self.log("Session saved (Cookies + UA).")
+        except Exception as e:
+            print(f"Failed to save cookies: {e}")
+
+    def verify_session(self, session_data):
+        """One feed request with the captured cookies. Returns its HTTP status (200 only if the body is a
+        signed-in feed), or None if the request failed or the response is not a feed."""
+        s, headers = feed_session(session_data)
+        try:
+            r = s.get(FEED_URL, headers=headers, timeout=FETCH_TIMEOUT)
+            if r.status_code == 200:
+                feed_parser.parse_feed_events(r.content)
+            return r.status_code
+        except (requests.RequestException, feed_schema.FeedSchemaError):
+            return None
+        finally:
+            s.close()
 
     def load_saved_session(self):
         if os.path.exists(COOKIES_FILE):
@@ -415,8 +416,9 @@ class RumbleRepostTracker(ctk.CTk):
     def set_volume_config(self, value):
         GLOBAL_CONFIG["audio_volume"] = float(value)
         self.save_config()
-        if self.test_sound_channel:
-            self.test_sound_channel.set_volume(float(value))
+        player = audio_backend.get_player()
+        if player:
+            player.set_volume(float(value))
 
     def browse_sound(self):
         f = filedialog.askopenfilename(filetypes=[("Audio", "*.wav *.mp3")])
@@ -430,45 +432,18 @@ class RumbleRepostTracker(ctk.CTk):
         else:
             self.btn_mute.configure(text="MUTE AUDIO ALERTS", fg_color="#555555", hover_color="#777777")
 
-    def _queue_processor(self):
-        while True:
-            try:
-                alert_data = REPOST_QUEUE.get()
-                TRACKER_STATE["current_alert"] = alert_data
-                TRACKER_STATE["is_visible"] = True
-                audio_path = GLOBAL_CONFIG.get("sound_file", "")
-                audio_duration = 0.0
-                if audio_path and os.path.exists(audio_path) and not self.is_muted.get():
-                    TRACKER_STATE["audio_timestamp"] = time.time()
-                    try:
-                        sound = pygame.mixer.Sound(audio_path)
-                        audio_duration = sound.get_length()
-                    except:
-                        pass
-                display_time = max(10.0, audio_duration)
-                time.sleep(display_time)
-                TRACKER_STATE["is_visible"] = False
-                time.sleep(5.0)
-            except Exception as e:
-                print(f"Queue Error: {e}")
-                time.sleep(1)
-
     def play_sound(self):
         self.stop_test_sound()
-        TRACKER_STATE["audio_timestamp"] = time.time()
-        TRACKER_STATE["current_alert"] = {"user": "TEST USER", "video": "Test Video Title"}
-        TRACKER_STATE["is_visible"] = True
+        show_alert({"user": "TEST USER", "video": "Test Video Title"}, play_audio=True)
         f = self.sound_path_var.get()
         duration = 10.0
-        if f and os.path.exists(f):
+        player = audio_backend.get_player()
+        if f and os.path.exists(f) and player:
             try:
-                sound = pygame.mixer.Sound(f)
                 vol = GLOBAL_CONFIG.get("audio_volume", 0.5)
-                sound.set_volume(vol)
-                self.test_sound_channel = sound.play()
-                file_len = sound.get_length()
+                file_len = player.play(f, vol)
                 if file_len > 20:
-                    self.fade_timer = self.after(18000, lambda: self.test_sound_channel.fadeout(2000))
+                    self.fade_timer = self.after(18000, lambda: player.fadeout(2000))
                     duration = 20.0
                 else:
                     duration = max(10.0, file_len)
@@ -477,20 +452,19 @@ class RumbleRepostTracker(ctk.CTk):
         self.test_overlay_timer = self.after(int(duration * 1000), self.stop_test_overlay)
 
     def stop_test_overlay(self):
-        TRACKER_STATE["is_visible"] = False
+        hide_alert()
         if self.test_overlay_timer:
             self.after_cancel(self.test_overlay_timer)
             self.test_overlay_timer = None
+        player = audio_backend.get_player()
+        if player:
+            player.release()
 
     def stop_test_sound(self):
         if self.fade_timer:
             self.after_cancel(self.fade_timer)
             self.fade_timer = None
-        if self.test_sound_channel:
-            self.test_sound_channel.stop()
-            self.test_sound_channel = None
-        else:
-            pygame.mixer.stop()
+        publish_state("stop")
         self.stop_test_overlay()
 
     def browse_browser_exe(self):
@@ -510,50 +484,16 @@ class RumbleRepostTracker(ctk.CTk):
     # --- ROBUST BROWSER LAUNCHER ---
     def _safe_driver_launch(self, headless=False):
         """Attempts to launch driver, handling version mismatch automatically."""
-        opts = self.get_browser_options(headless=headless)
-        ver_arg = self.get_chrome_version_arg()
-        if ver_arg:
-            self.log(f"Using forced driver version: {ver_arg}")
-            return uc.Chrome(options=opts, version_main=ver_arg, use_subprocess=True)
+        return browser_worker.launch_driver(self.get_browser_binary(), self.get_chrome_version_arg(),
+                                            headless=headless, log=self.log)
 
-        try:
-            return uc.Chrome(options=opts, use_subprocess=True)
-        except Exception as e:
-            err_msg = str(e)
-            if "Current browser version is" in err_msg:
-                self.log("Browser version mismatch detected. Attempting auto-fix...")
-                match = re.search(r"Current browser version is (\d+)\.", err_msg)
-                if match:
-                    detected_version = int(match.group(1))
-                    self.log(f"Auto-detected version {detected_version}. Retrying...")
-                    # REGENERATE OPTIONS FRESH
-                    new_opts = self.get_browser_options(headless=headless)
-                    return uc.Chrome(options=new_opts, version_main=detected_version, use_subprocess=True)
-            raise e
-
-    def get_browser_options(self, binary_path="", headless=False):
-        opts = uc.ChromeOptions()
-        opts.add_argument("--mute-audio")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--no-sandbox")
-        opts.add_argument("--disable-dev-shm-usage")
-
-        if headless:
-            opts.add_argument("--headless=new")
-            opts.add_argument("--window-size=1920,1080")
-
-        if not binary_path:
-            if self.use_override_var.get():
-                binary_path = self.custom_browser_path_var.get()
-            else:
-                selection = self.selected_browser_var.get()
-                if selection in self.browser_map and self.browser_map[selection]:
-                    binary_path = self.browser_map[selection]
-
-        if binary_path:
-            opts.binary_location = binary_path
-
-        return opts
+    def get_browser_binary(self):
+        if self.use_override_var.get():
+            return self.custom_browser_path_var.get()
+        selection = self.selected_browser_var.get()
+        if selection in self.browser_map and self.browser_map[selection]:
+            return self.browser_map[selection]
+        return ""
 
     def get_chrome_version_arg(self):
         try:
@@ -575,7 +515,7 @@ class RumbleRepostTracker(ctk.CTk):
                 self.log("Session cleared.")
             return
 
-        if self.is_logging_in or self.is_tracking: return
+        if self.is_logging_in or self.tracker.active(): return
         self.is_logging_in = True
         self.btn_browser.configure(state="disabled", text="Waiting for Login...")
         threading.Thread(target=self._run_login_monitor, daemon=True).start()
@@ -589,186 +529,119 @@ class RumbleRepostTracker(ctk.CTk):
             self.driver.get("https://rumble.com/login.php")
             self.log("Please log in manually.")
 
-            while self.is_logging_in:
-                if not self.driver: break
-                try:
-                    bell = self.driver.find_elements(By.CSS_SELECTOR, ".user-notifications--bell-button")
-                    if bell:
-                        self.log("Login Detected! Saving session...")
-                        self.save_cookies()
-                        time.sleep(1)
-                        self.driver.quit()
-                        self.driver = None
-                        self.log("Login successful. Window closed.")
-                        self.after(0, lambda: self.btn_track.configure(state="normal", fg_color="#2CC985"))
-                        self.after(0,
-                                   lambda: self.btn_browser.configure(state="normal", text="LOGGED IN (Click to Reset)",
-                                                                      fg_color="#2CC985", hover_color="#22AA66"))
+            waiting = lambda: self.is_logging_in and self.driver is not None
+            while browser_worker.wait_for_login(self.driver, waiting):
+                # Auth cookies can land a moment after the page renders; only save a jar the feed accepts.
+                for attempt in range(LOGIN_VERIFY_ATTEMPTS):
+                    session_data = self.capture_session()
+                    status = self.verify_session(session_data)
+                    if status == 200:
                         break
-                except:
-                    pass
-                time.sleep(1)
+                    time.sleep(0.5)
+                else:
+                    if status == 403:
+                        self.log("Rumble refused the new session (403). Finish any verification step in the "
+                                 "login window; nothing is saved until the feed accepts it. Waiting...")
+                    else:
+                        self.log("Login detected but the session was not accepted yet. Waiting...")
+                    time.sleep(2)
+                    continue
+                self.log("Login Detected! Saving session...")
+                self.save_cookies(session_data)
+                self.driver.quit()
+                self.driver = None
+                self.log("Login successful. Window closed.")
+                self.ui_bus.call(lambda: self.btn_track.configure(state="normal", fg_color="#2CC985"))
+                self.ui_bus.call(
+                    lambda: self.btn_browser.configure(state="normal", text="LOGGED IN (Click to Reset)",
+                                                       fg_color="#2CC985", hover_color="#22AA66"))
+                break
 
         except Exception as e:
-            self.log(f"Login Init Error: {e}")
+            if any(marker in str(e).lower() for marker in browser_worker.WINDOW_GONE):
+                self.log("Login window was closed before login completed.")
+            else:
+                self.log(f"Login Init Error: {e}")
             if "session not created" in str(e).lower():
-                self.after(0, lambda: messagebox.showerror("Version Error", f"Driver Error:\n{str(e)[:200]}..."))
+                self.ui_bus.call(messagebox.showerror, "Version Error", f"Driver Error:\n{str(e)[:200]}...")
             self.driver = None
-            self.after(0, lambda: self.btn_browser.configure(state="normal", text="1. Login & Capture"))
+            self.ui_bus.call(lambda: self.btn_browser.configure(state="normal", text="1. Login & Capture"))
 
         self.is_logging_in = False
 
     def toggle_tracking(self):
-        if not self.is_tracking:
-            self.is_tracking = True
-            self.btn_track.configure(text="Stop Tracking", fg_color="#FF5555", hover_color="#AA0000")
-            threading.Thread(target=self._tracker_loop_fetch, daemon=True).start()
+        if not self.tracker.active():
+            if not self.tracker.start(tracker_worker.FETCH):
+                self.log("Tracker is still shutting down.")
         else:
-            self.is_tracking = False
-            self.btn_track.configure(text="Start Tracking", fg_color="#2CC985", hover_color="#22AA66")
+            self.tracker.stop()
             self.log("Tracking Stopped.")
 
-    def _tracker_loop_fetch(self):
+    def _on_tracker_state(self, state):
+        self.ui_bus.call(self._show_tracker_state, state)
+
+    def _show_tracker_state(self, state):
+        if state == tracker_worker.IDLE:
+            self.btn_track.configure(text="Start Tracking", state="normal", fg_color="#2CC985", hover_color="#22AA66")
+        elif state == tracker_worker.STOPPING:
+            self.btn_track.configure(text="Stopping...", state="disabled")
+        else:
+            self.btn_track.configure(text="Stop Tracking", state="normal", fg_color="#FF5555", hover_color="#AA0000")
+
+    def _tracker_loop_fetch(self, stop):
         self.log("Starting API Tracker (Fetch Mode)...")
         session_data = self.load_saved_session()
         if not session_data or "cookies" not in session_data:
             self.log("No valid session found. Please Login.")
-            self.after(0, self.toggle_tracking)
-            return
-
-        s = requests.Session()
-        for c in session_data["cookies"]:
-            s.cookies.set(c['name'], c['value'], domain=c['domain'])
-
-        headers = {
-            "User-Agent": session_data.get("user_agent",
-                                           "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"),
-            "Accept": "application/json, text/plain, */*",
-            "Referer": "https://rumble.com/",
-        }
-        api_url = "https://rumble.com/service.php?name=user.notification_feed&limit=25"
+            return None
         self.log(f"Tracking Active. Interval: {GLOBAL_CONFIG['poll_interval']}s")
+        if self.pipeline.poll_feed(stop, session_data, COOKIES_FILE) == tracker_pipeline.BLOCKED:
+            self.driver = None
+            return tracker_worker.BROWSER
+        return None
 
-        while self.is_tracking:
-            try:
-                r = s.get(api_url, headers=headers)
-                if r.status_code == 200:
-                    data = r.json()
-                    if "data" in data and "items" in data["data"]:
-                        items = data["data"]["items"]
-                        batch_reposts = []
-                        for item in items:
-                            is_repost = False
-                            user_name = "Unknown"
-                            video_title = "Video"
-                            if item.get("type") == "video_reposted":
-                                is_repost = True
-                                user_obj = item.get("user", {})
-                                video_obj = item.get("video", {})
-                                user_name = user_obj.get("username", user_obj.get("name", "Unknown"))
-                                video_title = video_obj.get("title", "Unknown Video")
-                            elif "reposted" in item.get("body", "").lower():
-                                is_repost = True
-                                if "user" in item:
-                                    user_name = item["user"].get("username", "Unknown")
-                            if is_repost:
-                                unique_str = f"{user_name}_{video_title}_{item.get('created_on', '')}"
-                                n_id = hashlib.md5(unique_str.encode('utf-8')).hexdigest()
-                                if n_id not in self.seen_reposts:
-                                    self.seen_reposts.add(n_id)
-                                    self.save_history()
-                                    batch_reposts.append({"user": user_name, "video": video_title})
-                                    self.log(f"NEW REPOST: {user_name}")
-                        for item in reversed(batch_reposts):
-                            REPOST_QUEUE.put(item)
-                elif r.status_code == 403:
-                    self.log("Session Blocked (403). Switching to Browser Mode...")
-                    self.is_tracking = False
-                    self.driver = None
-                    threading.Thread(target=self._tracker_loop, daemon=True).start()
-                    break
-                else:
-                    self.log(f"API Error: {r.status_code}")
-            except Exception as e:
-                self.log(f"Fetch Error: {e}")
-            time.sleep(int(GLOBAL_CONFIG['poll_interval']))
-
-    def _tracker_loop(self):
+    def _tracker_loop(self, stop):
         self.log("Starting Browser Tracker (Hidden)...")
-        self.is_tracking = True
-        session_data = self.load_saved_session()
-
+        session_data = self.load_saved_session() or {}
+        poll_interval = int(GLOBAL_CONFIG['poll_interval'])
+        options = {
+            "binary_path": self.get_browser_binary(),
+            "version_main": self.get_chrome_version_arg(),
+            "cookies": session_data.get("cookies", []),
+            "poll_interval": poll_interval,
+            "max_cycles": int(GLOBAL_CONFIG.get("browser_max_cycles", 500)),
+        }
+        self.browser_supervisor = browser_worker.BrowserSupervisor(
+            options, self._on_browser_events, log=self.log,
+            max_rss_mb=int(GLOBAL_CONFIG.get("browser_max_rss_mb", 1500)),
+            max_cpu_percent=int(GLOBAL_CONFIG.get("browser_max_cpu_percent", 0)),
+            heartbeat_timeout=max(120, poll_interval * 2 + 60))
         try:
-            # Force Headless for Tracking
-            self.driver = self._safe_driver_launch(headless=True)
-            time.sleep(3)
-            try:
-                self.driver.minimize_window()
-            except:
-                pass
-
-            if session_data:
-                self.driver.get("https://rumble.com/404")
-                for c in session_data["cookies"]:
-                    try:
-                        self.driver.add_cookie(c)
-                    except:
-                        pass
-                self.driver.get("https://rumble.com")
+            self.browser_supervisor.run(lambda: not stop.is_set())
         except Exception as e:
             self.log(f"Fallback Error: {e}")
-            self.is_tracking = False
-            return
-
-        while self.is_tracking:
-            if not self.driver: break
-            try:
-                self.driver.refresh()
-                time.sleep(3)
-                bell = self.driver.find_element(By.CSS_SELECTOR, ".user-notifications--bell-button")
-                self.driver.execute_script("arguments[0].click();", bell)
-                time.sleep(1.5)
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                notif_list = soup.find("ul", class_="user-notifications--list")
-                if notif_list:
-                    items = notif_list.find_all("li")
-                    batch_reposts = []
-                    for li in items:
-                        text_div = li.find("div", class_="user-notifications--text")
-                        if not text_div: continue
-                        body_div = text_div.find("div", class_="user-notifications--body")
-                        if not body_div: continue
-                        full_text = body_div.get_text(" ", strip=True)
-                        if "reposted your video" in full_text:
-                            n_id = hashlib.md5(full_text.encode('utf-8')).hexdigest()
-                            if n_id not in self.seen_reposts:
-                                self.seen_reposts.add(n_id)
-                                self.save_history()
-                                user_link = body_div.find("a")
-                                user = user_link.text if user_link else "Unknown"
-                                vid_title = "Unknown"
-                                if '"' in full_text:
-                                    parts = full_text.split('"')
-                                    if len(parts) > 1: vid_title = parts[1]
-                                batch_reposts.append({"user": user, "video": vid_title})
-                                self.log(f"NEW REPOST: {user}")
-                    for item in reversed(batch_reposts):
-                        REPOST_QUEUE.put(item)
-            except Exception as e:
-                if "invalid session id" in str(e).lower(): break
-            time.sleep(int(GLOBAL_CONFIG['poll_interval']))
+        self.browser_supervisor = None
+        return None
 
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
-            self.driver = None
+    def _on_browser_events(self, candidates, parse_seconds):
+        self.pipeline.publish(candidates, "browser", time.perf_counter() - parse_seconds)
 
     def on_close(self):
-        self.is_tracking = False
+        self.tracker.stop()
         try:
             if self.driver: self.driver.quit()
+            if self.browser_supervisor: self.browser_supervisor.wait_stopped(20)
+            self.tracker.join(5)
+        except:
+            pass
+        try:
+            self.presenter.stop()
+            self.alert_sinks.stop()
+            if self.obs_output: self.obs_output.stop()
+            self.live_channel.stop()
+            self.overlay_server.stop()
+            if self.repost_store: self.repost_store.close()
+            if self.journal: self.journal.close()
         except:
             pass
         self.destroy()
@@ -807,10 +680,17 @@ class RumbleRepostTracker(ctk.CTk):
         self.lbl_prev_header.configure(anchor=alignment)
         self.lbl_prev_user.configure(anchor=alignment)
         self.lbl_prev_video.configure(anchor=alignment)
+        # Unsaved style edits go straight to connected overlays so they can be tuned live.
+        preview_config = dict(GLOBAL_CONFIG, font_family=fam, title_text=self.title_text_var.get(),
+                              title_align=self.title_align_var.get(), overlay_mode=self.overlay_mode_var.get())
+        set_preview_config(preview_config)
+        if font_cache.cached_font_css(fam) is None:
+            # /fonts/css never downloads, so fetch an unsaved preview font here, off the UI thread.
+            threading.Thread(target=self._cache_font_worker, args=([fam],), daemon=True).start()
 
     # --- NEW: LAUNCH WEB PREVIEW POPUP ---
     def launch_web_preview(self):
-        url = "http://127.0.0.1:5050"
+        url = overlay_url()
         binary = None
         if self.use_override_var.get():
             binary = self.custom_browser_path_var.get()
@@ -838,7 +718,8 @@ class RumbleRepostTracker(ctk.CTk):
     <meta charset="UTF-8">
     <title>Rumble Overlay</title>
     <style>
-        body { margin: 0; padding: 20px; overflow: hidden; background: transparent; font-family: sans-serif; }
+        __FONT_FACE_CSS__
+        body { margin: 0; padding: 20px; overflow: hidden; background: transparent; font-family: __FONT_STACK__; }
 
         #container {
             display: flex;
@@ -881,6 +762,27 @@ class RumbleRepostTracker(ctk.CTk):
             font-style: italic;
             opacity: 0.9;
         }
+
+        #board {
+            display: none;
+            width: 100%;
+            max-width: 600px;
+            margin-top: 16px;
+            background: rgba(20, 20, 20, 0.9);
+            border-radius: 12px;
+            padding: 16px 20px;
+            box-sizing: border-box;
+        }
+
+        .board-title {
+            font-weight: 800;
+            text-transform: uppercase;
+            letter-spacing: 2px;
+            margin: 6px 0;
+        }
+
+        .board-list { list-style: none; margin: 0 0 10px 0; padding: 0; }
+        .board-list li { font-size: 20px; padding: 2px 0; text-shadow: 1px 1px 2px rgba(0,0,0,0.8); }
     </style>
 </head>
 <body>
@@ -892,16 +794,45 @@ class RumbleRepostTracker(ctk.CTk):
         </div>
     </div>
 
+    <div id="board">
+        <div id="recent-title" class="board-title">Recent Reposts</div>
+        <ul id="recent-list" class="board-list"></ul>
+        <div id="top-title" class="board-title">Top Reposters</div>
+        <ul id="top-list" class="board-list"></ul>
+    </div>
+
     <script>
-        const API_URL = "http://127.0.0.1:5050";
+        const API_URL = "__API_URL__";
+        const LOCAL_FONT = __LOCAL_FONT__;
+        const LIVE_URL = "__LIVE_URL__";
+        const PROFILE = __PROFILE__;
 
-        let currentConfigStr = "";
+        let configVersion = -1;
+        const applied = {};
         const audio = new Audio();
+        let audioUrl = '';
+        let audioCtx = null;
+        let audioSource = null;
+        let audioGain = null;
+        const soundBuffers = {};
+        let soundTags = {};
         let lastPlayedAudioTime = 0;
         let fadeTimer = null;
+        let lastRenderedAlert = 0;
+        let boardVersion = -1;
+        let liveSocket = null;
+        let liveRetryMs = 1000;
+
+        // Config fields this page actually renders; nothing else triggers DOM work.
+        const RENDERED_FIELDS = ['font_family', 'title_align', 'title_text', 'title_color', 'title_size',
+                                 'recent_color', 'older_color', 'overlay_mode'];
 
         function loadGoogleFont(fontName) {
             if (!fontName) return;
+            if (fontName === LOCAL_FONT) {
+                document.body.style.fontFamily = `'${fontName}', sans-serif`;
+                return;
+            }
             const linkId = 'google-font-link';
             let link = document.getElementById(linkId);
             if (!link) {
@@ -910,11 +841,50 @@ class RumbleRepostTracker(ctk.CTk):
                 link.rel = 'stylesheet';
                 document.head.appendChild(link);
             }
-            link.href = `https://fonts.googleapis.com/css?family=${fontName.replace(/ /g, '+')}`;
+            link.href = API_URL + '/fonts/css?family=' + encodeURIComponent(fontName);
             document.body.style.fontFamily = `'${fontName}', sans-serif`;
         }
 
+        // --- SOUND (decoded once per file into a Web Audio buffer; <audio> only as a fallback) ---
+        function soundUrl(kind) {
+            return API_URL + "/current_sound?kind=" + encodeURIComponent(kind) + "&profile=" + encodeURIComponent(PROFILE) +
+                "&v=" + encodeURIComponent(soundTags[kind] || '');
+        }
+
+        function getAudioContext() {
+            const Ctx = window.AudioContext || window.webkitAudioContext;
+            if (!audioCtx && Ctx) audioCtx = new Ctx();
+            return audioCtx;
+        }
+
+        function loadSound(kind) {
+            const tag = soundTags[kind];
+            const ctx = getAudioContext();
+            if (!tag || !ctx) return null;
+            const cached = soundBuffers[kind];
+            if (cached && cached.tag === tag) return cached.promise;
+            const promise = fetch(soundUrl(kind))
+                .then(r => { if (!r.ok) throw new Error(r.status); return r.arrayBuffer(); })
+                .then(buf => new Promise((resolve, reject) => ctx.decodeAudioData(buf, resolve, reject)));
+            promise.catch(() => { if (soundBuffers[kind] && soundBuffers[kind].promise === promise) delete soundBuffers[kind]; });
+            soundBuffers[kind] = {tag: tag, promise: promise};
+            return promise;
+        }
+
+        function applySounds(sounds) {
+            soundTags = sounds || {};
+            // Preload every configured sound so the first alert of each kind starts instantly.
+            Object.keys(soundTags).forEach(kind => { const p = loadSound(kind); if (p) p.catch(() => {}); });
+        }
+
         function fadeOutAudio(duration) {
+            if (audioSource && audioGain) {
+                const now = audioCtx.currentTime;
+                audioGain.gain.setValueAtTime(audioGain.gain.value, now);
+                audioGain.gain.linearRampToValueAtTime(0, now + duration / 1000);
+                audioSource.stop(now + duration / 1000);
+                return;
+            }
             const step = 0.05;
             const interval = duration / (1.0 / step);
 
@@ -930,78 +900,208 @@ class RumbleRepostTracker(ctk.CTk):
             }, interval);
         }
 
+        function playBuffer(buffer, volume) {
+            const ctx = getAudioContext();
+            if (ctx.state === 'suspended') ctx.resume();
+            const source = ctx.createBufferSource();
+            const gain = ctx.createGain();
+            gain.gain.value = volume;
+            source.buffer = buffer;
+            source.connect(gain).connect(ctx.destination);
+            source.onended = () => { if (audioSource === source) { audioSource = null; audioGain = null; } };
+            source.start();
+            audioSource = source;
+            audioGain = gain;
+        }
+
+        function playElement(kind, volume) {
+            const url = soundUrl(kind);
+            if (url !== audioUrl) {
+                audio.src = url;
+                audioUrl = url;
+            }
+            audio.currentTime = 0;
+            audio.volume = volume;
+            return audio.play();
+        }
+
+        function playSound(kind, volume) {
+            const pending = loadSound(kind);
+            if (!pending) return playElement(kind, volume);
+            return pending.then(buffer => playBuffer(buffer, volume), () => playElement(kind, volume));
+        }
+
+        function fillList(listEl, rows, config) {
+            listEl.replaceChildren();
+            rows.forEach((text, i) => {
+                const li = document.createElement('li');
+                li.textContent = text;
+                li.style.color = i === 0 ? config.recent_color : config.older_color;
+                listEl.appendChild(li);
+            });
+        }
+
+        function renderBoard(board, config) {
+            // Only touch the DOM when the server says the ranking changed.
+            if (!board || board.version === boardVersion) return;
+            boardVersion = board.version;
+            document.getElementById('recent-title').style.color = config.title_color;
+            document.getElementById('top-title').style.color = config.title_color;
+            fillList(document.getElementById('recent-list'),
+                     board.recent.map(r => `${r.user} \u2014 ${r.video}`), config);
+            fillList(document.getElementById('top-list'),
+                     board.top.map((r, i) => `#${i + 1} ${r.user} \u00d7${r.count}`), config);
+        }
+
+        function stopAudio() {
+            if (fadeTimer) clearTimeout(fadeTimer);
+            if (audioSource) {
+                try { audioSource.stop(); } catch (e) { }
+                audioSource = null;
+                audioGain = null;
+            }
+            audio.pause();
+            audio.currentTime = 0;
+        }
+
+        function applyConfig(config, data) {
+            const changed = {};
+            RENDERED_FIELDS.forEach(f => {
+                if (config[f] !== applied[f]) {
+                    changed[f] = true;
+                    applied[f] = config[f];
+                }
+            });
+            const container = document.getElementById('container');
+            const headerDiv = document.getElementById('header');
+            if (changed.font_family) loadGoogleFont(config.font_family);
+            if (changed.title_align) container.style.textAlign = config.title_align;
+            if (changed.title_text) headerDiv.innerText = (data.current_alert && data.current_alert.title) || config.title_text;
+            if (changed.title_color) headerDiv.style.color = config.title_color;
+            if (changed.title_size) headerDiv.style.fontSize = config.title_size + "px";
+            if (changed.recent_color) document.getElementById('user').style.color = config.recent_color;
+            if (changed.older_color) document.getElementById('video').style.color = config.older_color;
+            if (changed.overlay_mode) {
+                const mode = config.overlay_mode || 'alert';
+                document.getElementById('board').style.display = mode === 'alert' ? 'none' : 'block';
+                container.style.display = mode === 'leaderboard' ? 'none' : 'flex';
+            }
+            // Leaderboard rows carry the colors, so redraw them only if those changed.
+            if (changed.title_color || changed.recent_color || changed.older_color) boardVersion = -1;
+        }
+
+        function render(resp) {
+            const data = resp.data;
+            // A named profile restyles the shared config; the alert stream is the same for every profile.
+            const config = PROFILE ? Object.assign({}, resp.config, (resp.profiles || {})[PROFILE]) : resp.config;
+
+            const container = document.getElementById('container');
+            const headerDiv = document.getElementById('header');
+            const userDiv = document.getElementById('user');
+            const videoDiv = document.getElementById('video');
+
+            if (resp.config_version !== configVersion) {
+                configVersion = resp.config_version;
+                applyConfig(config, data);
+                applySounds((PROFILE && (resp.profile_sounds || {})[PROFILE]) || resp.sounds);
+            }
+
+            renderBoard(data.leaderboard, config);
+
+            if (data.audio_timestamp > lastPlayedAudioTime) {
+                lastPlayedAudioTime = data.audio_timestamp;
+                const alertId = data.alert_id;
+
+                stopAudio();
+
+                // Each alert kind can have its own sound.
+                const kind = (data.current_alert && data.current_alert.kind) || 'repost';
+                const volume = config.audio_volume !== undefined ? config.audio_volume : 1.0;
+
+                playSound(kind, volume).then(() => {
+                    sendAck('audio', alertId);
+                    fadeTimer = setTimeout(() => {
+                        fadeOutAudio(2000);
+                    }, 18000);
+                }).catch(error => {
+                    console.log("Audio play failed: " + error);
+                });
+            }
+
+            if (data.is_visible && data.current_alert) {
+                if (!container.classList.contains('visible') || userDiv.innerText !== data.current_alert.user) {
+                    headerDiv.innerText = data.current_alert.title || config.title_text;
+                    userDiv.innerText = data.current_alert.user;
+                    videoDiv.innerText = data.current_alert.video;
+                }
+                container.classList.add('visible');
+                if (data.alert_id > lastRenderedAlert) {
+                    lastRenderedAlert = data.alert_id;
+                    requestAnimationFrame(() => sendAck('render', data.alert_id));
+                }
+            } else {
+                container.classList.remove('visible');
+            }
+        }
+
+        // --- LIVE CHANNEL (falls back to polling while disconnected) ---
+        function liveConnected() {
+            return liveSocket !== null && liveSocket.readyState === WebSocket.OPEN;
+        }
+
+        function sendAck(event, alertId) {
+            if (!liveConnected() || alertId === undefined) return;
+            liveSocket.send(JSON.stringify({type: 'ack', event: event, id: alertId, client_time: Date.now()}));
+        }
+
+        function connectLive() {
+            if (!LIVE_URL || !window.WebSocket) return;
+            const ws = new WebSocket(LIVE_URL);
+            ws.onopen = () => { liveRetryMs = 1000; };
+            ws.onmessage = (e) => {
+                const msg = JSON.parse(e.data);
+                if (msg.type === 'stop') stopAudio();
+                if (msg.data && msg.config) render(msg);
+            };
+            ws.onclose = () => {
+                liveSocket = null;
+                setTimeout(connectLive, liveRetryMs);
+                liveRetryMs = Math.min(liveRetryMs * 2, 30000);
+            };
+            liveSocket = ws;
+        }
+
         function update() {
+            if (liveConnected()) return;
             fetch(API_URL + '/api/data?t=' + new Date().getTime())
                 .then(r => r.json())
-                .then(resp => {
-                    const data = resp.data;
-                    const config = resp.config;
-
-                    const container = document.getElementById('container');
-                    const headerDiv = document.getElementById('header');
-                    const userDiv = document.getElementById('user');
-                    const videoDiv = document.getElementById('video');
-
-                    const configStr = JSON.stringify(config);
-                    if (configStr !== currentConfigStr) {
-                        loadGoogleFont(config.font_family);
-                        container.style.textAlign = config.title_align;
-                        headerDiv.innerText = config.title_text;
-                        headerDiv.style.color = config.title_color;
-                        headerDiv.style.fontSize = config.title_size + "px";
-                        userDiv.style.color = config.recent_color;
-                        videoDiv.style.color = config.older_color;
-
-                        audio.src = API_URL + "/current_sound?t=" + new Date().getTime();
-                        audio.load();
-
-                        currentConfigStr = configStr;
-                    }
-
-                    if (data.audio_timestamp > lastPlayedAudioTime) {
-                        lastPlayedAudioTime = data.audio_timestamp;
-
-                        if(fadeTimer) clearTimeout(fadeTimer);
-
-                        audio.currentTime = 0;
-                        audio.volume = config.audio_volume !== undefined ? config.audio_volume : 1.0; 
-
-                        var playPromise = audio.play();
-                        if (playPromise !== undefined) {
-                            playPromise.then(() => {
-                                fadeTimer = setTimeout(() => {
-                                    fadeOutAudio(2000); 
-                                }, 18000);
-                            }).catch(error => {
-                                console.log("Audio play failed: " + error);
-                            });
-                        }
-                    }
-
-                    if (data.is_visible && data.current_alert) {
-                        if (!container.classList.contains('visible') || userDiv.innerText !== data.current_alert.user) {
-                            userDiv.innerText = data.current_alert.user;
-                            videoDiv.innerText = data.current_alert.video;
-                        }
-                        container.classList.add('visible');
-                    } else {
-                        container.classList.remove('visible');
-                    }
-                })
+                .then(render)
                 .catch(e => { });
         }
 
+        connectLive();
         setInterval(update, 500);
     </script>
 </body>
 </html>
         """
+        html_content = set_overlay_template(html_content, live_url() if self.live_channel.available else "")
         try:
             with open(TEMPLATE_FILE, "w", encoding="utf-8") as f:
                 f.write(html_content)
         except Exception as e:
             print(f"Error writing template: {e}")
 
+    def cache_selected_font(self):
+        families = configured_fonts(GLOBAL_CONFIG)
+        threading.Thread(target=self._cache_font_worker, args=(sorted(families),), daemon=True).start()
+
+    def _cache_font_worker(self, families):
+        cached = [family for family in families if font_cache.ensure_font(family) is not None]
+        if cached:
+            # Re-render so the pages OBS loads next have the @font-face inlined from the first frame.
+            self.write_template_file()
+
     # --- UI SETUP ---
     def setup_ui(self):
         self.grid_rowconfigure(0, weight=1)
@@ -1012,6 +1112,7 @@ class RumbleRepostTracker(ctk.CTk):
         self.tabview.add("Controls")
         self.tabview.add("Style & Config")
         self.tabview.add("Error Logs")
+        self.tabview.add("Stats")
 
         # === TAB 1: CONTROLS ===
         tab_main = self.tabview.tab("Controls")
@@ -1084,9 +1185,9 @@ class RumbleRepostTracker(ctk.CTk):
 
         frame_link = ctk.CTkFrame(tab_main)
         frame_link.pack(fill="x", padx=20, pady=5)
-        btn_copy = ctk.CTkButton(frame_link, text="Copy URL (http://127.0.0.1:5050)",
+        btn_copy = ctk.CTkButton(frame_link, text=f"Copy URL ({overlay_url()})",
                                  command=lambda: [self.clipboard_clear(),
-                                                  self.clipboard_append("http://127.0.0.1:5050"),
+                                                  self.clipboard_append(overlay_url()),
                                                   self.status_var.set("URL Copied!")],
                                  fg_color="#3B8ED0", hover_color="#1F6AA5")
         btn_copy.pack(fill="x", padx=5, pady=5)
@@ -1148,6 +1249,18 @@ class RumbleRepostTracker(ctk.CTk):
         ctk.CTkComboBox(frame_title, variable=self.title_align_var, values=["left", "center", "right"],
                         command=lambda x: self.update_live_preview()).grid(row=2, column=1, sticky="ew", padx=10,
                                                                            pady=5)
+
+        ctk.CTkLabel(frame_title, text="Overlay Mode:").grid(row=3, column=0, sticky="w", padx=10, pady=5)
+        ctk.CTkComboBox(frame_title, variable=self.overlay_mode_var, values=["alert", "leaderboard", "both"],
+                        command=lambda x: self.update_live_preview()).grid(row=3, column=1, sticky="ew", padx=10,
+                                                                           pady=5)
+
+        ctk.CTkLabel(frame_title, text="Alert On:").grid(row=4, column=0, sticky="w", padx=10, pady=5)
+        f_kinds = ctk.CTkFrame(frame_title, fg_color="transparent")
+        f_kinds.grid(row=4, column=1, sticky="ew", padx=10, pady=5)
+        for kind in event_router.ALERT_KINDS:
+            ctk.CTkCheckBox(f_kinds, text=f"{kind.title()}s", variable=self.alert_kind_vars[kind],
+                            width=80).pack(side="left", padx=(0, 5))
         frame_title.grid_columnconfigure(1, weight=1)
 
         frame_col = ctk.CTkFrame(tab_style)
@@ -1208,7 +1321,26 @@ class RumbleRepostTracker(ctk.CTk):
         ctk.CTkButton(btn_frame, text="Email Support", command=self.email_error_logs, fg_color="#3B8ED0",
                       hover_color="#1F6AA5").pack(side="left", expand=True, padx=5)
 
+        # === TAB 4: STATS ===
+        tab_stats = self.tabview.tab("Stats")
+
+        ctk.CTkLabel(tab_stats, text="Performance Stats", font=ctk.CTkFont(size=14, weight="bold")).pack(pady=5)
+        ctk.CTkLabel(tab_stats, text=f"Prometheus metrics: {overlay_url('/metrics')}").pack(pady=(0, 5))
+
+        self.txt_stats = ctk.CTkTextbox(tab_stats, height=300, font=ctk.CTkFont(family="Courier New", size=13))
+        self.txt_stats.pack(fill="both", expand=True, padx=10, pady=5)
+        self.txt_stats.configure(state="disabled")
+        self.refresh_stats_panel()
+
+    def refresh_stats_panel(self):
+        self.txt_stats.configure(state="normal")
+        self.txt_stats.delete("0.0", "end")
+        self.txt_stats.insert("0.0", "\n".join(metrics.stats_lines()))
+        self.txt_stats.configure(state="disabled")
+        self.after(2000, self.refresh_stats_panel)
+
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = RumbleRepostTracker()
     app.mainloop()
\ No newline at end of file
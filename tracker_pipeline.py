@@ -0,0 +1,243 @@
+# --- HEADLESS TRACKER PIPELINE ---
+# Everything between a notification feed response and the alert queue, with
+# no GUI imports: parse -> dedupe -> route (analytics, leaderboard, log
+# handlers) -> journal -> history -> REPOST_QUEUE -> outbound sinks, plus the
+# fetch-mode poll loop with its cookie sync and session renewal. The app,
+# the replay harness and the soak run all drive this same code.
+
+import time
+import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+import feed_parser
+import feed_schema
+import feed_poll
+import cookie_jar
+import event_router
+import history_store
+from overlay_server import GLOBAL_CONFIG, REPOST_QUEUE, record_leaderboard
+
+FEED_URL = "https://rumble.com/service.php?name=user.notification_feed&limit=25"
+# Plain page load that makes Rumble send fresh Set-Cookie headers for a signed-in session.
+SESSION_RENEW_URL = "https://rumble.com/"
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/120.0.0.0 Safari/537.36")
+# (connect, read) seconds for a feed poll, so a stalled request cannot hold the tracker thread.
+FETCH_TIMEOUT = (5, 15)
+
+# poll_feed() result when the feed answers 403 and renewing the session did not help.
+BLOCKED = "blocked"
+
+
+class _InFlightPool:
+    """Remembers the connection it handed out last, so another thread can shut its socket."""
+    in_flight = None
+
+    def _get_conn(self, timeout=None):
+        self.in_flight = super()._get_conn(timeout)
+        return self.in_flight
+
+
+class _HTTPPool(_InFlightPool, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSPool(_InFlightPool, HTTPSConnectionPool):
+    pass
+
+
+class CancellableAdapter(HTTPAdapter):
+    """HTTPAdapter whose request in flight can be aborted from another thread with cancel()."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def cancel(self):
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            try:
+                sock = getattr(pools[key].in_flight, "sock", None)
+            except KeyError:
+                continue  # evicted meanwhile
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)  # the blocked read returns and the request fails
+                except OSError:
+                    pass
+
+
+def feed_session(session_data):
+    """requests.Session + headers for the notification feed, authenticated with the saved cookies."""
+    s = requests.Session()
+    for prefix in ("https://", "http://"):
+        s.mount(prefix, CancellableAdapter())
+    s.cookies = cookie_jar.load_jar(session_data["cookies"])
+    headers = {
+        "User-Agent": session_data.get("user_agent", DEFAULT_USER_AGENT),
+        "Accept": "application/json, text/plain, */*",
+        "Referer": "https://rumble.com/",
+    }
+    return s, headers
+
+
+class TrackerPipeline:
+    """New feed events -> alerts on the queue. Optional parts (journal, analytics, sinks) may be None."""
+
+    def __init__(self, seen, journal=None, store=None, sinks=None, alert_queue=None, config=None,
+                 history_path=history_store.HISTORY_FILE, log=print):
+        self.seen = seen
+        self.journal = journal
+        self.store = store
+        self.sinks = sinks
+        self.alert_queue = alert_queue if alert_queue is not None else REPOST_QUEUE
+        self.config = GLOBAL_CONFIG if config is None else config
+        self.history_path = history_path
+        self.log = log
+        self.published = 0
+        self._last_item_error = None
+        self.session = None  # the fetch-mode session while poll_feed runs, for cancel()
+        self.router = event_router.EventRouter()
+        self.router.register("repost", self._on_reposts)
+        for kind in ("follow", "comment", "rant"):
+            self.router.register(kind, self._on_notification)
+
+    def publish(self, events, mode, parse_start):
+        """Dedupes parsed events and queues their alerts; returns the new alerts, newest first."""
+        fresh = feed_parser.filter_unseen(events, self.seen)
+        alertable = self.router.route(fresh, mode, self.config)
+        now = time.time()
+        batch_alerts = [event_router.to_alert(e, now, self.config) for e in alertable]
+        if fresh:
+            # Journal first: once history says "seen", the journal is the only copy of an unshown alert.
+            if self.journal:
+                try:
+                    self.journal.append(batch_alerts)
+                except Exception as e:
+                    self.log(f"Journal Error: {e}")
+            history_store.save_history(self.seen, self.history_path)
+        metrics.PARSE_TIME.observe(time.perf_counter() - parse_start, mode=mode)
+        for item in reversed(batch_alerts):
+            self.alert_queue.put(item)
+        if self.sinks:
+            self.sinks.publish(batch_alerts[::-1])
+        self.published += len(batch_alerts)
+        return batch_alerts
+
+    def publish_raw(self, raw, mode="fetch"):
+        """A raw feed body through parse -> publish; a changed feed format is logged and skipped."""
+        parse_start = time.perf_counter()
+        try:
+            events = feed_parser.parse_feed_events(raw, self._skip_item)
+        except feed_schema.FeedSchemaError as e:
+            metrics.FEED_SCHEMA_ERRORS.inc()
+            self.log(f"Feed format changed, skipping poll: {e}")
+            return []
+        return self.publish(events, mode, parse_start)
+
+    def _skip_item(self, e):
+        metrics.FEED_ITEM_ERRORS.inc()
+        # The same odd item stays on the page for many polls; say so once, not on every poll.
+        if e.message != self._last_item_error:
+            self._last_item_error = e.message
+            self.log(f"Skipping a feed item in an unexpected format: {e}")
+
+    def _on_reposts(self, kind, events, mode):
+        if self.store:
+            try:
+                self.store.record(events, source=mode)
+            except Exception as e:
+                self.log(f"Analytics Error: {e}")
+        for event in events:
+            self.log(f"NEW REPOST: {event['user']}")
+        metrics.NEW_REPOSTS.inc(len(events), mode=mode)
+        now = time.time()
+        record_leaderboard([feed_parser.to_alert(e, now) for e in reversed(events)])
+
+    def _on_notification(self, kind, events, mode):
+        for event in events:
+            self.log(f"NEW {kind.upper()}: {event['user']}")
+
+    # --- FETCH MODE ---
+    def poll_feed(self, stop, session_data, cookies_path, url=FEED_URL, renew_url=SESSION_RENEW_URL,
+                  poll_interval=None, timeout=FETCH_TIMEOUT):
+        """Polls the feed until `stop` is set (returns None) or it is blocked with 403 (returns BLOCKED)."""
+        s, headers = feed_session(session_data)
+        self.session = s
+        detector = feed_poll.FeedChangeDetector()
+        cookies = cookie_jar.CookieStore(cookies_path, session_data,
+                                         renew_before=float(self.config.get("session_renew_minutes", 60)) * 60)
+        retried_403 = False
+        try:
+            while not stop.is_set():
+                try:
+                    poll_start = time.perf_counter()
+                    try:
+                        r = s.get(url, headers=dict(headers, **detector.request_headers()), timeout=timeout)
+                    except Exception:
+                        if stop.is_set():
+                            break  # aborted by cancel()
+                        metrics.POLL_RESPONSES.inc(status="error")
+                        raise
+                    if stop.is_set():
+                        break
+                    metrics.POLL_LATENCY.observe(time.perf_counter() - poll_start)
+                    metrics.POLL_RESPONSES.inc(status=r.status_code)
+                    if r.status_code in (200, 304):
+                        retried_403 = False
+                        # Keep the saved login in step with whatever Rumble rotated via Set-Cookie.
+                        cookies.sync(s.cookies)
+                        if cookies.renewal_due():
+                            self.renew_session(s, headers, cookies, renew_url, timeout, stop)
+                    if r.status_code in (200, 304) and detector.unchanged(r):
+                        pass  # same notifications as the last poll: nothing to parse
+                    elif r.status_code == 200:
+                        self.publish_raw(r.content, "fetch")
+                    elif r.status_code == 403 and not retried_403 and self.renew_session(
+                            s, headers, cookies, renew_url, timeout, stop):
+                        # A stale session cookie was just replaced; give the cheap path one more poll.
+                        retried_403 = True
+                        self.log("Session Blocked (403). Renewed cookies, retrying...")
+                    elif r.status_code == 403:
+                        metrics.BROWSER_FALLBACKS.inc()
+                        self.log("Session Blocked (403). Switching to Browser Mode...")
+                        return BLOCKED
+                    else:
+                        self.log(f"API Error: {r.status_code}")
+                except Exception as e:
+                    self.log(f"Fetch Error: {e}")
+                stop.wait(float(poll_interval if poll_interval is not None else self.config['poll_interval']))
+        finally:
+            self.session = None
+            s.close()
+        return None
+
+    def cancel(self):
+        """Aborts the feed or renewal request poll_feed is waiting on (call after setting its stop event)."""
+        s = self.session
+        if s is not None:
+            for adapter in s.adapters.values():
+                if isinstance(adapter, CancellableAdapter):
+                    adapter.cancel()
+
+    def renew_session(self, s, headers, cookies, renew_url=SESSION_RENEW_URL, timeout=FETCH_TIMEOUT, stop=None):
+        """Loads a Rumble page so the server re-issues expiring cookies; returns True if any were rotated."""
+        try:
+            r = s.get(renew_url, headers=dict(headers, Accept="text/html,*/*"), timeout=timeout)
+            ok = r.status_code == 200
+        except requests.RequestException:
+            if stop is not None and stop.is_set():
+                return False  # aborted by cancel(), not a failed renewal
+            ok = False
+        expiring = cookies.expiring()
+        rotated = cookies.renewed(s.cookies, ok)
+        still_expiring = cookies.expiring()
+        if rotated and len(still_expiring) < len(expiring):
+            self.log("Session cookies renewed.")
+        elif not rotated and still_expiring:
+            self.log(f"Saved login expires soon ({', '.join(still_expiring)}); log in again to refresh it.")
+        return rotated
@@ -0,0 +1,97 @@
+# --- TRACKER WORKER ---
+# Owns the one tracker thread. Start/Stop only move a small state machine
+#
+#   idle -> fetch | browser -> stopping -> idle
+#
+# and set a threading.Event the loops wait on instead of sleeping, so Stop
+# interrupts a poll_interval wait at once; the on_stop hook aborts a request
+# that is already in flight. A loop can hand over to the other
+# mode (403 -> browser fallback) by returning its name; that runs on the same
+# thread, so two pollers can never exist side by side. start() is refused
+# until the previous thread has actually exited.
+
+import threading
+
+IDLE = "idle"
+FETCH = "fetch"
+BROWSER = "browser"
+STOPPING = "stopping"
+
+
+class TrackerWorker:
+    def __init__(self, loops, on_state=None, on_stop=None, log=print):
+        """loops maps a mode to fn(stop_event) -> next mode or None; on_state(state) is called on every change,
+        on_stop() right after stop() sets the event, to interrupt blocking I/O in the loop."""
+        self.loops = loops
+        self.on_state = on_state
+        self.on_stop = on_stop
+        self.log = log
+        self.lock = threading.Lock()
+        self.state = IDLE
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def active(self):
+        return self.state != IDLE
+
+    def _set_state(self, state):
+        # Called with self.lock held.
+        if state == self.state:
+            return
+        self.state = state
+        if self.on_state:
+            try:
+                self.on_state(state)
+            except Exception as e:
+                self.log(f"Tracker state listener error: {e}")
+
+    def start(self, mode=FETCH):
+        """Starts the tracker in `mode`. Returns False if a tracker thread is still running or stopping."""
+        if mode not in self.loops:
+            raise ValueError(f"Unknown tracker mode '{mode}'")
+        with self.lock:
+            if self.state != IDLE or (self.thread and self.thread.is_alive()):
+                return False
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(target=self._run, args=(mode, self.stop_event),
+                                           name=f"tracker-{mode}", daemon=True)
+            self._set_state(mode)
+            self.thread.start()
+            return True
+
+    def stop(self):
+        """Asks the running loop to exit; returns immediately (see join)."""
+        with self.lock:
+            if self.state in (IDLE, STOPPING):
+                return
+            self.stop_event.set()
+            self._set_state(STOPPING)
+        if self.on_stop:
+            try:
+                self.on_stop()
+            except Exception as e:
+                self.log(f"Tracker stop hook error: {e}")
+
+    def join(self, timeout=None):
+        """Waits for the tracker thread to exit. Returns True if it has."""
+        thread = self.thread
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self, mode, stop_event):
+        try:
+            while mode and not stop_event.is_set():
+                next_mode = self.loops[mode](stop_event)
+                with self.lock:
+                    if stop_event.is_set() or next_mode not in self.loops:
+                        break
+                    self._set_state(next_mode)
+                mode = next_mode
+        except Exception as e:
+            self.log(f"Tracker Error: {e}")
+        finally:
+            with self.lock:
+                if self.thread is threading.current_thread():
+                    self._set_state(IDLE)
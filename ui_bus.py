@@ -0,0 +1,43 @@
+# --- UI EVENT BUS ---
+# Worker threads (tracker, login, browser supervisor, font cache) never touch
+# Tk directly. They publish log lines and UI callbacks here; the Tk thread
+# drains the bus on a fixed cadence and applies each batch in one go, so a
+# burst of reposts or a flood of "Fetch Error" lines costs one redraw per
+# tick instead of one Tk callback per message.
+
+import time
+import threading
+from collections import deque
+
+DRAIN_INTERVAL_MS = 100
+# What the GUI keeps of the log, so a 12 hour stream does not grow the textboxes without bound.
+MAX_LOG_LINES = 1000
+MAX_ERROR_LOGS = 500
+
+
+class UIEventBus:
+    def __init__(self, max_pending_logs=500):
+        self.lock = threading.Lock()
+        self.logs = deque(maxlen=max_pending_logs)
+        self.calls = []
+        self.dropped = 0
+
+    def log(self, msg):
+        """Queues a log line (timestamped now). Oldest pending lines are dropped if the GUI falls behind."""
+        with self.lock:
+            if len(self.logs) == self.logs.maxlen:
+                self.dropped += 1
+            self.logs.append((time.strftime('%H:%M:%S'), msg))
+
+    def call(self, fn, *args):
+        """Queues fn(*args) to run on the Tk thread at the next drain."""
+        with self.lock:
+            self.calls.append((fn, args))
+
+    def drain(self):
+        """Returns (log lines oldest first, callbacks, dropped count) and empties the bus."""
+        with self.lock:
+            logs, self.logs = list(self.logs), deque(maxlen=self.logs.maxlen)
+            calls, self.calls = self.calls, []
+            dropped, self.dropped = self.dropped, 0
+        return logs, calls, dropped